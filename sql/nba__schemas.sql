@@ -21,6 +21,8 @@ CREATE TABLE IF NOT EXISTS PLAYER_METADATA (
     SCHOOL VARCHAR(100),
     COUNTRY VARCHAR(50),
     HEADSHOT_URL TEXT,
+    -- fingerprint of the row's content, the pipeline skips rows whose hash hasn't changed
+    ROW_HASH BIGINT UNSIGNED,
     CREATED_AT TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     UPDATED_AT TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
 );
@@ -56,11 +58,146 @@ CREATE TABLE IF NOT EXISTS PLAYER_GAME_LOGS (
     TOV INT,
     PF INT,
     PLUS_MINUS INT,
+    -- derived per-game metrics, computed once by clean_gamelogs
+    GAME_SCORE DECIMAL(5,1),
+    TSA DECIMAL(6,2),
+    TS_PCT DECIMAL(5,3),
+    EFG_PCT DECIMAL(5,3),
+    POSS_USED DECIMAL(6,2),
+    USG_PER_36 DECIMAL(6,2),
+    -- fingerprint of the row's content, the pipeline skips rows whose hash hasn't changed
+    ROW_HASH BIGINT UNSIGNED,
+    GAME_MONTH CHAR(7) AS (DATE_FORMAT(GAME_DATE, '%Y-%m')) STORED,
     CREATED_AT TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     UNIQUE KEY unique_player_game (PLAYER_ID, GAME_ID),
+    -- recent games: WHERE PLAYER_ID = ? ORDER BY GAME_DATE DESC LIMIT N (backward range scan, no sort)
+    KEY idx_player_date (PLAYER_ID, GAME_DATE),
+    -- monthly stats: WHERE PLAYER_ID = ? [AND SEASON_ID = ?] GROUP BY GAME_MONTH (covering, read in group order)
+    KEY idx_player_month (PLAYER_ID, GAME_MONTH, SEASON_ID, PTS, REB, AST),
+    -- best games: MAX(GAME_SCORE) / ORDER BY GAME_SCORE DESC LIMIT N per player, read from the end of the index
+    KEY idx_player_game_score (PLAYER_ID, GAME_SCORE),
     FOREIGN KEY (PLAYER_ID) REFERENCES PLAYER_METADATA(PLAYER_ID)
 );
 
+-- Create a table to track the latest game stored for each player (used by incremental refreshes)
+CREATE TABLE IF NOT EXISTS PLAYER_WATERMARKS (
+    PLAYER_ID INT PRIMARY KEY,
+    LAST_GAME_DATE DATE NOT NULL,
+    LAST_GAME_ID VARCHAR(20) NOT NULL,
+    UPDATED_AT TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    FOREIGN KEY (PLAYER_ID) REFERENCES PLAYER_METADATA(PLAYER_ID)
+);
+
+-- Create a materialized table of per player, per season totals (refreshed by the pipeline after each insert batch)
+CREATE TABLE IF NOT EXISTS PLAYER_SEASON_SUMMARY (
+    PLAYER_ID INT NOT NULL,
+    SEASON_ID VARCHAR(10) NOT NULL,
+    GP INT NOT NULL,
+    SUM_MIN DECIMAL(8,2),
+    SUM_PTS INT,
+    SUM_FGM INT,
+    SUM_FGA INT,
+    SUM_FG3M INT,
+    SUM_FG3A INT,
+    SUM_FTM INT,
+    SUM_FTA INT,
+    SUM_OREB INT,
+    SUM_DREB INT,
+    SUM_REB INT,
+    SUM_AST INT,
+    SUM_STL INT,
+    SUM_BLK INT,
+    SUM_TOV INT,
+    SUM_PF INT,
+    SUM_PLUS_MINUS INT,
+    SUM_GAME_SCORE DECIMAL(9,1),
+    SUM_TSA DECIMAL(9,2),
+    SUM_POSS_USED DECIMAL(9,2),
+    MAX_MIN DECIMAL(5,2),
+    MAX_PTS INT,
+    MAX_REB INT,
+    MAX_AST INT,
+    MAX_STL INT,
+    MAX_BLK INT,
+    MAX_FG3M INT,
+    MAX_GMSCORE DECIMAL(6,1),
+    MAX_POSS_USED DECIMAL(6,2),
+    -- best shooting and usage games, only counting games with real volume (aggregates.py sets the minimums)
+    MAX_TS_PCT DECIMAL(5,3),
+    MAX_EFG_PCT DECIMAL(5,3),
+    MAX_USG_PER_36 DECIMAL(6,2),
+    REFRESHED_AT TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    PRIMARY KEY (PLAYER_ID, SEASON_ID),
+    FOREIGN KEY (PLAYER_ID) REFERENCES PLAYER_METADATA(PLAYER_ID)
+);
+
+-- Create a materialized table of per player, per season split totals (home/away and win/loss)
+CREATE TABLE IF NOT EXISTS PLAYER_SEASON_SPLITS (
+    PLAYER_ID INT NOT NULL,
+    SEASON_ID VARCHAR(10) NOT NULL,
+    SPLIT_TYPE VARCHAR(20) NOT NULL,
+    SPLIT_VALUE VARCHAR(10) NOT NULL,
+    GP INT NOT NULL,
+    SUM_MIN DECIMAL(8,2),
+    SUM_PTS INT,
+    SUM_FGM INT,
+    SUM_FGA INT,
+    SUM_FG3M INT,
+    SUM_FG3A INT,
+    SUM_FTM INT,
+    SUM_FTA INT,
+    SUM_REB INT,
+    SUM_AST INT,
+    SUM_STL INT,
+    SUM_BLK INT,
+    SUM_PLUS_MINUS INT,
+    REFRESHED_AT TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    PRIMARY KEY (PLAYER_ID, SPLIT_TYPE, SPLIT_VALUE, SEASON_ID),
+    FOREIGN KEY (PLAYER_ID) REFERENCES PLAYER_METADATA(PLAYER_ID)
+);
+
+-- Create a materialized cube of player x season x opponent x home/away x result totals (refreshed with the season summary)
+-- every measure is a sum, so any subset of the dimensions rolls up without reading the game logs
+CREATE TABLE IF NOT EXISTS PLAYER_MATCHUP_CUBE (
+    PLAYER_ID INT NOT NULL,
+    SEASON_ID VARCHAR(10) NOT NULL,
+    OPPONENT VARCHAR(10) NOT NULL,
+    HOME_AWAY CHAR(1) NOT NULL,
+    WL CHAR(1) NOT NULL,
+    GP INT NOT NULL,
+    SUM_MIN DECIMAL(8,2),
+    SUM_PTS INT,
+    SUM_FGM INT,
+    SUM_FGA INT,
+    SUM_FG3M INT,
+    SUM_FG3A INT,
+    SUM_FTM INT,
+    SUM_FTA INT,
+    SUM_REB INT,
+    SUM_AST INT,
+    SUM_STL INT,
+    SUM_BLK INT,
+    SUM_TOV INT,
+    SUM_PLUS_MINUS INT,
+    SUM_GAME_SCORE DECIMAL(9,1),
+    SUM_TSA DECIMAL(9,2),
+    REFRESHED_AT TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    -- refreshes delete and re-insert by (PLAYER_ID, SEASON_ID)
+    PRIMARY KEY (PLAYER_ID, SEASON_ID, OPPONENT, HOME_AWAY, WL),
+    -- one player against each opponent: WHERE PLAYER_ID = ? GROUP BY OPPONENT (read in group order)
+    KEY idx_player_opponent (PLAYER_ID, OPPONENT),
+    -- every player against one opponent: WHERE OPPONENT = ? [AND SEASON_ID = ?] GROUP BY PLAYER_ID
+    KEY idx_opponent_season (OPPONENT, SEASON_ID, PLAYER_ID),
+    FOREIGN KEY (PLAYER_ID) REFERENCES PLAYER_METADATA(PLAYER_ID)
+);
+
+-- Create a table of data version stamps (bumped by the pipeline in the same transaction as each batch, the dashboard caches are keyed on them)
+CREATE TABLE IF NOT EXISTS DATA_VERSION (
+    SCOPE VARCHAR(20) PRIMARY KEY,
+    VERSION BIGINT NOT NULL,
+    UPDATED_AT TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+);
+
 -- Create a View for player career stats
 CREATE OR REPLACE VIEW PLAYER_CAREER_STATS AS 
 SELECT
@@ -69,72 +206,78 @@ SELECT
     m.POSITION,
     m.HEIGHT,
     m.WEIGHT,
-    COUNT(DISTINCT g.SEASON_ID) AS SEASONS,
-    COUNT(*) AS GP,
-    ROUND(AVG(g.MIN), 1) AS MPG,
-    ROUND(AVG(g.PTS), 1) AS PPG,
-    ROUND(AVG(g.REB), 1) AS RPG,
-    ROUND(AVG(g.AST), 1) AS APG,
-    ROUND(AVG(g.STL), 1) AS SPG,
-    ROUND(AVG(g.BLK), 1) AS BPG,
-    ROUND(AVG(g.TOV), 1) AS TPG, 
-
-    ROUND(SUM(g.FGM) / NULLIF(SUM(g.FGA), 0), 3) AS FG_PCT,
-    ROUND(SUM(g.FG3M) / NULLIF(SUM(g.FG3A), 0), 3) AS FG3_PCT,
-    ROUND(SUM(g.FTM) / NULLIF(SUM(g.FTA), 0), 3) AS FT_PCT,
-
-    ROUND(SUM(g.PTS) / NULLIF(2 * (SUM(g.FGA) + 0.44 * SUM(g.FTA)), 0), 3) AS TS_PCT,
-    ROUND((SUM(g.FGM) + 0.5 * SUM(g.FG3M)) / NULLIF(SUM(g.FGA), 0), 3) AS EFG_PCT
+    COUNT(s.SEASON_ID) AS SEASONS,
+    COALESCE(SUM(s.GP), 0) AS GP,
+    ROUND(SUM(s.SUM_MIN) / SUM(s.GP), 1) AS MPG,
+    ROUND(SUM(s.SUM_PTS) / SUM(s.GP), 1) AS PPG,
+    ROUND(SUM(s.SUM_REB) / SUM(s.GP), 1) AS RPG,
+    ROUND(SUM(s.SUM_AST) / SUM(s.GP), 1) AS APG,
+    ROUND(SUM(s.SUM_STL) / SUM(s.GP), 1) AS SPG,
+    ROUND(SUM(s.SUM_BLK) / SUM(s.GP), 1) AS BPG,
+    ROUND(SUM(s.SUM_TOV) / SUM(s.GP), 1) AS TPG, 
+
+    ROUND(SUM(s.SUM_FGM) / NULLIF(SUM(s.SUM_FGA), 0), 3) AS FG_PCT,
+    ROUND(SUM(s.SUM_FG3M) / NULLIF(SUM(s.SUM_FG3A), 0), 3) AS FG3_PCT,
+    ROUND(SUM(s.SUM_FTM) / NULLIF(SUM(s.SUM_FTA), 0), 3) AS FT_PCT,
+
+    ROUND(SUM(s.SUM_PTS) / NULLIF(2 * SUM(s.SUM_TSA), 0), 3) AS TS_PCT,
+    ROUND((SUM(s.SUM_FGM) + 0.5 * SUM(s.SUM_FG3M)) / NULLIF(SUM(s.SUM_FGA), 0), 3) AS EFG_PCT,
+    ROUND(SUM(s.SUM_GAME_SCORE) / SUM(s.GP), 1) AS GMSC,
+    ROUND(36 * SUM(s.SUM_POSS_USED) / NULLIF(SUM(s.SUM_MIN), 0), 1) AS USG_PER_36
 
 FROM PLAYER_METADATA m
-LEFT JOIN PLAYER_GAME_LOGS g ON m.PLAYER_ID = g.PLAYER_ID
-GROUP BY m.PLAYER_ID, m.PLAYER_NAME, m.POSITION;
+LEFT JOIN PLAYER_SEASON_SUMMARY s ON m.PLAYER_ID = s.PLAYER_ID
+GROUP BY m.PLAYER_ID, m.PLAYER_NAME, m.POSITION, m.HEIGHT, m.WEIGHT;
 
 -- Create a View for player season by season stats
 CREATE OR REPLACE VIEW PLAYER_SEASON_STATS AS
 SELECT 
-    g.PLAYER_ID,
+    s.PLAYER_ID,
     m.PLAYER_NAME,
-    g.SEASON_ID,
-    COUNT(*) AS GP,
-    ROUND(AVG(g.MIN), 1) AS MPG,
-    ROUND(AVG(g.FGM), 1) AS FGM,
-    ROUND(AVG(g.FGA), 1) AS FGA,
-    ROUND(SUM(g.FGM) / NULLIF(SUM(g.FGA), 0), 3) AS FG_PCT,
-    ROUND(AVG(g.FG3M), 1) AS FG3M,
-    ROUND(AVG(g.FG3A), 1) AS FG3A,
-    ROUND(SUM(g.FG3M) / NULLIF(SUM(g.FG3A), 0), 3) AS FG3_PCT,
-    ROUND(AVG(g.FTM), 1) AS FTM,
-    ROUND(AVG(g.FTA), 1) AS FTA,
-    ROUND(SUM(g.FTM) / NULLIF(SUM(g.FTA), 0), 3) AS FT_PCT,
-    ROUND(SUM(g.PTS) / NULLIF(2 * (SUM(g.FGA) + 0.44 * SUM(g.FTA)), 0), 3) AS TS_PCT,
-    ROUND(AVG(g.REB), 1) AS RPG,
-    ROUND(AVG(g.AST), 1) AS APG,
-    ROUND(AVG(g.STL), 1) AS SPG,
-    ROUND(AVG(g.BLK), 1) AS BPG,
-    ROUND(AVG(g.TOV), 1) AS TPG, 
-    ROUND(AVG(g.PF), 1) AS PF,
-    ROUND(AVG(g.PTS), 1) AS PPG
-
-FROM PLAYER_GAME_LOGS g
-JOIN PLAYER_METADATA m ON g.PLAYER_ID = m.PLAYER_ID
-GROUP BY g.PLAYER_ID, m.PLAYER_NAME, g.SEASON_ID;
+    s.SEASON_ID,
+    s.GP,
+    ROUND(s.SUM_MIN / s.GP, 1) AS MPG,
+    ROUND(s.SUM_FGM / s.GP, 1) AS FGM,
+    ROUND(s.SUM_FGA / s.GP, 1) AS FGA,
+    ROUND(s.SUM_FGM / NULLIF(s.SUM_FGA, 0), 3) AS FG_PCT,
+    ROUND(s.SUM_FG3M / s.GP, 1) AS FG3M,
+    ROUND(s.SUM_FG3A / s.GP, 1) AS FG3A,
+    ROUND(s.SUM_FG3M / NULLIF(s.SUM_FG3A, 0), 3) AS FG3_PCT,
+    ROUND(s.SUM_FTM / s.GP, 1) AS FTM,
+    ROUND(s.SUM_FTA / s.GP, 1) AS FTA,
+    ROUND(s.SUM_FTM / NULLIF(s.SUM_FTA, 0), 3) AS FT_PCT,
+    ROUND(s.SUM_PTS / NULLIF(2 * s.SUM_TSA, 0), 3) AS TS_PCT,
+    ROUND((s.SUM_FGM + 0.5 * s.SUM_FG3M) / NULLIF(s.SUM_FGA, 0), 3) AS EFG_PCT,
+    ROUND(s.SUM_GAME_SCORE / s.GP, 1) AS GMSC,
+    ROUND(36 * s.SUM_POSS_USED / NULLIF(s.SUM_MIN, 0), 1) AS USG_PER_36,
+    ROUND(s.SUM_REB / s.GP, 1) AS RPG,
+    ROUND(s.SUM_AST / s.GP, 1) AS APG,
+    ROUND(s.SUM_STL / s.GP, 1) AS SPG,
+    ROUND(s.SUM_BLK / s.GP, 1) AS BPG,
+    ROUND(s.SUM_TOV / s.GP, 1) AS TPG, 
+    ROUND(s.SUM_PF / s.GP, 1) AS PF,
+    ROUND(s.SUM_PTS / s.GP, 1) AS PPG
+
+FROM PLAYER_SEASON_SUMMARY s
+JOIN PLAYER_METADATA m ON s.PLAYER_ID = m.PLAYER_ID;
 
 -- Create a View to show player career highs
+-- (a player's rows of the season summary, read through its primary key, so no derived metric is computed from the game logs)
 CREATE OR REPLACE VIEW PLAYER_CAREER_HIGHS AS 
 SELECT
     PLAYER_ID,
-    MAX(MIN) AS CAREER_HIGH_MIN,
-    MAX(PTS) AS CAREER_HIGH_PTS,
-    MAX(AST) AS CAREER_HIGH_AST,
-    MAX(REB) AS CAREER_HIGH_REB,
-    MAX(STL) AS CAREER_HIGH_STL,
-    MAX(BLK) AS CAREER_HIGH_BLK,
-    MAX(FG3M) AS CAREER_HIGH_3PM,
-
-    MAX(PTS + 0.4 * FGM - 0.7 * FGA - 0.4 * (FTA - FTM) + 0.7 * OREB + 0.3 * DREB + STL + 0.7 * AST + 0.7 * BLK - 0.4 * PF - TOV) AS CAREER_HIGH_GMSCORE
+    MAX(MAX_MIN) AS CAREER_HIGH_MIN,
+    MAX(MAX_PTS) AS CAREER_HIGH_PTS,
+    MAX(MAX_AST) AS CAREER_HIGH_AST,
+    MAX(MAX_REB) AS CAREER_HIGH_REB,
+    MAX(MAX_STL) AS CAREER_HIGH_STL,
+    MAX(MAX_BLK) AS CAREER_HIGH_BLK,
+    MAX(MAX_FG3M) AS CAREER_HIGH_3PM,
+    MAX(MAX_GMSCORE) AS CAREER_HIGH_GMSCORE,
+    MAX(MAX_POSS_USED) AS CAREER_HIGH_POSS_USED,
+    MAX(MAX_TS_PCT) AS CAREER_HIGH_TS_PCT,
+    MAX(MAX_EFG_PCT) AS CAREER_HIGH_EFG_PCT,
+    MAX(MAX_USG_PER_36) AS CAREER_HIGH_USG_PER_36
 
-FROM PLAYER_GAME_LOGS
+FROM PLAYER_SEASON_SUMMARY
 GROUP BY PLAYER_ID;
-  
-
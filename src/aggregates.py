@@ -0,0 +1,132 @@
+### THIS SCRIPT KEEPS THE MATERIALIZED SEASON SUMMARY, SPLITS AND MATCHUP CUBE TABLES IN SYNC WITH PLAYER_GAME_LOGS
+## Import libraries
+from db_connection import pooled_connection
+from data_version import bump_data_version, GAMELOGS
+from metrics import log_event, staged
+
+# number of (player, season) groups refreshed per statement
+REFRESH_CHUNK_SIZE = 500
+
+# a game only counts toward the best TS%, eFG% and usage highs with this much volume, so a 1-for-1 night isn't a career high
+MIN_HIGH_TSA = 10
+MIN_HIGH_FGA = 10
+MIN_HIGH_MIN = 20
+
+# {where} is left for the caller to fill in
+SUMMARY_SELECT = f"""
+    SELECT
+        PLAYER_ID, SEASON_ID, COUNT(*),
+        SUM(MIN), SUM(PTS), SUM(FGM), SUM(FGA), SUM(FG3M), SUM(FG3A), SUM(FTM), SUM(FTA),
+        SUM(OREB), SUM(DREB), SUM(REB), SUM(AST), SUM(STL), SUM(BLK), SUM(TOV), SUM(PF), SUM(PLUS_MINUS),
+        SUM(GAME_SCORE), SUM(TSA), SUM(POSS_USED),
+        MAX(MIN), MAX(PTS), MAX(REB), MAX(AST), MAX(STL), MAX(BLK), MAX(FG3M),
+        MAX(GAME_SCORE), MAX(POSS_USED),
+        MAX(CASE WHEN TSA >= {MIN_HIGH_TSA} THEN TS_PCT END), MAX(CASE WHEN FGA >= {MIN_HIGH_FGA} THEN EFG_PCT END),
+        MAX(CASE WHEN MIN >= {MIN_HIGH_MIN} THEN USG_PER_36 END)
+    FROM PLAYER_GAME_LOGS
+    {{where}}
+    GROUP BY PLAYER_ID, SEASON_ID
+"""
+
+SUMMARY_INSERT = """
+    INSERT INTO PLAYER_SEASON_SUMMARY (
+        PLAYER_ID, SEASON_ID, GP,
+        SUM_MIN, SUM_PTS, SUM_FGM, SUM_FGA, SUM_FG3M, SUM_FG3A, SUM_FTM, SUM_FTA,
+        SUM_OREB, SUM_DREB, SUM_REB, SUM_AST, SUM_STL, SUM_BLK, SUM_TOV, SUM_PF, SUM_PLUS_MINUS,
+        SUM_GAME_SCORE, SUM_TSA, SUM_POSS_USED,
+        MAX_MIN, MAX_PTS, MAX_REB, MAX_AST, MAX_STL, MAX_BLK, MAX_FG3M,
+        MAX_GMSCORE, MAX_POSS_USED, MAX_TS_PCT, MAX_EFG_PCT, MAX_USG_PER_36
+    )
+"""
+
+SPLITS_SELECT = """
+    SELECT
+        PLAYER_ID, SEASON_ID, '{split_type}', {split_col}, COUNT(*),
+        SUM(MIN), SUM(PTS), SUM(FGM), SUM(FGA), SUM(FG3M), SUM(FG3A), SUM(FTM), SUM(FTA),
+        SUM(REB), SUM(AST), SUM(STL), SUM(BLK), SUM(PLUS_MINUS)
+    FROM PLAYER_GAME_LOGS
+    {where} {split_col} IS NOT NULL
+    GROUP BY PLAYER_ID, SEASON_ID, {split_col}
+"""
+
+SPLITS_INSERT = """
+    INSERT INTO PLAYER_SEASON_SPLITS (
+        PLAYER_ID, SEASON_ID, SPLIT_TYPE, SPLIT_VALUE, GP,
+        SUM_MIN, SUM_PTS, SUM_FGM, SUM_FGA, SUM_FG3M, SUM_FG3A, SUM_FTM, SUM_FTA,
+        SUM_REB, SUM_AST, SUM_STL, SUM_BLK, SUM_PLUS_MINUS
+    )
+"""
+
+# games with no opponent, location or result (rare, e.g. a game still in progress) are kept under '' so the cube
+# still adds up to the season summary
+CUBE_SELECT = """
+    SELECT
+        PLAYER_ID, SEASON_ID, COALESCE(OPPONENT, ''), COALESCE(HOME_AWAY, ''), COALESCE(WL, ''), COUNT(*),
+        SUM(MIN), SUM(PTS), SUM(FGM), SUM(FGA), SUM(FG3M), SUM(FG3A), SUM(FTM), SUM(FTA),
+        SUM(REB), SUM(AST), SUM(STL), SUM(BLK), SUM(TOV), SUM(PLUS_MINUS), SUM(GAME_SCORE), SUM(TSA)
+    FROM PLAYER_GAME_LOGS
+    {where}
+    GROUP BY PLAYER_ID, SEASON_ID, COALESCE(OPPONENT, ''), COALESCE(HOME_AWAY, ''), COALESCE(WL, '')
+"""
+
+CUBE_INSERT = """
+    INSERT INTO PLAYER_MATCHUP_CUBE (
+        PLAYER_ID, SEASON_ID, OPPONENT, HOME_AWAY, WL, GP,
+        SUM_MIN, SUM_PTS, SUM_FGM, SUM_FGA, SUM_FG3M, SUM_FG3A, SUM_FTM, SUM_FTA,
+        SUM_REB, SUM_AST, SUM_STL, SUM_BLK, SUM_TOV, SUM_PLUS_MINUS, SUM_GAME_SCORE, SUM_TSA
+    )
+"""
+
+# the game log column behind each split type
+SPLIT_COLUMNS = {
+    'HOME_AWAY': 'HOME_AWAY',
+    'WL': 'WL'
+}
+
+## Define a function to list the (player, season) groups present in a batch of cleaned logs
+def touched_groups(df):
+    groups = df[['PLAYER_ID', 'SEASON_ID']].drop_duplicates()
+    return [(int(player_id), str(season_id)) for player_id, season_id in zip(groups['PLAYER_ID'], groups['SEASON_ID'])]
+
+## Define a function to recompute only the given (player, season) groups, inside the caller's transaction
+def refresh_season_aggregates(cursor, groups):
+    for start in range(0, len(groups), REFRESH_CHUNK_SIZE):
+        chunk = groups[start:start + REFRESH_CHUNK_SIZE]
+        params = [value for group in chunk for value in group]
+        in_clause = f"(PLAYER_ID, SEASON_ID) IN ({', '.join(['(%s, %s)'] * len(chunk))})"
+
+        # delete and re-insert so groups that lost games are also corrected
+        cursor.execute(f'DELETE FROM PLAYER_SEASON_SUMMARY WHERE {in_clause}', params)
+        cursor.execute(SUMMARY_INSERT + SUMMARY_SELECT.format(where=f'WHERE {in_clause}'), params)
+
+        cursor.execute(f'DELETE FROM PLAYER_SEASON_SPLITS WHERE {in_clause}', params)
+        for split_type, split_col in SPLIT_COLUMNS.items():
+            cursor.execute(
+                SPLITS_INSERT + SPLITS_SELECT.format(split_type=split_type, split_col=split_col, where=f'WHERE {in_clause} AND'),
+                params
+            )
+
+        cursor.execute(f'DELETE FROM PLAYER_MATCHUP_CUBE WHERE {in_clause}', params)
+        cursor.execute(CUBE_INSERT + CUBE_SELECT.format(where=f'WHERE {in_clause}'), params)
+
+## Define a function to rebuild every aggregate table from scratch (first load or after a manual fix)
+@staged('rebuild_season_aggregates', rows_of=None)
+def rebuild_season_aggregates():
+    with pooled_connection() as conn:
+        cursor = conn.cursor()
+
+        cursor.execute('DELETE FROM PLAYER_SEASON_SUMMARY')
+        cursor.execute(SUMMARY_INSERT + SUMMARY_SELECT.format(where=''))
+
+        cursor.execute('DELETE FROM PLAYER_SEASON_SPLITS')
+        for split_type, split_col in SPLIT_COLUMNS.items():
+            cursor.execute(SPLITS_INSERT + SPLITS_SELECT.format(split_type=split_type, split_col=split_col, where='WHERE'))
+
+        cursor.execute('DELETE FROM PLAYER_MATCHUP_CUBE')
+        cursor.execute(CUBE_INSERT + CUBE_SELECT.format(where=''))
+
+        bump_data_version(cursor, GAMELOGS)
+        conn.commit()
+        cursor.close()
+
+    log_event('aggregates_rebuilt', 'Season summary, splits and matchup cube tables rebuilt successfully!')
@@ -0,0 +1,125 @@
+### THIS SCRIPT BENCHMARKS clean_gamelogs AGAINST THE ORIGINAL ROW-WISE IMPLEMENTATION
+## Import libraries
+import argparse
+import time
+import tracemalloc
+import numpy as np
+import pandas as pd
+from clean_data import clean_gamelogs
+
+TEAMS = [
+    'ATL', 'BOS', 'BKN', 'CHA', 'CHI', 'CLE', 'DAL', 'DEN', 'DET', 'GSW',
+    'HOU', 'IND', 'LAC', 'LAL', 'MEM', 'MIA', 'MIL', 'MIN', 'NOP', 'NYK',
+    'OKC', 'ORL', 'PHI', 'PHX', 'POR', 'SAC', 'SAS', 'TOR', 'UTA', 'WAS'
+]
+
+## Define a function to build a raw frame shaped like pull_gamelogs output
+def make_raw_gamelogs(n_rows, seed=0):
+    rng = np.random.default_rng(seed)
+
+    team = rng.choice(TEAMS, n_rows)
+    opponent = rng.choice(TEAMS, n_rows)
+    home = rng.random(n_rows) < 0.5
+    matchup = np.where(home, np.char.add(np.char.add(team, ' vs. '), opponent), np.char.add(np.char.add(team, ' @ '), opponent))
+
+    fga = rng.integers(0, 30, n_rows)
+    fgm = rng.binomial(fga, 0.46)
+    fg3a = rng.integers(0, 12, n_rows)
+    fg3m = rng.binomial(fg3a, 0.36)
+    fta = rng.integers(0, 12, n_rows)
+    ftm = rng.binomial(fta, 0.78)
+    oreb = rng.integers(0, 5, n_rows)
+    dreb = rng.integers(0, 12, n_rows)
+    player_id = rng.integers(200000, 1700000, n_rows)
+    game_date = pd.to_datetime('2021-10-19') + pd.to_timedelta(rng.integers(0, 1300, n_rows), unit='D')
+
+    return pd.DataFrame({
+        'SEASON_ID': rng.choice(['22021', '22022', '22023', '22024'], n_rows),
+        'Player_ID': player_id,
+        'Game_ID': np.char.zfill(rng.integers(22000001, 22401230, n_rows).astype(str), 10),
+        'GAME_DATE': game_date.strftime('%b %d, %Y').str.upper(),
+        'MATCHUP': matchup,
+        'WL': rng.choice(['W', 'L'], n_rows),
+        'MIN': rng.integers(0, 48, n_rows),
+        'FGM': fgm, 'FGA': fga, 'FG_PCT': np.round(np.divide(fgm, fga, out=np.zeros(n_rows), where=fga > 0), 3),
+        'FG3M': fg3m, 'FG3A': fg3a, 'FG3_PCT': np.round(np.divide(fg3m, fg3a, out=np.zeros(n_rows), where=fg3a > 0), 3),
+        'FTM': ftm, 'FTA': fta, 'FT_PCT': np.round(np.divide(ftm, fta, out=np.zeros(n_rows), where=fta > 0), 3),
+        'OREB': oreb, 'DREB': dreb, 'REB': oreb + dreb,
+        'AST': rng.integers(0, 14, n_rows), 'STL': rng.integers(0, 5, n_rows),
+        'BLK': rng.integers(0, 5, n_rows), 'TOV': rng.integers(0, 7, n_rows),
+        'PF': rng.integers(0, 6, n_rows), 'PTS': 2 * (fgm - fg3m) + 3 * fg3m + ftm,
+        'PLUS_MINUS': rng.integers(-30, 30, n_rows).astype(float),
+        'VIDEO_AVAILABLE': 1,
+        'PLAYER_ID': player_id,
+        'PLAYER_NAME': 'Synthetic Player'
+    })
+
+## Define the original row-wise implementation so the two can be compared
+def clean_gamelogs_legacy(raw_df):
+    df = raw_df.copy()
+    df['GAME_DATE'] = pd.to_datetime(df['GAME_DATE'])
+
+    num_cols = [
+        'MIN', 'FGM', 'FGA', 'FG_PCT', 'FG3M', 'FG3A', 'FG3_PCT',
+        'FTM', 'FTA', 'FT_PCT', 'OREB', 'DREB', 'REB', 'AST', 'STL',
+        'BLK', 'TOV', 'PF', 'PTS', 'PLUS_MINUS'
+    ]
+    for col in num_cols:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0)
+
+    df['TEAM'] = df['MATCHUP'].apply(lambda x: x.split(' ')[0])
+    df['HOME_AWAY'] = df['MATCHUP'].apply(lambda x: 'A' if '@' in x else 'H')
+    df['OPPONENT'] = df['MATCHUP'].apply(lambda x: x.split(' ')[-1])
+    df = df.rename(columns={'Game_ID':'GAME_ID'})
+
+    mapped_cols = [
+        'PLAYER_ID', 'SEASON_ID', 'GAME_ID', 'GAME_DATE',
+        'TEAM', 'OPPONENT', 'HOME_AWAY', 'WL',
+        'MIN', 'PTS',
+        'FGM', 'FGA', 'FG_PCT',
+        'FG3M', 'FG3A', 'FG3_PCT',
+        'FTM', 'FTA', 'FT_PCT',
+        'OREB', 'DREB', 'REB',
+        'AST', 'STL', 'BLK',
+        'TOV', 'PF', 'PLUS_MINUS'
+    ]
+    return df[mapped_cols]
+
+## Define a function to time one implementation and record its peak traced memory
+def measure(fn, raw_df, repeats):
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = fn(raw_df)
+        times.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    fn(raw_df)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        'seconds': min(times),
+        'rows_per_sec': len(raw_df) / min(times),
+        'peak_mb': peak / 1024 ** 2,
+        'result_mb': result.memory_usage(deep=True).sum() / 1024 ** 2
+    }
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark clean_gamelogs against the original implementation.')
+    parser.add_argument('--rows', type=int, nargs='+', default=[10_000, 100_000, 500_000])
+    parser.add_argument('--repeats', type=int, default=3)
+    args = parser.parse_args()
+
+    for n_rows in args.rows:
+        raw_df = make_raw_gamelogs(n_rows)
+
+        legacy = measure(clean_gamelogs_legacy, raw_df, args.repeats)
+        current = measure(clean_gamelogs, raw_df, args.repeats)
+
+        print(f'\n{n_rows:,} rows')
+        print(f'{"":<10}{"seconds":>10}{"rows/sec":>14}{"peak MB":>10}{"output MB":>11}')
+        for name, r in [('legacy', legacy), ('current', current)]:
+            print(f'{name:<10}{r["seconds"]:>10.3f}{r["rows_per_sec"]:>14,.0f}{r["peak_mb"]:>10.1f}{r["result_mb"]:>11.1f}')
+        print(f'speedup {legacy["seconds"] / current["seconds"]:.1f}x, peak memory {current["peak_mb"] / legacy["peak_mb"]:.2f}x')
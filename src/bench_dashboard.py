@@ -0,0 +1,169 @@
+### THIS SCRIPT MEASURES DASHBOARD SERVER TIME PER INTERACTION: A WHOLE-SCRIPT RERUN VS THE FRAGMENT THE WIDGET NOW RERUNS
+## Usage (from src): python bench_dashboard.py --repeats 5
+## AppTest.run() always reruns the whole script, so fragment reruns are driven the way the browser asks for them,
+## with the fragment's id queued on the rerun request. Run a copy of this script from an older tree's src to time that app.
+## Import libraries
+import argparse
+import json
+import os
+import subprocess
+import time
+from datetime import datetime
+from functools import partial
+from unittest.mock import patch
+import numpy as np
+from streamlit.runtime.scriptrunner import RerunData
+from streamlit.testing.v1 import AppTest, local_script_runner
+from metrics import metrics
+
+APP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'streamlit_app.py')
+
+# results are written next to the pipeline benchmarks, one file per run, named by commit
+DEFAULT_RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '.bench')
+
+# each interaction as (name, page section it reruns, values it cycles through, how to set the widget)
+# the search values are filled in with prefixes of the selected player's name, so the selection doesn't change
+# (the slider and the search are found by label, they had no key before the sections became fragments)
+INTERACTIONS = [
+    ('recent games slider', 'recent_games', [15, 10], lambda at, v: labelled(at.slider, 'Number of games to show').set_value(v)),
+    ('trend chart view', 'seasons', ['All Stats', 'Shooting %', 'Scoring'], lambda at, v: at.radio(key='trend_view').set_value(v)),
+    ('splits view', 'splits', ['Wins vs Losses', 'Custom Splits', 'Home vs Away'], lambda at, v: at.radio(key='splits_view').set_value(v)),
+    ('rolling stat', 'form', ['REB', 'AST', 'PTS'], lambda at, v: at.selectbox(key='rolling_stat').set_value(v)),
+    ('leaderboard view', 'leaderboards', ['Best Stretches', 'Streaks'], lambda at, v: at.radio(key='leaderboard_view').set_value(v)),
+    ('player search', 'player_picker', None, lambda at, v: labelled(at.text_input, 'Search player name').set_value(v))
+]
+
+## Define a function to find a widget by its label
+def labelled(widgets, label):
+    return next(w for w in widgets if w.label == label)
+
+## Define a function to find the commit being benchmarked
+def git_commit():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], text=True, stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+## Define a function to run the app once, or only one fragment of it, returning the wall time and the server time of each page section
+def timed_run(at, fragment_id=None):
+    metrics.reset()
+    start = time.perf_counter()
+    if fragment_id is None:
+        at.run()
+    else:
+        # the rerun request a widget inside the fragment sends: only the queued fragment runs
+        with patch.object(local_script_runner, 'RerunData', partial(RerunData, fragment_id_queue=[fragment_id])):
+            at.run()
+    seconds = time.perf_counter() - start
+
+    if at.exception:
+        raise RuntimeError(f'The dashboard raised: {at.exception[0].message}')
+
+    sections = {row['section']: row['mean_ms'] for row in metrics.summary('dashboard_section_seconds')}
+    return 1000 * seconds, sections
+
+## Define a function to find the fragment each page section runs in, by rerunning each stored fragment on its own
+## (apps from before the sections became fragments have none, every interaction there reruns the whole script)
+def fragment_sections(at):
+    sections = {}
+    for fragment_id in list(at._fragment_storage._fragments):
+        _, ran = timed_run(at, fragment_id)
+        sections.update({section: fragment_id for section in ran})
+
+    # back to a whole page, a fragment rerun leaves only that fragment's elements in the tree
+    at.run()
+    return sections
+
+## Define a function to pick the player the interactions run against (the top scorer unless one is named)
+def select_player(at, player_name=None):
+    picker = next(s for s in at.selectbox if s.label == 'Select Player')
+    if player_name is None:
+        labelled(at.selectbox, 'Sort by').set_value('PPG (High to Low)')
+        at.run()
+        picker = next(s for s in at.selectbox if s.label == 'Select Player')
+        player_name = picker.options[0]
+
+    picker.set_value(player_name)
+    at.run()
+    return player_name
+
+## Define a function to time every interaction: the fragment rerun the widget sends, and a whole-script rerun with the same state
+## interactions whose widget the app doesn't have are skipped (the views were client-side tabs before, switching them ran nothing)
+def bench_interactions(at, player_name, repeats, fragments):
+    results = []
+
+    for name, section, values, apply in INTERACTIONS:
+        values = values or [player_name[:3], player_name[:5], '']
+        try:
+            apply(at, values[0])
+        except (KeyError, StopIteration):
+            print(f'Skipping {name}: the app has no such widget')
+            continue
+
+        # one pass to load whatever the section caches, then the timed passes
+        for value in values:
+            apply(at, value)
+            at.run()
+
+        full_ms, fragment_ms = [], []
+        for i in range(repeats * len(values)):
+            apply(at, values[i % len(values)])
+            if section in fragments:
+                fragment_ms.append(timed_run(at, fragments[section])[0])
+            full_ms.append(timed_run(at)[0])
+
+        fragment = float(np.median(fragment_ms)) if fragment_ms else None
+        results.append({
+            'interaction': name,
+            'section': section,
+            'full_rerun_ms': round(float(np.median(full_ms)), 1),
+            'fragment_rerun_ms': round(fragment, 1) if fragment else None,
+            'speedup': round(float(np.median(full_ms)) / fragment, 1) if fragment else None
+        })
+
+    return results
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Time each dashboard interaction as a whole-script rerun and as the fragment it reruns.')
+    parser.add_argument('--player', help='player to run the interactions against (default: the top scorer)')
+    parser.add_argument('--repeats', type=int, default=5, help='timed passes over each interaction value')
+    parser.add_argument('--timeout', type=float, default=120.0, help='seconds allowed per script run')
+    parser.add_argument('--output', help='results file (default .bench/dashboard-<commit>-<timestamp>.json)')
+    args = parser.parse_args()
+
+    # keep the pipeline-style logs of the loaders out of the report
+    os.environ.setdefault('LOG_LEVEL', 'WARNING')
+
+    at = AppTest.from_file(APP_PATH, default_timeout=args.timeout)
+    cold_ms, _ = timed_run(at)
+    player_name = select_player(at, args.player)
+    warm_ms, warm_sections = timed_run(at)
+
+    fragments = fragment_sections(at)
+    results = bench_interactions(at, player_name, args.repeats, fragments)
+
+    print(f'Backend {os.getenv("DASHBOARD_BACKEND", "mysql")}, player {player_name}')
+    print(f'Cold page load {cold_ms:.0f} ms, warm full run {warm_ms:.0f} ms, {len(fragments)} sections run as fragments')
+    print(f'\n{"interaction":<22}{"section":<16}{"full rerun ms":>15}{"fragment ms":>13}{"speedup":>9}')
+    for r in results:
+        fragment = f'{r["fragment_rerun_ms"]:>13.1f}{r["speedup"]:>8.1f}x' if r['fragment_rerun_ms'] else f'{"-":>13}{"-":>9}'
+        print(f'{r["interaction"]:<22}{r["section"]:<16}{r["full_rerun_ms"]:>15.1f}{fragment}')
+
+    commit = git_commit()
+    output = args.output or os.path.join(DEFAULT_RESULTS_DIR, f'dashboard-{commit}-{datetime.now():%Y%m%dT%H%M%S}.json')
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+
+    with open(output, 'w') as f:
+        json.dump({
+            'commit': commit,
+            'run_at': datetime.now().isoformat(),
+            'config': vars(args),
+            'player': player_name,
+            'cold_ms': round(cold_ms, 1),
+            'warm_full_run_ms': round(warm_ms, 1),
+            'warm_sections_ms': warm_sections,
+            'fragment_sections': sorted(fragments),
+            'results': results
+        }, f, indent=2)
+
+    print(f'\nResults saved to {output}')
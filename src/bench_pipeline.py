@@ -0,0 +1,229 @@
+### THIS SCRIPT BENCHMARKS THE PIPELINE END TO END (PULL -> CLEAN -> INSERT) ON SYNTHETIC DATA WITH A STUBBED NBA_API
+## Usage (from src): python bench_pipeline.py --seasons 1 10 30 --players 100 --db null
+## Import libraries
+import argparse
+import json
+import os
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+import multiprocessing
+from synthetic_data import make_players
+from nba_api_stub import StubNBAApi
+from pull_data import pull_gamelogs, pull_metadata
+from clean_data import clean_gamelogs, clean_metadata
+from row_hashes import row_hashes
+from db_insert import (
+    insert_gamelogs, insert_player_metadata, build_insert_query, frame_to_rows, executemany_in_batches,
+    GAMELOG_COLUMNS, GAMELOG_UPDATE, METADATA_COLUMNS, METADATA_UPDATE
+)
+from seasons import current_season, seasons_between
+from seed_players import remove_seed
+from stream_pipeline import stream_gamelogs, DEFAULT_QUEUE_SIZE
+from metrics import metrics
+
+# results are written here, one file per run, named by commit so runs can be compared
+DEFAULT_RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '.bench')
+
+## Define a stand-in connection that accepts every statement without a server, to time the client side of inserts
+class NullCursor:
+
+    def __init__(self):
+        self.rowcount = 0
+
+    def execute(self, query, params=None):
+        self.rowcount = 1
+
+    def executemany(self, query, rows):
+        self.rowcount = len(rows)
+
+    def close(self):
+        pass
+
+class NullConnection:
+
+    def cursor(self):
+        return NullCursor()
+
+    def commit(self):
+        pass
+
+## Define a function to read the process's peak resident set size in MB
+def peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    # linux reports kilobytes, macos reports bytes
+    return peak / 1024 ** 2 if sys.platform == 'darwin' else peak / 1024
+
+## Define a function to run one stage and record its wall time, throughput and the peak RSS so far
+def run_stage(stages, name, fn, rows_of=len):
+    start = time.perf_counter()
+    result = fn()
+    seconds = time.perf_counter() - start
+
+    rows = rows_of(result)
+    stages[name] = {
+        'seconds': round(seconds, 4),
+        'rows': rows,
+        'rows_per_sec': round(rows / max(seconds, 1e-9), 1),
+        'peak_rss_mb': round(peak_rss_mb(), 1)
+    }
+    print(f'{name:<18}{seconds:>10.2f}s{rows:>10,} rows{rows / max(seconds, 1e-9):>14,.0f} rows/sec{peak_rss_mb():>10.0f} MB')
+    return result
+
+## Define a function to insert with the null connection, same hashing, row building and batching as db_insert
+## (every row counts as changed, there are no stored hashes to compare with)
+def null_insert(df, table, columns, update_clause, batch_size):
+    df = df.assign(ROW_HASH=row_hashes(df, columns))
+    columns = columns + ['ROW_HASH']
+    rows = frame_to_rows(df, columns)
+    executemany_in_batches(NullConnection(), build_insert_query(table, columns, update_clause), rows, batch_size, table=table)
+    return df
+
+## Define functions to insert into mysql that hand the frame back so its rows can be counted
+def mysql_insert_metadata(df):
+    insert_player_metadata(df)
+    return df
+
+def mysql_insert_gamelogs(df, mode):
+    insert_gamelogs(df, mode=mode)
+    return df
+
+## Define a function to stream game logs through pull -> clean -> insert, counting the rows that reached the insert stage
+def stream_insert(player_list, api, db, requests_per_second, max_workers, queue_size):
+    def null_insert_gamelogs(df, batch_size, mode):
+        null_insert(df, 'PLAYER_GAME_LOGS', GAMELOG_COLUMNS, GAMELOG_UPDATE, batch_size)
+
+    summary = stream_gamelogs(
+        'ALL', requests_per_second, max_workers, endpoint=api.PlayerGameLog, cache=False, player_list=player_list,
+        queue_size=queue_size, insert_fn=insert_gamelogs if db == 'mysql' else null_insert_gamelogs
+    )
+    return summary['rows_stored']
+
+## Define a function to benchmark one scale (runs in its own process so peak RSS isn't carried between scales)
+## stream=True replaces the three game log stages with one overlapped stream_gamelogs stage
+def bench_scale(n_seasons, n_players, db, insert_mode, latency, error_rate, requests_per_second, max_workers, seed, stream=False, queue_size=DEFAULT_QUEUE_SIZE):
+    first_start = int(current_season()[:4]) - n_seasons + 1
+    seasons = seasons_between(f'{first_start}-{str(first_start + 1)[-2:]}')
+    player_list = make_players(n_players, seed)
+    api = StubNBAApi(player_list, seasons, latency=latency, error_rate=error_rate, seed=seed)
+
+    checkpoint_dir = tempfile.mkdtemp(prefix='bench_checkpoints_')
+    stages = {}
+    print(f'\n{n_seasons} seasons x {n_players} players ({db} db)')
+
+    try:
+        raw_metadata = run_stage(stages, 'pull_metadata', lambda: pull_metadata(
+            requests_per_second, max_workers, endpoint=api.CommonPlayerInfo, cache=False,
+            player_list=player_list, checkpoint_dir=checkpoint_dir
+        ))
+        metadata_df = run_stage(stages, 'clean_metadata', lambda: clean_metadata(raw_metadata))
+
+        if db == 'mysql':
+            run_stage(stages, 'insert_metadata', lambda: mysql_insert_metadata(metadata_df))
+        else:
+            run_stage(stages, 'insert_metadata', lambda: null_insert(metadata_df, 'PLAYER_METADATA', METADATA_COLUMNS, METADATA_UPDATE, 1000))
+
+        if stream:
+            run_stage(stages, 'stream_gamelogs', lambda: stream_insert(player_list, api, db, requests_per_second, max_workers, queue_size), rows_of=lambda rows: rows)
+        else:
+            raw_gamelogs = run_stage(stages, 'pull_gamelogs', lambda: pull_gamelogs(
+                'ALL', requests_per_second, max_workers, endpoint=api.PlayerGameLog, cache=False,
+                player_list=player_list, checkpoint_dir=checkpoint_dir
+            ))
+            gamelogs_df = run_stage(stages, 'clean_gamelogs', lambda: clean_gamelogs(raw_gamelogs))
+
+            if db == 'mysql':
+                run_stage(stages, 'insert_gamelogs', lambda: mysql_insert_gamelogs(gamelogs_df, insert_mode))
+            else:
+                run_stage(stages, 'insert_gamelogs', lambda: null_insert(gamelogs_df, 'PLAYER_GAME_LOGS', GAMELOG_COLUMNS, GAMELOG_UPDATE, 5000))
+    finally:
+        shutil.rmtree(checkpoint_dir, ignore_errors=True)
+        if db == 'mysql':
+            remove_seed()
+
+    return {
+        'seasons': n_seasons,
+        'players': n_players,
+        'stream': stream,
+        'game_logs': stages['stream_gamelogs' if stream else 'clean_gamelogs']['rows'],
+        'total_seconds': round(sum(stage['seconds'] for stage in stages.values()), 4),
+        'stages': stages,
+        'stub_api': api.stats(),
+        'api_latency': metrics.summary('api_request_seconds'),
+        'api_retries': metrics.counter('api_retries_total', endpoint=api.PlayerGameLog.__name__) + metrics.counter('api_retries_total', endpoint=api.CommonPlayerInfo.__name__),
+        'db_batches': metrics.summary('db_batch_seconds')
+    }
+
+## Define a function to find the commit being benchmarked
+def git_commit():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], text=True, stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+## Define a function to print each stage's change against an earlier results file
+def compare(results, baseline_path):
+    with open(baseline_path) as f:
+        baseline = {r['seasons']: r for r in json.load(f)['results']}
+
+    print(f'\nCompared with {baseline_path} (time ratio, >1 is slower)')
+    for result in results:
+        before = baseline.get(result['seasons'])
+        if before is None:
+            continue
+        for name, stage in result['stages'].items():
+            if name in before['stages'] and before['stages'][name]['seconds'] > 0:
+                ratio = stage['seconds'] / before['stages'][name]['seconds']
+                flag = '  <-- regression' if ratio > 1.2 else ''
+                print(f'{result["seasons"]:>3} seasons  {name:<18}{ratio:>6.2f}x{flag}')
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark pull -> clean -> insert on synthetic data with a stubbed nba_api.')
+    parser.add_argument('--seasons', type=int, nargs='+', default=[1, 10, 30], help='scales to run, in seasons per player')
+    parser.add_argument('--players', type=int, default=100)
+    parser.add_argument('--db', choices=['null', 'mysql'], default='null', help="'null' times the client side only, 'mysql' writes to the configured database")
+    parser.add_argument('--insert-mode', choices=['batched', 'load_data'], default='batched')
+    parser.add_argument('--latency', type=float, default=0.05, help='mean stub api latency in seconds')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='share of stub api requests that fail')
+    parser.add_argument('--requests-per-second', type=float, default=50.0)
+    parser.add_argument('--max-workers', type=int, default=8)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--stream', action='store_true', help='run the game logs through stream_pipeline instead of pull, clean and insert in turn')
+    parser.add_argument('--queue-size', type=int, default=DEFAULT_QUEUE_SIZE, help='players buffered between stream stages')
+    parser.add_argument('--output', help='results file (default .bench/pipeline-<commit>-<timestamp>.json)')
+    parser.add_argument('--baseline', help='an earlier results file to compare against')
+    args = parser.parse_args()
+
+    # keep the per-player progress logs out of the timings and the report (the spawned processes inherit this)
+    os.environ.setdefault('LOG_LEVEL', 'WARNING')
+
+    results = []
+    for n_seasons in args.seasons:
+        with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context('spawn')) as executor:
+            results.append(executor.submit(
+                bench_scale, n_seasons, args.players, args.db, args.insert_mode, args.latency,
+                args.error_rate, args.requests_per_second, args.max_workers, args.seed, args.stream, args.queue_size
+            ).result())
+
+    commit = git_commit()
+    output = args.output or os.path.join(DEFAULT_RESULTS_DIR, f'pipeline-{commit}-{datetime.now():%Y%m%dT%H%M%S}.json')
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+
+    with open(output, 'w') as f:
+        json.dump({
+            'commit': commit,
+            'run_at': datetime.now().isoformat(),
+            'config': vars(args),
+            'results': results
+        }, f, indent=2)
+
+    print(f'\nResults saved to {output}')
+
+    if args.baseline:
+        compare(results, args.baseline)
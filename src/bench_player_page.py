@@ -0,0 +1,46 @@
+### THIS SCRIPT MEASURES COLD PLAYER PAGE LOAD TIME: THE BUNDLE EVERY PAGE VIEW LOADS AND THE FULL LOG THE CUSTOM SPLITS LOAD
+## Usage (from src): SNAPSHOT_DIR=../.bench/snapshot python bench_player_page.py --backend snapshot
+## Import libraries
+import argparse
+import os
+import time
+import numpy as np
+from player_bundle import load_player_bundle, load_player_game_logs, read_mysql, read_mysql_many
+from snapshot import SnapshotReader, DEFAULT_SNAPSHOT_DIR
+
+## Define a function to time a loader over a list of players
+def time_loader(loader, player_ids):
+    timings = []
+    for player_id in player_ids:
+        start = time.perf_counter()
+        loader(player_id)
+        timings.append(1000 * (time.perf_counter() - start))
+    return np.array(timings)
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Time cold player page loads against mysql or the published snapshot.')
+    parser.add_argument('--backend', choices=['snapshot', 'mysql'], default='mysql')
+    parser.add_argument('--players', type=int, default=50, help='number of players to sample, the ones with the most games')
+    args = parser.parse_args()
+
+    if args.backend == 'snapshot':
+        reader = SnapshotReader(os.getenv('SNAPSHOT_DIR', DEFAULT_SNAPSHOT_DIR))
+        run_query, run_queries = reader.query, reader.query_many
+    else:
+        run_query, run_queries = read_mysql, read_mysql_many
+    player_ids = run_query(
+        f'SELECT PLAYER_ID FROM PLAYER_SEASON_SUMMARY GROUP BY PLAYER_ID ORDER BY SUM(GP) DESC LIMIT {int(args.players)}'
+    )['PLAYER_ID'].tolist()
+
+    # warm the pool or the reader so connection setup isn't billed to the first player
+    load_player_bundle(player_ids[0], run_queries=run_queries)
+
+    results = {
+        'bundle (every page view)': time_loader(lambda player_id: load_player_bundle(player_id, run_queries=run_queries), player_ids),
+        'game logs (custom splits)': time_loader(lambda player_id: load_player_game_logs(player_id, run_query=run_query), player_ids)
+    }
+
+    print(f'Cold player page latency on {args.backend} over the {len(player_ids)} players with the most games (ms)')
+    print(f'{"":<28}{"mean":>8}{"p50":>8}{"p95":>8}')
+    for name, timings in results.items():
+        print(f'{name:<28}{timings.mean():>8.1f}{np.percentile(timings, 50):>8.1f}{np.percentile(timings, 95):>8.1f}')
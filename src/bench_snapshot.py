@@ -0,0 +1,76 @@
+### THIS SCRIPT TIMES EVERY DASHBOARD QUERY AGAINST THE PUBLISHED SNAPSHOT (AND OPTIONALLY MYSQL), AGAINST THE 10 MS TARGET
+## Usage (from src): python synthetic_snapshot.py --snapshot-dir ../.bench/snapshot && SNAPSHOT_DIR=../.bench/snapshot python bench_snapshot.py
+## Import libraries
+import argparse
+import os
+import time
+import numpy as np
+from dashboard_queries import LOADER_QUERIES, PLAYER_PAGE_QUERIES
+from matchup_cube import opponent_splits_query, best_vs_team_query
+from player_bundle import read_mysql
+from snapshot import SnapshotReader, DEFAULT_SNAPSHOT_DIR
+
+# per-query target for the snapshot read path
+TARGET_MS = 10.0
+
+# queries that read every player at once, run once per pass rather than once per player
+GLOBAL_QUERIES = ['get_all_players', 'get_rankings', 'get_data_version', 'get_search_index', 'get_rolling', 'get_opponents']
+
+## Define a function to list every query the dashboard runs for a player, by name
+def player_queries(player_id, opponent):
+    queries = {
+        name: query.format(player_id=player_id, num_games=10, season_filter='')
+        for name, query in {**LOADER_QUERIES, **PLAYER_PAGE_QUERIES}.items() if name not in GLOBAL_QUERIES
+    }
+    queries['opponent_splits'] = opponent_splits_query(player_id)
+    queries['best_vs_team'] = best_vs_team_query(opponent)
+    return queries
+
+## Define a function to time each query over the sampled players, in milliseconds
+def time_queries(run_query, player_ids, opponent, repeats):
+    timings = {}
+
+    def timed(name, query):
+        start = time.perf_counter()
+        run_query(query)
+        timings.setdefault(name, []).append(1000 * (time.perf_counter() - start))
+
+    # one untimed pass so file metadata and the connection are warm, like a dashboard that has served a page
+    for name, query in {**player_queries(player_ids[0], opponent), **{n: LOADER_QUERIES[n] for n in GLOBAL_QUERIES}}.items():
+        run_query(query)
+
+    for _ in range(repeats):
+        for name in GLOBAL_QUERIES:
+            timed(name, LOADER_QUERIES[name])
+        for player_id in player_ids:
+            for name, query in player_queries(player_id, opponent).items():
+                timed(name, query)
+
+    return {name: np.array(values) for name, values in timings.items()}
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Time every dashboard query against the snapshot, and against mysql with --mysql.')
+    parser.add_argument('--players', type=int, default=20, help='number of players to sample, the ones with the most games')
+    parser.add_argument('--repeats', type=int, default=3, help='timed passes over the sampled players')
+    parser.add_argument('--mysql', action='store_true', help='also time the same queries against the configured mysql database')
+    args = parser.parse_args()
+
+    reader = SnapshotReader(os.getenv('SNAPSHOT_DIR', DEFAULT_SNAPSHOT_DIR))
+    player_ids = reader.query(
+        f'SELECT PLAYER_ID FROM PLAYER_SEASON_SUMMARY GROUP BY PLAYER_ID ORDER BY SUM(GP) DESC LIMIT {int(args.players)}'
+    )['PLAYER_ID'].tolist()
+    opponent = reader.query(LOADER_QUERIES['get_opponents'])['OPPONENT'].iloc[0]
+    game_logs = int(reader.query('SELECT COUNT(*) AS N FROM PLAYER_GAME_LOGS')['N'].iloc[0])
+
+    backends = {'snapshot': reader.query}
+    if args.mysql:
+        backends['mysql'] = read_mysql
+    results = {backend: time_queries(run_query, player_ids, opponent, args.repeats) for backend, run_query in backends.items()}
+
+    print(f'Snapshot {reader.version}: {game_logs:,} game logs, {len(player_ids)} players x {args.repeats} passes (ms)')
+    print(f'{"query":<26}' + ''.join(f'{backend + " p50":>14}{backend + " p95":>14}' for backend in backends))
+    for name in results['snapshot']:
+        row = ''.join(f'{np.percentile(results[b][name], 50):>14.1f}{np.percentile(results[b][name], 95):>14.1f}' for b in backends)
+        flag = '' if name in GLOBAL_QUERIES or np.percentile(results['snapshot'][name], 50) <= TARGET_MS else f'  over {TARGET_MS:.0f} ms'
+        print(f'{name:<26}{row}{flag}')
+    print(f'\nWhole-table queries ({", ".join(GLOBAL_QUERIES)}) run once per data version and are cached, not per page view')
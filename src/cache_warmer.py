@@ -0,0 +1,89 @@
+### THIS SCRIPT WARMS THE DASHBOARD CACHE IN THE BACKGROUND AT STARTUP AND AFTER EVERY DATA VERSION CHANGE
+## Import libraries
+from collections import Counter
+import logging
+import threading
+import time
+from metrics import log_event
+
+# how many player pages to warm after the landing player
+WARM_PLAYERS = 25
+
+## Define a counter of player page views, used to pick which pages to warm
+class HitCounter:
+
+    def __init__(self):
+        self.counts = Counter()
+        self.lock = threading.Lock()
+
+    def record(self, player_id):
+        with self.lock:
+            self.counts[int(player_id)] += 1
+
+    def top(self, n):
+        with self.lock:
+            return [player_id for player_id, _ in self.counts.most_common(n)]
+
+    def __len__(self):
+        return len(self.counts)
+
+## Define the warmer, plan(versions) yields (key, version, loader) jobs and may read earlier jobs' results from the cache
+class CacheWarmer:
+
+    def __init__(self, cache, plan):
+        self.cache = cache
+        self.plan = plan
+        self.lock = threading.Lock()
+        self.thread = None
+        self.warmed_versions = None
+
+        self.runs = 0
+        self.jobs = 0
+        self.failures = 0
+        self.last_seconds = None
+
+    # start a warm run on a background thread if the data changed since the last one and none is running
+    def maybe_warm(self, versions):
+        with self.lock:
+            if versions == self.warmed_versions or (self.thread is not None and self.thread.is_alive()):
+                return False
+
+            self.warmed_versions = versions
+            self.thread = threading.Thread(target=self.run, args=(versions,), name='cache-warmer', daemon=True)
+            self.thread.start()
+            return True
+
+    # one job at a time so warming never takes more than one database connection from visitors
+    def run(self, versions):
+        start = time.perf_counter()
+
+        try:
+            for key, version, loader in self.plan(versions):
+                future = self.cache.warm(key, version, loader)
+                if future is None:
+                    continue
+                try:
+                    future.result()
+                    self.jobs += 1
+                except Exception as e:
+                    self.failures += 1
+                    log_event('cache_warm_failed', f'Cache warmer failed on {key}: {e}', logging.WARNING, key=key, error=repr(e))
+        except Exception as e:
+            # a broken plan (e.g. the database is down) is retried on the next rerun
+            self.failures += 1
+            with self.lock:
+                self.warmed_versions = None
+            log_event('cache_warmer_stopped', f'Cache warmer stopped: {e}', logging.WARNING, error=repr(e))
+
+        self.runs += 1
+        self.last_seconds = time.perf_counter() - start
+
+    def stats(self):
+        return {
+            'running': self.thread is not None and self.thread.is_alive(),
+            'warmed_versions': self.warmed_versions,
+            'runs': self.runs,
+            'jobs': self.jobs,
+            'failures': self.failures,
+            'last_run_seconds': self.last_seconds
+        }
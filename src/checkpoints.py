@@ -0,0 +1,91 @@
+### THIS SCRIPT SAVES EACH PLAYER'S PULL AS SOON AS IT ARRIVES SO AN INTERRUPTED RUN CAN BE RESUMED
+## Import libraries
+import json
+import os
+import shutil
+import time
+import pandas as pd
+from metrics import log_event
+
+# default location of the checkpoint store
+DEFAULT_CHECKPOINT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '.checkpoints')
+
+## Define the checkpoint store for a single pull job (e.g. gamelogs or metadata)
+class CheckpointStore:
+
+    def __init__(self, job, params, player_ids, resume=False, checkpoint_dir=DEFAULT_CHECKPOINT_DIR):
+        self.job_dir = os.path.join(os.path.abspath(checkpoint_dir), job)
+        self.manifest_path = os.path.join(self.job_dir, 'manifest.json')
+        self.manifest = None
+
+        if resume and os.path.exists(self.manifest_path):
+            with open(self.manifest_path) as f:
+                manifest = json.load(f)
+
+            # only pick up a previous run if it was pulling the same thing and never finished (a finished run's pickles are stale)
+            if manifest.get('status') == 'complete':
+                log_event('checkpoint_reset', f'Previous {job} run already finished, starting a fresh run', job=job)
+            elif manifest['params'] == params:
+                self.manifest = manifest
+                for player_id in player_ids:
+                    self.manifest['players'].setdefault(str(player_id), 'pending')
+                log_event('checkpoint_resumed', f'Resuming {job} pull: {len(self.done_ids())}/{len(player_ids)} players already done',
+                          job=job, done=len(self.done_ids()), players=len(player_ids))
+            else:
+                log_event('checkpoint_reset', f'Previous {job} run used {manifest["params"]}, starting a fresh run', job=job)
+
+        if self.manifest is None:
+            shutil.rmtree(self.job_dir, ignore_errors=True)
+            os.makedirs(self.job_dir, exist_ok=True)
+            self.manifest = {
+                'job': job,
+                'params': params,
+                'started_at': time.time(),
+                'status': 'running',
+                'players': {str(player_id): 'pending' for player_id in player_ids},
+                'errors': {}
+            }
+
+        self.manifest['status'] = 'running'
+        self.write_manifest()
+
+    def path(self, player_id):
+        return os.path.join(self.job_dir, f'{player_id}.pkl')
+
+    # write the manifest to a temp file and swap it in so it is never left half written
+    def write_manifest(self):
+        self.manifest['updated_at'] = time.time()
+        tmp_path = f'{self.manifest_path}.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(self.manifest, f)
+        os.replace(tmp_path, self.manifest_path)
+
+    def done_ids(self):
+        return [int(player_id) for player_id, status in self.manifest['players'].items() if status == 'done']
+
+    # persist one player's result and mark them done
+    def save(self, player_id, frame):
+        tmp_path = f'{self.path(player_id)}.tmp'
+        pd.to_pickle(frame, tmp_path)
+        os.replace(tmp_path, self.path(player_id))
+
+        self.manifest['players'][str(player_id)] = 'done'
+        self.manifest['errors'].pop(str(player_id), None)
+        self.write_manifest()
+
+    def fail(self, player_id, error):
+        self.manifest['players'][str(player_id)] = 'failed'
+        self.manifest['errors'][str(player_id)] = str(error)
+        self.write_manifest()
+
+    # load every result saved so far as {PLAYER_ID: frame}
+    def load_done(self):
+        return {player_id: pd.read_pickle(self.path(player_id)) for player_id in self.done_ids()}
+
+    def finish(self):
+        statuses = list(self.manifest['players'].values())
+        self.manifest['status'] = 'complete'
+        self.write_manifest()
+
+        log_event('checkpoint_summary', f'Checkpoint summary: {statuses.count("done")} done, {statuses.count("failed")} failed, {statuses.count("pending")} pending',
+                  done=statuses.count('done'), failed=statuses.count('failed'), pending=statuses.count('pending'))
@@ -1,56 +1,121 @@
 ### THIS SCRIPT CLEANS THE RAW GAMELOGS PULLED FROM THE API AND FORMATS THEM FOR DB INSERTION
 ## Import libraries
-from pull_data import pull_gamelogs
+import numpy as np
 import pandas as pd
+from metrics import log_event, staged
+
+# MATCHUP looks like "LAL vs. BOS" at home and "LAL @ BOS" on the road
+MATCHUP_PATTERN = r'^(?P<TEAM>\S+)\s+(?:vs\.|@)\s+(?P<OPPONENT>\S+)$'
+
+# counting stats fit comfortably in int16, percentages and minutes only need float32
+COUNT_COLS = [
+    'PTS', 'FGM', 'FGA', 'FG3M', 'FG3A', 'FTM', 'FTA',
+    'OREB', 'DREB', 'REB', 'AST', 'STL', 'BLK', 'TOV', 'PF', 'PLUS_MINUS'
+]
+FLOAT_COLS = ['MIN', 'FG_PCT', 'FG3_PCT', 'FT_PCT']
+
+# per-game derived metrics, computed once here and stored, rounded to the scale of their sql columns
+# (TSA = true shooting attempts, POSS_USED = plays a player finished, the numerator of usage rate)
+DERIVED_DECIMALS = {
+    'GAME_SCORE': 1,
+    'TSA': 2,
+    'TS_PCT': 3,
+    'EFG_PCT': 3,
+    'POSS_USED': 2,
+    'USG_PER_36': 2
+}
+
+# reorder the columns to match the sql table schema
+GAMELOG_COLS = [
+    'PLAYER_ID', 'SEASON_ID', 'GAME_ID', 'GAME_DATE',
+    'TEAM', 'OPPONENT', 'HOME_AWAY', 'WL',
+    'MIN', 'PTS',
+    'FGM', 'FGA', 'FG_PCT',
+    'FG3M', 'FG3A', 'FG3_PCT',
+    'FTM', 'FTA', 'FT_PCT',
+    'OREB', 'DREB', 'REB',
+    'AST', 'STL', 'BLK',
+    'TOV', 'PF', 'PLUS_MINUS',
+    'GAME_SCORE', 'TSA', 'TS_PCT', 'EFG_PCT', 'POSS_USED', 'USG_PER_36'
+]
+
+## Define a function to add the derived metrics to cleaned game logs, one vectorized pass over whole columns
+## (percentages are 0 when there were no attempts, like the api's FG_PCT)
+def add_derived_metrics(df):
+    stat = {col: df[col].to_numpy(dtype='float64') for col in ['MIN', 'PTS', 'FGM', 'FGA', 'FG3M', 'FTM', 'FTA', 'OREB', 'DREB', 'AST', 'STL', 'BLK', 'TOV', 'PF']}
+
+    def safe_ratio(numerator, denominator):
+        return np.divide(numerator, denominator, out=np.zeros_like(numerator), where=denominator > 0)
+
+    # Hollinger's Game Score
+    game_score = (
+        stat['PTS'] + 0.4 * stat['FGM'] - 0.7 * stat['FGA'] - 0.4 * (stat['FTA'] - stat['FTM'])
+        + 0.7 * stat['OREB'] + 0.3 * stat['DREB'] + stat['STL'] + 0.7 * stat['AST']
+        + 0.7 * stat['BLK'] - 0.4 * stat['PF'] - stat['TOV']
+    )
+    tsa = stat['FGA'] + 0.44 * stat['FTA']
+    poss_used = tsa + stat['TOV']
+
+    derived = {
+        'GAME_SCORE': game_score,
+        'TSA': tsa,
+        'TS_PCT': safe_ratio(stat['PTS'], 2 * tsa),
+        'EFG_PCT': safe_ratio(stat['FGM'] + 0.5 * stat['FG3M'], stat['FGA']),
+        'POSS_USED': poss_used,
+        'USG_PER_36': safe_ratio(36 * poss_used, stat['MIN'])
+    }
+
+    for col, values in derived.items():
+        df[col] = np.round(values, DERIVED_DECIMALS[col]).astype('float32')
+
+    return df
 
 ## Define a function to clean the data to make it ready for storage.
+@staged('clean_gamelogs')
 def clean_gamelogs(raw_df):
 
-    # make a copy of the df to perserve the original
-    df = raw_df.copy()
-    
-    # convert dates to datetime
-    df['GAME_DATE'] = pd.to_datetime(df['GAME_DATE'])
-
-    # make sure our statistical columns are numeric
-    num_cols = [
-        'MIN', 'FGM', 'FGA', 'FG_PCT', 'FG3M', 'FG3A', 'FG3_PCT',
-        'FTM', 'FTA', 'FT_PCT', 'OREB', 'DREB', 'REB', 'AST', 'STL',
-        'BLK', 'TOV', 'PF', 'PTS', 'PLUS_MINUS'
-    ]
-
-    # handle missing data
-    for col in num_cols:
-        if col in df.columns:
-            df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0)
-
-    # derive home/away and opponent from matchup
-    df['TEAM'] = df['MATCHUP'].apply(lambda x: x.split(' ')[0])
-    df['HOME_AWAY'] = df['MATCHUP'].apply(lambda x: 'A' if '@' in x else 'H')
-    df['OPPONENT'] = df['MATCHUP'].apply(lambda x: x.split(' ')[-1])
+    # build the cleaned frame column by column instead of copying the whole raw frame
+    df = pd.DataFrame(index=raw_df.index)
+
+    df['PLAYER_ID'] = pd.to_numeric(raw_df['PLAYER_ID']).astype('int32')
+    df['SEASON_ID'] = raw_df['SEASON_ID'].astype(str).astype('category')
 
     # rename Game_id to match the capitalization of all columns
-    df = df.rename(columns={'Game_ID':'GAME_ID'})
-
-    # reorder the columns to match the sql table schema
-    mapped_cols = [
-        'PLAYER_ID', 'SEASON_ID', 'GAME_ID', 'GAME_DATE',
-        'TEAM', 'OPPONENT', 'HOME_AWAY', 'WL',
-        'MIN', 'PTS',
-        'FGM', 'FGA', 'FG_PCT',
-        'FG3M', 'FG3A', 'FG3_PCT',
-        'FTM', 'FTA', 'FT_PCT',
-        'OREB', 'DREB', 'REB',
-        'AST', 'STL', 'BLK',
-        'TOV', 'PF', 'PLUS_MINUS'
-    ]
-    
-
-    # print statement to signify cleaning is complete
-    print(f'Logs for {len(df)} players successfully completed.')
-    return df[mapped_cols]
+    df['GAME_ID'] = raw_df['Game_ID'] if 'Game_ID' in raw_df.columns else raw_df['GAME_ID']
+
+    # convert dates to datetime, parsing each distinct date string once (a season has a few hundred game days,
+    # and strings like "OCT 22, 2024" fall back to a slow per-element parser)
+    dates = raw_df['GAME_DATE'].astype('category')
+    parsed = pd.to_datetime(dates.cat.categories, format='mixed')
+    df['GAME_DATE'] = pd.Series(parsed.take(dates.cat.codes.to_numpy(), fill_value=pd.NaT), index=raw_df.index)
+
+    # derive team, opponent and home/away from matchup, parsing each distinct matchup string once
+    matchup = raw_df['MATCHUP'].astype('category')
+    categories = matchup.cat.categories
+    parts = categories.str.extract(MATCHUP_PATTERN)
+    parts.index = categories
+    parts['HOME_AWAY'] = np.where(categories.str.contains('@', regex=False), 'A', 'H')
+
+    for col in ['TEAM', 'OPPONENT', 'HOME_AWAY']:
+        df[col] = matchup.map(parts[col]).astype('category')
+
+    df['WL'] = raw_df['WL'].astype('category')
+
+    # make sure our statistical columns are numeric and handle missing data
+    for col in FLOAT_COLS:
+        df[col] = pd.to_numeric(raw_df[col], errors='coerce').fillna(0).astype('float32')
+
+    for col in COUNT_COLS:
+        df[col] = pd.to_numeric(raw_df[col], errors='coerce').fillna(0).astype('int16')
+
+    add_derived_metrics(df)
+
+    # log that cleaning is complete
+    log_event('gamelogs_cleaned', f'Logs for {len(df)} players successfully completed.', rows=len(df))
+    return df[GAMELOG_COLS]
 
 ## Define a function to clean all player metadata
+@staged('clean_metadata')
 def clean_metadata(raw_df):
 
     # make a copy of the df to perserve the original
@@ -71,7 +136,7 @@ def clean_metadata(raw_df):
     # remove duplicates
     df = df.drop_duplicates(subset=['PLAYER_ID'])
 
-    # print a statment once cleaning is complete
-    print(f'Metadata for {len(df)} players successfully cleaned.')
+    # log a statment once cleaning is complete
+    log_event('metadata_cleaned', f'Metadata for {len(df)} players successfully cleaned.', rows=len(df), duplicates=len(raw_df) - len(df))
     return df
 
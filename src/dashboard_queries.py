@@ -0,0 +1,203 @@
+### THIS SCRIPT HOLDS THE SQL BEHIND EACH DASHBOARD LOADER SO THE APP AND THE QUERY PLAN CHECKS SHARE ONE COPY
+## Each query is a str.format template filled in by the loader
+
+ALL_PLAYERS_QUERY = """
+    SELECT * FROM PLAYER_CAREER_STATS 
+    WHERE GP > 0
+    ORDER BY PLAYER_NAME
+"""
+
+PLAYER_METADATA_QUERY = """
+    SELECT * FROM PLAYER_METADATA 
+    WHERE PLAYER_ID = {player_id}
+"""
+
+PLAYER_SEASONS_QUERY = """
+    SELECT * FROM PLAYER_SEASON_STATS 
+    WHERE PLAYER_ID = {player_id}
+    ORDER BY SEASON_ID DESC
+"""
+
+# served by idx_player_date, read backwards so the newest games come first without a sort
+RECENT_GAMES_QUERY = """
+    SELECT 
+        GAME_DATE,
+        TEAM,
+        OPPONENT,
+        HOME_AWAY,
+        WL,
+        MIN,
+        PTS,
+        REB,
+        AST,
+        STL,
+        BLK,
+        TOV,
+        FGM,
+        FGA,
+        FG_PCT,
+        FG3M,
+        FG3A,
+        FG3_PCT,
+        FTM,
+        FTA,
+        FT_PCT,
+        PLUS_MINUS,
+        GAME_SCORE,
+        TS_PCT,
+        EFG_PCT
+    FROM PLAYER_GAME_LOGS
+    WHERE PLAYER_ID = {player_id}
+    ORDER BY GAME_DATE DESC
+    LIMIT {num_games}
+"""
+
+CAREER_HIGHS_QUERY = """
+    SELECT * FROM PLAYER_CAREER_HIGHS
+    WHERE PLAYER_ID = {player_id}
+"""
+
+# a player's best games by the stored Game Score, read from the end of idx_player_game_score (no scan, no sort)
+BEST_GAMES_QUERY = """
+    SELECT
+        GAME_DATE, TEAM, OPPONENT, HOME_AWAY, WL, MIN, PTS, REB, AST, STL, BLK, TOV,
+        FG_PCT, FG3M, TS_PCT, PLUS_MINUS, GAME_SCORE
+    FROM PLAYER_GAME_LOGS
+    WHERE PLAYER_ID = {player_id}
+    ORDER BY GAME_SCORE DESC
+    LIMIT {num_games}
+"""
+
+# served by the PLAYER_SEASON_SPLITS primary key (PLAYER_ID, SPLIT_TYPE, SPLIT_VALUE, SEASON_ID)
+HOME_AWAY_SPLITS_QUERY = """
+    SELECT 
+        CASE 
+            WHEN SPLIT_VALUE = 'H' THEN 'Home'
+            WHEN SPLIT_VALUE = 'A' THEN 'Away'
+            ELSE 'Unknown'
+        END as LOCATION,
+        SUM(GP) as GP,
+        ROUND(SUM(SUM_MIN) / SUM(GP), 1) as MPG,
+        ROUND(SUM(SUM_PTS) / SUM(GP), 1) as PPG,
+        ROUND(SUM(SUM_REB) / SUM(GP), 1) as RPG,
+        ROUND(SUM(SUM_AST) / SUM(GP), 1) as APG,
+        ROUND(SUM(SUM_STL) / SUM(GP), 1) as SPG,
+        ROUND(SUM(SUM_BLK) / SUM(GP), 1) as BPG,
+        ROUND(SUM(SUM_FGM) / NULLIF(SUM(SUM_FGA), 0), 3) as FG_PCT,
+        ROUND(SUM(SUM_FG3M) / NULLIF(SUM(SUM_FG3A), 0), 3) as FG3_PCT,
+        ROUND(SUM(SUM_FTM) / NULLIF(SUM(SUM_FTA), 0), 3) as FT_PCT
+    FROM PLAYER_SEASON_SPLITS
+    WHERE PLAYER_ID = {player_id} AND SPLIT_TYPE = 'HOME_AWAY'
+    GROUP BY SPLIT_VALUE
+    ORDER BY SPLIT_VALUE
+"""
+
+WIN_LOSS_SPLITS_QUERY = """
+    SELECT 
+        CASE 
+            WHEN SPLIT_VALUE = 'W' THEN 'Wins'
+            WHEN SPLIT_VALUE = 'L' THEN 'Losses'
+            ELSE 'Unknown'
+        END as RESULT,
+        SUM(GP) as GP,
+        ROUND(SUM(SUM_PTS) / SUM(GP), 1) as PPG,
+        ROUND(SUM(SUM_REB) / SUM(GP), 1) as RPG,
+        ROUND(SUM(SUM_AST) / SUM(GP), 1) as APG,
+        ROUND(SUM(SUM_STL) / SUM(GP), 1) as SPG,
+        ROUND(SUM(SUM_BLK) / SUM(GP), 1) as BPG,
+        ROUND(SUM(SUM_FGM) / NULLIF(SUM(SUM_FGA), 0), 3) as FG_PCT,
+        ROUND(SUM(SUM_PLUS_MINUS) / SUM(GP), 1) as AVG_PLUS_MINUS
+    FROM PLAYER_SEASON_SPLITS
+    WHERE PLAYER_ID = {player_id} AND SPLIT_TYPE = 'WL'
+    GROUP BY SPLIT_VALUE
+    ORDER BY SPLIT_VALUE DESC
+"""
+
+# grouped on the stored GAME_MONTH column so idx_player_month covers the query in order
+MONTHLY_STATS_QUERY = """
+    SELECT 
+        CAST(LEFT(GAME_MONTH, 4) AS SIGNED) as YEAR,
+        CAST(RIGHT(GAME_MONTH, 2) AS SIGNED) as MONTH,
+        GAME_MONTH as YEAR_MONTH,
+        COUNT(*) as GP,
+        ROUND(AVG(PTS), 1) as PPG,
+        ROUND(AVG(REB), 1) as RPG,
+        ROUND(AVG(AST), 1) as APG
+    FROM PLAYER_GAME_LOGS
+    WHERE PLAYER_ID = {player_id} {season_filter}
+    GROUP BY GAME_MONTH
+    ORDER BY GAME_MONTH
+"""
+
+# a player's full game log, oldest game first, only read for the custom splits (idx_player_date, no sort)
+PLAYER_GAME_LOGS_QUERY = """
+    SELECT
+        PLAYER_ID, SEASON_ID, GAME_DATE, TEAM, OPPONENT, HOME_AWAY, WL,
+        MIN, PTS, FGM, FGA, FG3M, FG3A, FTM, FTA, REB, AST, STL, BLK, TOV,
+        PLUS_MINUS, GAME_SCORE, TSA
+    FROM PLAYER_GAME_LOGS
+    WHERE PLAYER_ID = {player_id}
+    ORDER BY GAME_DATE
+"""
+
+# the season totals the league rankings are built from (rankings.py)
+SEASON_SUMMARY_QUERY = """
+    SELECT
+        PLAYER_ID, SEASON_ID, GP,
+        SUM_MIN, SUM_PTS, SUM_FGM, SUM_FGA, SUM_FG3M, SUM_FG3A, SUM_FTM, SUM_FTA,
+        SUM_REB, SUM_AST, SUM_STL, SUM_BLK, SUM_GAME_SCORE, SUM_TSA
+    FROM PLAYER_SEASON_SUMMARY
+"""
+
+# the version stamps the pipeline bumps with every committed batch (data_version.py), every dashboard cache is keyed on them
+DATA_VERSION_QUERY = """
+    SELECT SCOPE, VERSION FROM DATA_VERSION
+"""
+
+# every game of every player, for the rolling averages, streaks and stretches (rolling.py)
+ROLLING_GAMES_QUERY = """
+    SELECT PLAYER_ID, SEASON_ID, GAME_DATE, PTS, REB, AST, FG3M, GAME_SCORE
+    FROM PLAYER_GAME_LOGS
+"""
+
+# how many games are stored and the newest one, saved rolling analytics are only reused when both still match (rolling.py)
+ROLLING_FINGERPRINT_QUERY = """
+    SELECT COUNT(*) AS GAMES, MAX(GAME_DATE) AS LAST_GAME_DATE
+    FROM PLAYER_GAME_LOGS
+"""
+
+# every opponent in the matchup cube, for the best-vs-team picker (a loose scan of idx_opponent_season)
+OPPONENTS_QUERY = """
+    SELECT DISTINCT OPPONENT FROM PLAYER_MATCHUP_CUBE
+    WHERE OPPONENT <> ''
+    ORDER BY OPPONENT
+"""
+
+# every player ever stored, active or not, for the sidebar search index (player_search.py)
+PLAYER_NAMES_QUERY = """
+    SELECT PLAYER_ID, PLAYER_NAME FROM PLAYER_METADATA
+"""
+
+## The loader queries the dashboard runs, by name
+LOADER_QUERIES = {
+    'get_all_players': ALL_PLAYERS_QUERY,
+    'get_player_game_logs': PLAYER_GAME_LOGS_QUERY,
+    'get_rankings': SEASON_SUMMARY_QUERY,
+    'get_data_version': DATA_VERSION_QUERY,
+    'get_search_index': PLAYER_NAMES_QUERY,
+    'get_rolling': ROLLING_GAMES_QUERY,
+    'get_rolling_fingerprint': ROLLING_FINGERPRINT_QUERY,
+    'get_opponents': OPPONENTS_QUERY
+}
+
+## The queries behind a player page, by bundle field, each one reads an index or a summary table (player_bundle.py)
+PLAYER_PAGE_QUERIES = {
+    'metadata': PLAYER_METADATA_QUERY,
+    'seasons': PLAYER_SEASONS_QUERY,
+    'career_highs': CAREER_HIGHS_QUERY,
+    'best_games': BEST_GAMES_QUERY,
+    'recent_games': RECENT_GAMES_QUERY,
+    'home_away': HOME_AWAY_SPLITS_QUERY,
+    'win_loss': WIN_LOSS_SPLITS_QUERY,
+    'monthly': MONTHLY_STATS_QUERY
+}
\ No newline at end of file
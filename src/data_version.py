@@ -0,0 +1,47 @@
+### THIS SCRIPT KEEPS THE DATA VERSION STAMPS THAT THE DASHBOARD CACHES ARE KEYED ON
+## Import libraries
+import threading
+import time
+from dashboard_queries import DATA_VERSION_QUERY
+
+# one stamp per kind of data, bumped in the same transaction as the rows it describes
+GAMELOGS = 'GAMELOGS'
+METADATA = 'METADATA'
+
+# bumped once at the end of each pipeline run that stored game logs, for league-wide analytics (rolling.py) that read
+# every game and would otherwise be rebuilt after every insert batch of an ingest
+PIPELINE_RUNS = 'PIPELINE_RUNS'
+
+# how often the dashboard re-reads the stamps (seconds)
+DATA_VERSION_POLL_SECONDS = 5
+
+## Define a function to bump a stamp, inside the caller's transaction so readers never see data without its version
+def bump_data_version(cursor, scope):
+    cursor.execute("""
+        INSERT INTO DATA_VERSION (SCOPE, VERSION)
+        VALUES (%s, 1)
+        ON DUPLICATE KEY UPDATE VERSION = VERSION + 1
+    """, (scope,))
+
+## Define a function to read every stamp, scopes that were never bumped are version 0
+def read_data_versions(run_query):
+    df = run_query(DATA_VERSION_QUERY)
+    versions = dict(zip(df['SCOPE'], df['VERSION']))
+    return {scope: int(versions.get(scope, 0)) for scope in (GAMELOGS, METADATA, PIPELINE_RUNS)}
+
+## Define a poller so every rerun can ask for the current stamps without a query each time
+class DataVersionPoller:
+
+    def __init__(self, run_query, interval=DATA_VERSION_POLL_SECONDS):
+        self.run_query = run_query
+        self.interval = interval
+        self.lock = threading.Lock()
+        self.versions = None
+        self.checked_at = 0.0
+
+    def current(self):
+        with self.lock:
+            if self.versions is None or time.monotonic() - self.checked_at >= self.interval:
+                self.versions = read_data_versions(self.run_query)
+                self.checked_at = time.monotonic()
+            return self.versions
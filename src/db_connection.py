@@ -3,24 +3,194 @@
 # import necessary libraries
 import mysql.connector
 from dotenv import load_dotenv
+from contextlib import contextmanager
 import os
+import logging
+import threading
+import time
+from metrics import metrics, log_event, timed
 
 # Load our environment variables from .env file
 load_dotenv()
 
 # define our function
-def connect_to_db():
+def connect_to_db(allow_local_infile=False):
+    start = time.perf_counter()
     try:
         conn = mysql.connector.connect(
             host = 'localhost',
             user = 'root',
             password = os.getenv('DB_PASSWORD'),
-            database = 'nba_stats'
+            database = 'nba_stats',
+            allow_local_infile = allow_local_infile
         )
-        print('Database successfully connected!')
+        seconds = time.perf_counter() - start
+        metrics.observe('db_connect_seconds', seconds)
+        log_event('db_connected', 'Database successfully connected!', seconds=round(seconds, 3), local_infile=allow_local_infile)
     
     except Exception as e:
-        print(f'Database connection error: {e}')
+        metrics.inc('db_connect_errors_total')
+        log_event('db_connect_failed', f'Database connection error: {e}', logging.ERROR, error=repr(e))
         return None
     
-    return conn
\ No newline at end of file
+    return conn
+
+## Define a pool of reusable connections shared by the pipeline and the dashboard
+class ConnectionPool:
+
+    # connect opens one new connection, or returns None when it can't (connect_to_db)
+    def __init__(self, size=5, timeout=30, connect=connect_to_db):
+        self.size = size
+        self.timeout = timeout
+        self.connect = connect
+
+        # idle connections (last in, first out) and open slots are guarded by one lock,
+        # waiters are woken when a connection is returned or a broken one frees its slot
+        self.idle = []
+        self.lock = threading.Lock()
+        self.available = threading.Condition(self.lock)
+        self.created = 0
+
+        # counters used to size the pool
+        self.checkouts = 0
+        self.in_use = 0
+        self.peak_in_use = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.timeouts = 0
+        self.reconnects = 0
+
+    # give up a connection's slot (it broke or never opened) and wake a waiter so it can open a fresh one
+    def free_slot(self):
+        with self.available:
+            self.created -= 1
+            self.available.notify()
+
+    # open a new connection in a slot reserved by get_connection
+    def create(self):
+        conn = self.connect()
+        if conn is None:
+            self.free_slot()
+            raise ConnectionError('Unable to open a new pooled database connection')
+
+        return conn
+
+    # make sure a connection handed out is still alive, reconnecting if the server dropped it
+    def health_check(self, conn):
+        if conn.is_connected():
+            return conn
+
+        with timed('db_reconnect'):
+            conn.reconnect(attempts=3, delay=1)
+        with self.lock:
+            self.reconnects += 1
+        metrics.inc('db_pool_reconnects_total')
+        return conn
+
+    # check a connection out of the pool, waiting up to timeout seconds for one to be returned or for a slot to free up
+    def get_connection(self, timeout=None):
+        start = time.perf_counter()
+        timeout = self.timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+
+        with self.available:
+            while True:
+                if self.idle:
+                    conn = self.idle.pop()
+                    break
+
+                # under the pool size: reserve a slot and open the connection outside the lock
+                if self.created < self.size:
+                    self.created += 1
+                    conn = None
+                    break
+
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self.timeouts += 1
+                    metrics.inc('db_pool_timeouts_total')
+                    raise TimeoutError(f'No database connection free after waiting {timeout}s')
+                self.available.wait(remaining)
+
+        if conn is None:
+            conn = self.create()
+
+        try:
+            conn = self.health_check(conn)
+        except Exception:
+            self.free_slot()
+            raise
+
+        wait = time.perf_counter() - start
+        with self.lock:
+            self.checkouts += 1
+            self.in_use += 1
+            self.peak_in_use = max(self.peak_in_use, self.in_use)
+            self.total_wait += wait
+            self.max_wait = max(self.max_wait, wait)
+            metrics.set('db_pool_in_use', self.in_use)
+
+        metrics.observe('db_pool_wait_seconds', wait)
+        return conn
+
+    # hand a connection back, discarding any uncommitted work first
+    def release(self, conn):
+        with self.lock:
+            self.in_use -= 1
+            metrics.set('db_pool_in_use', self.in_use)
+
+        try:
+            conn.rollback()
+        except Exception:
+            # broken connections are dropped so a fresh one can take their slot
+            self.free_slot()
+            return
+
+        with self.available:
+            self.idle.append(conn)
+            self.available.notify()
+
+    @contextmanager
+    def connection(self, timeout=None):
+        conn = self.get_connection(timeout)
+        try:
+            yield conn
+        finally:
+            self.release(conn)
+
+    # report wait time and utilization so the pool can be sized
+    def stats(self):
+        with self.lock:
+            return {
+                'size': self.size,
+                'open': self.created,
+                'in_use': self.in_use,
+                'peak_in_use': self.peak_in_use,
+                'utilization': self.in_use / self.size,
+                'checkouts': self.checkouts,
+                'avg_wait_ms': 1000 * self.total_wait / self.checkouts if self.checkouts else 0.0,
+                'max_wait_ms': 1000 * self.max_wait,
+                'timeouts': self.timeouts,
+                'reconnects': self.reconnects
+            }
+
+# one pool per process, sized from DB_POOL_SIZE in the .env file
+_pool = None
+_pool_lock = threading.Lock()
+
+## Define a function to get the shared pool, creating it on first use
+def get_pool():
+    global _pool
+
+    with _pool_lock:
+        if _pool is None:
+            _pool = ConnectionPool(
+                size=int(os.getenv('DB_POOL_SIZE', 5)),
+                timeout=float(os.getenv('DB_POOL_TIMEOUT', 30))
+            )
+
+    return _pool
+
+## Define a shortcut for borrowing a connection from the shared pool
+def pooled_connection(timeout=None):
+    return get_pool().connection(timeout)
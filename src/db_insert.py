@@ -1,27 +1,26 @@
 ### THIS SCRIPT WILL INSERT THE CLEANED GAMELOGS INTO THE SQL DATABASE
 ## Import libraries
 import mysql.connector
-from db_connection import connect_to_db
-import numpy as np
+from db_connection import connect_to_db, pooled_connection
+from watermarks import update_watermarks
+from aggregates import touched_groups, refresh_season_aggregates
+from data_version import bump_data_version, GAMELOGS, METADATA
+from metrics import metrics, log_event, timed, staged
+from row_hashes import get_row_hash_index
+import pandas as pd
+import os
+import tempfile
+import time
 
-## Define a function to insert clean metadata into players
-def insert_player_metadata(df):
-    conn = connect_to_db()
-    cursor = conn.cursor()
+# columns written to each table, in the order the rows are built
+METADATA_COLUMNS = [
+    'PLAYER_ID', 'PLAYER_NAME', 'DOB',
+    'HEIGHT', 'WEIGHT', 'POSITION',
+    'DRAFT_YEAR', 'DRAFT_ROUND', 'DRAFT_NUMBER',
+    'SCHOOL', 'COUNTRY', 'HEADSHOT_URL'
+]
 
-    insert_query = """
-       INSERT INTO PLAYER_METADATA (
-            PLAYER_ID, PLAYER_NAME, DOB,
-            HEIGHT, WEIGHT, POSITION,
-            DRAFT_YEAR, DRAFT_ROUND, DRAFT_NUMBER,
-            SCHOOL, COUNTRY, HEADSHOT_URL
-        )
-        VALUES (
-            %s, %s, %s,
-            %s, %s, %s,
-            %s, %s, %s,
-            %s, %s, %s
-        )
+METADATA_UPDATE = """
         ON DUPLICATE KEY UPDATE
             PLAYER_NAME = VALUES(PLAYER_NAME),
             DOB = VALUES(DOB),
@@ -34,55 +33,24 @@ def insert_player_metadata(df):
             SCHOOL = VALUES(SCHOOL),
             COUNTRY = VALUES(COUNTRY),
             HEADSHOT_URL = VALUES(HEADSHOT_URL),
-            UPDATED_AT = CURRENT_TIMESTAMP;
-    """
-
-    df = df.replace({np.nan: None})
+            ROW_HASH = VALUES(ROW_HASH),
+            UPDATED_AT = CURRENT_TIMESTAMP
+"""
 
-    data = []
-    for _, row in df.iterrows():
-        data.append((
-            row['PLAYER_ID'], row['PLAYER_NAME'], row['DOB'], 
-            row['HEIGHT'], row['WEIGHT'], row['POSITION'],
-            row.get('DRAFT_YEAR'), row.get('DRAFT_ROUND'), row.get('DRAFT_NUMBER'),
-            row.get('SCHOOL'), row.get('COUNTRY'), row['HEADSHOT_URL']
-        ))
+GAMELOG_COLUMNS = [
+    'PLAYER_ID', 'SEASON_ID', 'GAME_ID', 'GAME_DATE',
+    'TEAM', 'OPPONENT', 'HOME_AWAY', 'WL',
+    'MIN', 'PTS',
+    'FGM', 'FGA', 'FG_PCT',
+    'FG3M', 'FG3A', 'FG3_PCT',
+    'FTM', 'FTA', 'FT_PCT',
+    'OREB', 'DREB', 'REB',
+    'AST', 'STL', 'BLK',
+    'TOV', 'PF', 'PLUS_MINUS',
+    'GAME_SCORE', 'TSA', 'TS_PCT', 'EFG_PCT', 'POSS_USED', 'USG_PER_36'
+]
 
-    cursor.executemany(insert_query, data)
-    conn.commit()
-    cursor.close()
-    conn.close()
-
-    print(f"Inserted/Updated {len(df)} rows in players successfully!")
-
-## Define a function to insert cleaned gamelogs
-def insert_gamelogs(df):
-    conn = connect_to_db()
-    cursor = conn.cursor()
-
-    insert_query = """
-       INSERT INTO PLAYER_GAME_LOGS (
-            PLAYER_ID, SEASON_ID, GAME_ID, GAME_DATE,
-            TEAM, OPPONENT, HOME_AWAY, WL,
-            MIN, PTS,
-            FGM, FGA, FG_PCT,
-            FG3M, FG3A, FG3_PCT,
-            FTM, FTA, FT_PCT,
-            OREB, DREB, REB,
-            AST, STL, BLK,
-            TOV, PF, PLUS_MINUS
-        )
-        VALUES (
-            %s, %s, %s, %s,
-            %s, %s, %s, %s,
-            %s, %s,
-            %s, %s, %s,
-            %s, %s, %s,
-            %s, %s, %s,
-            %s, %s, %s,
-            %s, %s, %s,
-            %s, %s, %s
-        )
+GAMELOG_UPDATE = """
         ON DUPLICATE KEY UPDATE
             TEAM = VALUES(TEAM),
             OPPONENT = VALUES(OPPONENT),
@@ -107,28 +75,227 @@ def insert_gamelogs(df):
             BLK = VALUES(BLK),
             TOV = VALUES(TOV),
             PF = VALUES(PF),
-            PLUS_MINUS = VALUES(PLUS_MINUS)
+            PLUS_MINUS = VALUES(PLUS_MINUS),
+            GAME_SCORE = VALUES(GAME_SCORE),
+            TSA = VALUES(TSA),
+            TS_PCT = VALUES(TS_PCT),
+            EFG_PCT = VALUES(EFG_PCT),
+            POSS_USED = VALUES(POSS_USED),
+            USG_PER_36 = VALUES(USG_PER_36),
+            ROW_HASH = VALUES(ROW_HASH)
+"""
+
+# the content columns are what gets hashed, the hash is written alongside them
+METADATA_WRITE_COLUMNS = METADATA_COLUMNS + ['ROW_HASH']
+GAMELOG_WRITE_COLUMNS = GAMELOG_COLUMNS + ['ROW_HASH']
+
+# what happened to each row of an upsert
+ROW_ACTIONS = ['inserted', 'updated', 'skipped']
+
+## Define a function to build an INSERT ... VALUES query for a table
+def build_insert_query(table, columns, update_clause):
+    return f"""
+        INSERT INTO {table} ({', '.join(columns)})
+        VALUES ({', '.join(['%s'] * len(columns))})
+        {update_clause}
     """
 
-    df = df.replace({np.nan: None})
-
-    data = []
-    for _, row in df.iterrows():
-        data.append((
-             row['PLAYER_ID'], row['SEASON_ID'], row['GAME_ID'], row['GAME_DATE'],
-            row.get('TEAM'), row.get('OPPONENT'), row.get('HOME_AWAY'), row.get('WL'),
-            row.get('MIN'), row.get('PTS'),
-            row.get('FGM'), row.get('FGA'), row.get('FG_PCT'),
-            row.get('FG3M'), row.get('FG3A'), row.get('FG3_PCT'),
-            row.get('FTM'), row.get('FTA'), row.get('FT_PCT'),
-            row.get('OREB'), row.get('DREB'), row.get('REB'),
-            row.get('AST'), row.get('STL'), row.get('BLK'),
-            row.get('TOV'), row.get('PF'), row.get('PLUS_MINUS')
-        ))
-
-    cursor.executemany(insert_query, data)
-    conn.commit()
+## Define a function to turn a frame into a list of row tuples without iterrows
+def frame_to_rows(df, columns):
+    values = []
+
+    for col in columns:
+        series = df[col] if col in df.columns else pd.Series(None, index=df.index, dtype=object)
+
+        # dates go in as python dates, everything else via tolist() which yields native python types
+        if pd.api.types.is_datetime64_any_dtype(series):
+            series = series.dt.date
+
+        if series.isna().any():
+            values.append(series.astype(object).where(series.notna(), None).tolist())
+        else:
+            values.append(series.tolist())
+
+    return list(zip(*values))
+
+## Define a function to send rows in batches, committing after each one
+## (each batch is timed, from the executemany to its commit, under the table's name)
+def executemany_in_batches(conn, query, rows, batch_size, after_batch=None, table='unknown'):
+    cursor = conn.cursor()
+
+    for start in range(0, len(rows), batch_size):
+        batch = rows[start:start + batch_size]
+
+        with timed('db_batch', table=table):
+            cursor.executemany(query, batch)
+
+            # let the caller write anything that belongs in the same transaction as the batch
+            if after_batch is not None:
+                after_batch(cursor, start, start + batch_size)
+
+            conn.commit()
+
+        metrics.inc('db_rows_written_total', len(batch), table=table)
+
     cursor.close()
-    conn.close()
 
-    print(f"Inserted/Updated {len(df)} rows in player_game_logs successfully!")
+## Define a function to keep only the rows that are new or changed since they were stored, with their hashes attached
+## (unchanged rows are never sent, so they aren't rewritten, locked or logged to the binlog)
+def changed_rows(df, table, columns):
+    row_changes = get_row_hash_index(table, columns).changes(df)
+    changed_df = df[row_changes.send].assign(ROW_HASH=row_changes.hashes[row_changes.send])
+    return changed_df, row_changes
+
+## Define a function to remember the hashes of rows that were just committed and count what happened to each row
+def record_changes(table, columns, row_changes):
+    get_row_hash_index(table, columns).record(row_changes)
+
+    counts = row_changes.counts()
+    for action, count in counts.items():
+        metrics.inc('db_rows_total', count, table=table, action=action)
+    return counts
+
+## Define a function to bulk load a frame through a temp csv and LOAD DATA LOCAL INFILE, on the caller's cursor
+def load_data_infile(cursor, table, columns, df, update_clause):
+    stage_table = f'STAGE_{table}'
+
+    # stage the csv into a temporary copy of the table, then upsert it in one statement
+    with tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False, newline='') as f:
+        csv_path = f.name
+        df[columns].to_csv(f, header=False, index=False, na_rep='\\N', date_format='%Y-%m-%d')
+
+    try:
+        cursor.execute(f'DROP TEMPORARY TABLE IF EXISTS {stage_table}')
+        cursor.execute(f'CREATE TEMPORARY TABLE {stage_table} LIKE {table}')
+        cursor.execute(f"""
+            LOAD DATA LOCAL INFILE '{csv_path.replace(os.sep, '/')}'
+            INTO TABLE {stage_table}
+            FIELDS TERMINATED BY ',' OPTIONALLY ENCLOSED BY '"'
+            LINES TERMINATED BY '\\n'
+            ({', '.join(columns)})
+        """)
+        cursor.execute(f"""
+            INSERT INTO {table} ({', '.join(columns)})
+            SELECT {', '.join(columns)} FROM {stage_table}
+            {update_clause}
+        """)
+        cursor.execute(f'DROP TEMPORARY TABLE {stage_table}')
+    finally:
+        os.remove(csv_path)
+
+## Define a function to insert clean metadata into players
+@staged('insert_metadata', rows_of=lambda result: result['rows'])
+def insert_player_metadata(df, batch_size=1000):
+    start = time.perf_counter()
+
+    changed_df, row_changes = changed_rows(df, 'PLAYER_METADATA', METADATA_COLUMNS)
+    rows = frame_to_rows(changed_df, METADATA_WRITE_COLUMNS)
+    insert_query = build_insert_query('PLAYER_METADATA', METADATA_WRITE_COLUMNS, METADATA_UPDATE)
+
+    # bump the metadata version with each batch so the dashboard picks the change up as soon as it commits
+    # (with nothing changed there are no batches, so the version and the dashboard caches stay put)
+    def after_batch(cursor, batch_start, batch_end):
+        bump_data_version(cursor, METADATA)
+
+    with pooled_connection() as conn:
+        executemany_in_batches(conn, insert_query, rows, batch_size, after_batch, table='PLAYER_METADATA')
+
+    counts = record_changes('PLAYER_METADATA', METADATA_COLUMNS, row_changes)
+    elapsed = time.perf_counter() - start
+    rows_per_sec = len(df) / max(elapsed, 1e-9)
+    log_event('rows_upserted', f"Players: {counts['inserted']} inserted, {counts['updated']} updated, {counts['skipped']} unchanged ({rows_per_sec:,.0f} rows/sec)",
+              table='PLAYER_METADATA', rows=len(df), **counts, rows_per_sec=round(rows_per_sec, 1))
+
+    return {'rows': len(df), **counts, 'seconds': elapsed, 'rows_per_sec': rows_per_sec}
+
+## Define a function to add placeholder metadata rows for players we only know from game logs (e.g. retired players)
+@staged('insert_missing_players', rows_of=None)
+def insert_missing_players(raw_df):
+    players_df = raw_df[['PLAYER_ID', 'PLAYER_NAME']].drop_duplicates(subset=['PLAYER_ID'])
+
+    data = [
+        (int(player_id), player_name, f'https://cdn.nba.com/headshots/nba/latest/260x190/{player_id}.png')
+        for player_id, player_name in zip(players_df['PLAYER_ID'], players_df['PLAYER_NAME'])
+    ]
+
+    # existing metadata rows are left untouched
+    with pooled_connection() as conn, timed('db_batch', table='PLAYER_METADATA'):
+        cursor = conn.cursor()
+        cursor.executemany("""
+            INSERT IGNORE INTO PLAYER_METADATA (PLAYER_ID, PLAYER_NAME, HEADSHOT_URL)
+            VALUES (%s, %s, %s)
+        """, data)
+        added = cursor.rowcount
+
+        # INSERT IGNORE usually adds nothing, and bumping anyway would reload every metadata cache entry
+        if added > 0:
+            bump_data_version(cursor, METADATA)
+        conn.commit()
+        cursor.close()
+
+    metrics.inc('db_rows_written_total', added, table='PLAYER_METADATA')
+    log_event('rows_inserted', f"Added {added} missing players to players successfully!", table='PLAYER_METADATA', rows=added, checked=len(data))
+
+## Define a function to insert cleaned gamelogs
+## mode='batched' sends executemany batches with a commit per batch,
+## mode='load_data' streams a temp csv through LOAD DATA LOCAL INFILE (fastest for full backfills)
+@staged('insert_gamelogs', rows_of=lambda result: result['rows'])
+def insert_gamelogs(df, batch_size=5000, mode='batched'):
+    start = time.perf_counter()
+
+    if mode not in ('batched', 'load_data'):
+        raise ValueError(f"Unknown insert mode '{mode}', expected 'batched' or 'load_data'")
+
+    # only new and changed games are written, so watermarks and aggregates are only touched for those
+    changed_df, row_changes = changed_rows(df, 'PLAYER_GAME_LOGS', GAMELOG_COLUMNS)
+
+    if mode == 'load_data' and not changed_df.empty:
+        # LOAD DATA LOCAL needs a connection opened with local infile allowed, so it doesn't use the pool
+        conn = connect_to_db(allow_local_infile=True)
+        if conn is None:
+            raise ConnectionError('Unable to open a database connection for LOAD DATA LOCAL INFILE')
+
+        cursor = conn.cursor()
+        try:
+            # the whole load is one batch
+            with timed('db_batch', table='PLAYER_GAME_LOGS'):
+                load_data_infile(cursor, 'PLAYER_GAME_LOGS', GAMELOG_WRITE_COLUMNS, changed_df, GAMELOG_UPDATE)
+
+                # advance the per-player watermarks, refresh the touched season aggregates and bump the data version in the same transaction as the logs
+                update_watermarks(cursor, changed_df)
+                refresh_season_aggregates(cursor, touched_groups(changed_df))
+                bump_data_version(cursor, GAMELOGS)
+                conn.commit()
+
+        # nothing of a failed load is kept, the rows are sent again on the next run
+        except Exception:
+            conn.rollback()
+            raise
+
+        finally:
+            cursor.close()
+            conn.close()
+
+        metrics.inc('db_rows_written_total', len(changed_df), table='PLAYER_GAME_LOGS')
+
+    elif mode == 'batched':
+        rows = frame_to_rows(changed_df, GAMELOG_WRITE_COLUMNS)
+        insert_query = build_insert_query('PLAYER_GAME_LOGS', GAMELOG_WRITE_COLUMNS, GAMELOG_UPDATE)
+
+        # advance the per-player watermarks, refresh the touched season aggregates and bump the data version in the same transaction as each batch
+        def after_batch(cursor, batch_start, batch_end):
+            batch = changed_df.iloc[batch_start:batch_end]
+            update_watermarks(cursor, batch)
+            refresh_season_aggregates(cursor, touched_groups(batch))
+            bump_data_version(cursor, GAMELOGS)
+
+        with pooled_connection() as conn:
+            executemany_in_batches(conn, insert_query, rows, batch_size, after_batch, table='PLAYER_GAME_LOGS')
+
+    counts = record_changes('PLAYER_GAME_LOGS', GAMELOG_COLUMNS, row_changes)
+    elapsed = time.perf_counter() - start
+    rows_per_sec = len(df) / max(elapsed, 1e-9)
+    log_event('rows_upserted', f"Game logs: {counts['inserted']} inserted, {counts['updated']} updated, {counts['skipped']} unchanged ({mode}: {rows_per_sec:,.0f} rows/sec)",
+              table='PLAYER_GAME_LOGS', mode=mode, rows=len(df), **counts, rows_per_sec=round(rows_per_sec, 1))
+
+    return {'mode': mode, 'rows': len(df), **counts, 'seconds': elapsed, 'rows_per_sec': rows_per_sec}
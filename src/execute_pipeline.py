@@ -1,17 +1,151 @@
 ### THIS SCRIPT EXECUTES THE ENTIRE PIPELINE OF PULLING GAMELOGS, CLEANING THEM, AND INSERTING THEM INTO OUR DB
 ## Import libraries
-from db_connection import connect_to_db
-from pull_data import pull_gamelogs, pull_metadata
+import argparse
+import atexit
+from db_connection import connect_to_db, get_pool, pooled_connection
+from pull_data import pull_gamelogs, pull_metadata, pull_league_gamelogs
 from clean_data import clean_gamelogs, clean_metadata
-from db_insert import insert_gamelogs, insert_player_metadata
+from db_insert import insert_gamelogs, insert_player_metadata, insert_missing_players, ROW_ACTIONS
+from seasons import current_season, seasons_between
+from watermarks import get_watermarks, filter_new_gamelogs
+from aggregates import rebuild_season_aggregates
+from migrate import migrate
+from snapshot import publish_snapshot
+from stream_pipeline import stream_gamelogs, DEFAULT_QUEUE_SIZE
+from data_version import bump_data_version, PIPELINE_RUNS
+from metrics import metrics, log_event
+
+## Define a function to read the command line options
+def parse_args():
+    parser = argparse.ArgumentParser(description='Pull, clean and store NBA player game logs.')
+    parser.add_argument(
+        '--incremental',
+        action='store_true',
+        help='only pull the current season and only store games newer than each player\'s watermark'
+    )
+    parser.add_argument(
+        '--resume',
+        action='store_true',
+        help='continue an interrupted pull from its checkpoints instead of starting over'
+    )
+    parser.add_argument(
+        '--backfill',
+        metavar='FIRST_SEASON',
+        help='backfill every season from FIRST_SEASON (e.g. 2015-16) to now with one league-wide request per season'
+    )
+    parser.add_argument(
+        '--rebuild-aggregates',
+        action='store_true',
+        help='rebuild the season summary and splits tables from PLAYER_GAME_LOGS and exit'
+    )
+    parser.add_argument(
+        '--skip-snapshot',
+        action='store_true',
+        help='don\'t publish the parquet snapshot the dashboard reads in snapshot mode'
+    )
+    parser.add_argument(
+        '--stream',
+        action='store_true',
+        help='overlap fetching, cleaning and inserting through bounded queues instead of running them one after another (full and incremental pulls)'
+    )
+    parser.add_argument(
+        '--queue-size',
+        type=int,
+        default=DEFAULT_QUEUE_SIZE,
+        help='players buffered between the stream\'s stages, which caps its memory (default %(default)s)'
+    )
+    parser.add_argument(
+        '--metrics-file',
+        help='where to write the run\'s metrics in Prometheus text format (default METRICS_FILE or .metrics/pipeline.prom)'
+    )
+    args = parser.parse_args()
+
+    # backfills are one request per season loaded with LOAD DATA, and stream runs don't checkpoint
+    if args.stream and (args.backfill or args.resume):
+        parser.error('--stream can\'t be combined with --backfill or --resume')
+
+    return args
+
+## Define a function to log the run's latency summaries and write the metrics file (runs at exit, so failed runs are recorded too)
+def write_metrics(path=None):
+    # what the run did to each table: new rows, changed rows and rows skipped because their hash matched
+    for table in ['PLAYER_METADATA', 'PLAYER_GAME_LOGS']:
+        counts = {action: metrics.counter('db_rows_total', table=table, action=action) for action in ROW_ACTIONS}
+        if any(counts.values()):
+            log_event('run_summary', f'{table}: ' + ', '.join(f'{count} {action}' for action, count in counts.items()), table=table, **counts)
+
+    for name in ['stage_duration_seconds', 'api_request_seconds', 'db_batch_seconds']:
+        for row in metrics.summary(name):
+            log_event('latency_summary', f'{name}: {row}', metric=name, **row)
+
+    path = metrics.write_prometheus(path)
+    log_event('metrics_written', f'Metrics written to {path}', path=path)
+
+## Define a function to mark the end of a run that stored game logs, the league-wide analytics are recomputed once per run
+def finish_run():
+    stored = sum(metrics.counter('db_rows_total', table='PLAYER_GAME_LOGS', action=action) for action in ('inserted', 'updated'))
+    if not stored:
+        return
+
+    with pooled_connection() as conn:
+        cursor = conn.cursor()
+        bump_data_version(cursor, PIPELINE_RUNS)
+        conn.commit()
+        cursor.close()
 
 ## Define and run our main function
 if __name__ == '__main__':
 
-    #raw_metadata = pull_metadata()
+    args = parse_args()
+    atexit.register(write_metrics, args.metrics_file)
+
+    # bring a database created by an older schema file up to date before anything reads or writes it
+    migrate()
+
+    # one-off rebuild, e.g. the first run after the aggregate tables were added
+    if args.rebuild_aggregates:
+        rebuild_season_aggregates()
+        raise SystemExit
+
+    #raw_metadata = pull_metadata(resume=args.resume)
     #metadata_df = clean_metadata(raw_metadata)
     #insert_player_metadata(metadata_df)
 
-    raw_gamelogs = pull_gamelogs(season='ALL', sleep_time=3)
-    gamelogs_df = clean_gamelogs(raw_gamelogs)
-    insert_gamelogs(gamelogs_df)
+    if args.stream:
+        # per-player frames are cleaned and inserted while later players are still being fetched
+        stream_gamelogs(
+            season=current_season() if args.incremental else 'ALL',
+            requests_per_second=2.0,
+            max_workers=4,
+            watermarks=get_watermarks() if args.incremental else None,
+            queue_size=args.queue_size
+        )
+    else:
+        if args.backfill:
+            raw_gamelogs = pull_league_gamelogs(seasons_between(args.backfill), requests_per_second=2.0, max_workers=4)
+
+            # league logs include retired players, who need a players row before their logs can be stored
+            if not raw_gamelogs.empty:
+                insert_missing_players(raw_gamelogs)
+        elif args.incremental:
+            raw_gamelogs = pull_gamelogs(season=current_season(), requests_per_second=2.0, max_workers=4, resume=args.resume)
+            raw_gamelogs = filter_new_gamelogs(raw_gamelogs, get_watermarks())
+        else:
+            raw_gamelogs = pull_gamelogs(season='ALL', requests_per_second=2.0, max_workers=4, resume=args.resume)
+
+        if raw_gamelogs.empty:
+            log_event('nothing_to_store', 'No new game logs to store.')
+        else:
+            gamelogs_df = clean_gamelogs(raw_gamelogs)
+
+            # full backfills are large enough that LOAD DATA beats batched inserts
+            insert_gamelogs(gamelogs_df, mode='load_data' if args.backfill else 'batched')
+
+    # before the snapshot, so it carries the new stamp
+    finish_run()
+
+    # publish even when nothing new was stored, so a fresh checkout gets a snapshot on its first run
+    if not args.skip_snapshot:
+        publish_snapshot()
+
+    log_event('pool_stats', f'Connection pool: {get_pool().stats()}', **get_pool().stats())
@@ -0,0 +1,100 @@
+### THIS SCRIPT PROVIDES A CONCURRENT, RATE-LIMITED ENGINE FOR CALLING THE NBA API
+## Import libraries
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from metrics import metrics, log_event
+
+## Define a token bucket that is shared by every worker thread
+class TokenBucket:
+
+    def __init__(self, requests_per_second=2.0, burst=1):
+        self.rate = float(requests_per_second)
+        self.capacity = max(1, int(burst))
+        self.tokens = float(self.capacity)
+        self.last_refill = time.monotonic()
+        self.lock = threading.Lock()
+
+    # block until a token is available, then consume it
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.last_refill) * self.rate)
+                self.last_refill = now
+
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+
+                wait = (1 - self.tokens) / self.rate
+
+            time.sleep(wait)
+
+## Define a function to run fetch_fn over every item with a bounded number of requests in flight
+## (name labels the request latency, retry and failure metrics, e.g. the endpoint being called)
+## max_pending caps how many items are submitted but not yet handed to on_result, so a slow callback holds back
+## the fetching instead of letting finished responses pile up; collect=False keeps no results (streaming callers)
+def fetch_all(items, fetch_fn, requests_per_second=2.0, max_workers=4, retries=2, backoff=2.0, limiter=None, on_result=None, name='fetch',
+              max_pending=None, collect=True):
+
+    # every attempt (including retries) has to take a token from the same bucket
+    limiter = limiter or TokenBucket(requests_per_second)
+
+    def run(item):
+        for attempt in range(retries + 1):
+            wait_start = time.perf_counter()
+            limiter.acquire()
+
+            # time the request itself, the rate limiter wait is recorded separately
+            start = time.perf_counter()
+            metrics.observe('api_rate_limit_wait_seconds', start - wait_start, endpoint=name)
+            try:
+                result = fetch_fn(item)
+                metrics.observe('api_request_seconds', time.perf_counter() - start, endpoint=name, outcome='ok')
+                return result, None
+            except Exception as e:
+                metrics.observe('api_request_seconds', time.perf_counter() - start, endpoint=name, outcome='error')
+                if attempt == retries:
+                    metrics.inc('api_failures_total', endpoint=name)
+                    return None, e
+
+                metrics.inc('api_retries_total', endpoint=name)
+                log_event('api_retry', f'{name} request failed, retrying ({attempt + 1}/{retries}): {e}', logging.WARNING,
+                          endpoint=name, attempt=attempt + 1, error=repr(e))
+                time.sleep(backoff * (attempt + 1))
+
+    # results are stored by position so they come back in the same order as items
+    results = [None] * len(items) if collect else None
+
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    window = max(max_pending or len(items), max_workers)
+    futures = {}
+    next_item = 0
+
+    try:
+        while next_item < len(items) or futures:
+            # keep up to window items submitted, new ones go in as earlier ones are handed off
+            while next_item < len(items) and len(futures) < window:
+                futures[executor.submit(run, items[next_item])] = next_item
+                next_item += 1
+
+            done, _ = wait(futures, return_when=FIRST_COMPLETED)
+            for future in done:
+                i = futures.pop(future)
+                result, error = future.result()
+                if collect:
+                    results[i] = (items[i], result, error)
+
+                # callbacks run on the calling thread as soon as each item finishes
+                if on_result is not None:
+                    on_result(i, items[i], result, error)
+
+    except BaseException:
+        # on ctrl-c (or a failing callback) drop the queued requests instead of draining them
+        executor.shutdown(wait=False, cancel_futures=True)
+        raise
+
+    executor.shutdown()
+    return results
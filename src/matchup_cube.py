@@ -0,0 +1,104 @@
+### THIS SCRIPT ROLLS UP THE PLAYER X OPPONENT MATCHUP CUBE OVER ANY SUBSET OF ITS DIMENSIONS, WITHOUT READING THE GAME LOGS
+## Import libraries
+import numbers
+import re
+
+CUBE_TABLE = 'PLAYER_MATCHUP_CUBE'
+
+# the cube's key, every other column is a sum so any subset of these rolls up exactly
+CUBE_DIMENSIONS = ['PLAYER_ID', 'SEASON_ID', 'OPPONENT', 'HOME_AWAY', 'WL']
+
+# per-game averages and percentages of a rolled-up group (same formulas as the SQL views and splits.py)
+CUBE_STATS = {
+    'GP': 'SUM(GP)',
+    'MPG': 'ROUND(SUM(SUM_MIN) / SUM(GP), 1)',
+    'PPG': 'ROUND(SUM(SUM_PTS) / SUM(GP), 1)',
+    'RPG': 'ROUND(SUM(SUM_REB) / SUM(GP), 1)',
+    'APG': 'ROUND(SUM(SUM_AST) / SUM(GP), 1)',
+    'SPG': 'ROUND(SUM(SUM_STL) / SUM(GP), 1)',
+    'BPG': 'ROUND(SUM(SUM_BLK) / SUM(GP), 1)',
+    'TPG': 'ROUND(SUM(SUM_TOV) / SUM(GP), 1)',
+    'FG_PCT': 'ROUND(SUM(SUM_FGM) / NULLIF(SUM(SUM_FGA), 0), 3)',
+    'FG3_PCT': 'ROUND(SUM(SUM_FG3M) / NULLIF(SUM(SUM_FG3A), 0), 3)',
+    'FT_PCT': 'ROUND(SUM(SUM_FTM) / NULLIF(SUM(SUM_FTA), 0), 3)',
+    'TS_PCT': 'ROUND(SUM(SUM_PTS) / NULLIF(2 * SUM(SUM_TSA), 0), 3)',
+    'GMSC': 'ROUND(SUM(SUM_GAME_SCORE) / SUM(GP), 1)',
+    'AVG_PLUS_MINUS': 'ROUND(SUM(SUM_PLUS_MINUS) / SUM(GP), 1)'
+}
+
+# stats the best-vs-team leaderboard can rank by
+LEADERBOARD_STATS = ['PPG', 'RPG', 'APG', 'GMSC', 'TS_PCT', 'FG_PCT', 'AVG_PLUS_MINUS']
+
+# filter values are written into the SQL (the snapshot backend runs plain SQL strings), so text values are limited to ids and codes
+SAFE_TEXT = re.compile(r'^[A-Za-z0-9_-]*$')
+
+## Define a function to write one filter value as a SQL literal of its dimension's type
+def sql_value(dimension, value):
+    if dimension == 'PLAYER_ID':
+        if not isinstance(value, numbers.Integral) or isinstance(value, bool):
+            raise ValueError(f'PLAYER_ID filter must be an integer, got {value!r}')
+        return str(int(value))
+
+    value = str(value)
+    if not SAFE_TEXT.match(value):
+        raise ValueError(f'Unsupported {dimension} filter value {value!r}')
+    return f"'{value}'"
+
+## Define a function to build a rollup query: group by any subset of the dimensions and filter on any of them
+## (filters map a dimension to a value or a list of values; order_by is one of CUBE_STATS, highest first)
+def rollup_query(group_by=(), filters=None, min_games=0, order_by=None, limit=None):
+    group_by = list(group_by)
+    filters = filters or {}
+
+    unknown = [d for d in group_by + list(filters) if d not in CUBE_DIMENSIONS]
+    if unknown:
+        raise ValueError(f'Unknown cube dimensions {unknown}, expected some of {CUBE_DIMENSIONS}')
+    if order_by is not None and order_by not in CUBE_STATS:
+        raise ValueError(f'Unknown cube stat {order_by!r}, expected one of {list(CUBE_STATS)}')
+
+    conditions = []
+    for dimension, value in filters.items():
+        values = list(value) if isinstance(value, (list, tuple, set)) else [value]
+        if not values:
+            raise ValueError(f'Empty {dimension} filter')
+        conditions.append(f"{dimension} IN ({', '.join(sql_value(dimension, v) for v in values)})")
+
+    lines = [
+        'SELECT ' + ', '.join(group_by + [f'{expr} AS {stat}' for stat, expr in CUBE_STATS.items()]),
+        f'FROM {CUBE_TABLE}'
+    ]
+    if conditions:
+        lines.append('WHERE ' + ' AND '.join(conditions))
+    if group_by:
+        lines.append('GROUP BY ' + ', '.join(group_by))
+    if min_games:
+        lines.append(f'HAVING SUM(GP) >= {int(min_games)}')
+
+    # ties (and unordered rollups) come back in group order
+    order = ([f'{order_by} DESC'] if order_by else []) + group_by
+    if order:
+        lines.append('ORDER BY ' + ', '.join(order))
+    if limit:
+        lines.append(f'LIMIT {int(limit)}')
+
+    return '\n'.join(lines)
+
+## Define a function to build a player's line against each opponent, optionally split by home/away and limited to one season
+## (served by idx_player_opponent, or the primary key with a season)
+def opponent_splits_query(player_id, season_id=None, by_location=False):
+    filters = {'PLAYER_ID': player_id}
+    if season_id is not None:
+        filters['SEASON_ID'] = season_id
+    return rollup_query(['OPPONENT', 'HOME_AWAY'] if by_location else ['OPPONENT'], filters)
+
+## Define a function to build the best players against one opponent by a stat, over every season or one
+## (served by idx_opponent_season)
+def best_vs_team_query(opponent, stat='PPG', season_id=None, min_games=3, limit=10):
+    filters = {'OPPONENT': opponent}
+    if season_id is not None:
+        filters['SEASON_ID'] = season_id
+    return rollup_query(['PLAYER_ID'], filters, min_games, stat, limit)
+
+## Define a function to run a rollup with a run_query(query) function (the dashboard's, mysql or the snapshot)
+def rollup(run_query, group_by=(), filters=None, min_games=0, order_by=None, limit=None):
+    return run_query(rollup_query(group_by, filters, min_games, order_by, limit))
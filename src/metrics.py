@@ -0,0 +1,247 @@
+### THIS SCRIPT RECORDS PIPELINE TIMINGS, COUNTERS AND LATENCY HISTOGRAMS, LOGS EVENTS AS JSON AND WRITES A PROMETHEUS METRICS FILE
+## Import libraries
+from bisect import bisect_left
+from contextlib import contextmanager
+from datetime import datetime, timezone
+import functools
+import json
+import logging
+import os
+import sys
+import threading
+import time
+
+# histogram buckets in seconds: latency covers a cache read up to a slow api call, stages cover a whole pull
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+STAGE_BUCKETS = (1.0, 5.0, 15.0, 30.0, 60.0, 120.0, 300.0, 600.0, 1800.0, 3600.0)
+
+# every metric name gets this prefix in the metrics file
+METRIC_PREFIX = 'nba_'
+
+# the pipeline writes its metrics here at the end of each run, override with METRICS_FILE in the .env file
+DEFAULT_METRICS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '.metrics', 'pipeline.prom')
+
+## Define a histogram with Prometheus-style buckets, plus the max so summaries can show the worst case
+class Histogram:
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self.max = 0.0
+
+    def observe(self, value):
+        # the last slot counts everything above the largest bucket (+Inf)
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+        self.max = max(self.max, value)
+
+    # upper bound of the bucket the q-th observation falls in (the max when it's past the last bucket)
+    def quantile(self, q):
+        if self.count == 0:
+            return None
+
+        target = q * self.count
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= target:
+                return min(bound, self.max)
+        return self.max
+
+## Define the registry every module records into, one per process
+class MetricsRegistry:
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counters = {}
+        self.gauges = {}
+        self.histograms = {}
+
+    # labels are stored as a sorted tuple so the same labels in any order hit the same series
+    @staticmethod
+    def series(name, labels):
+        return name, tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+    def inc(self, name, value=1, **labels):
+        key = self.series(name, labels)
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def set(self, name, value, **labels):
+        with self.lock:
+            self.gauges[self.series(name, labels)] = value
+
+    def observe(self, name, value, buckets=LATENCY_BUCKETS, **labels):
+        key = self.series(name, labels)
+        with self.lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = Histogram(buckets)
+            histogram.observe(value)
+
+    def counter(self, name, **labels):
+        with self.lock:
+            return self.counters.get(self.series(name, labels), 0)
+
+    # one row per label set of a histogram, in milliseconds, for the dashboard and the end-of-run log
+    def summary(self, name):
+        with self.lock:
+            rows = [
+                {
+                    **dict(labels),
+                    'count': h.count,
+                    'mean_ms': round(1000 * h.sum / h.count, 1),
+                    'p95_ms': round(1000 * h.quantile(0.95), 1),
+                    'max_ms': round(1000 * h.max, 1)
+                }
+                for (series_name, labels), h in self.histograms.items()
+                if series_name == name and h.count
+            ]
+        return sorted(rows, key=lambda row: -row['mean_ms'])
+
+    def reset(self):
+        with self.lock:
+            self.counters.clear()
+            self.gauges.clear()
+            self.histograms.clear()
+
+    # render every series in the Prometheus text exposition format
+    def to_prometheus(self):
+        def label_text(labels, extra=()):
+            pairs = list(labels) + list(extra)
+            if not pairs:
+                return ''
+            escaped = [(k, v.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')) for k, v in pairs]
+            return '{' + ','.join(f'{k}="{v}"' for k, v in escaped) + '}'
+
+        lines = []
+        with self.lock:
+            for kind, series in (('counter', self.counters), ('gauge', self.gauges)):
+                typed = set()
+                for (name, labels), value in sorted(series.items()):
+                    if name not in typed:
+                        lines.append(f'# TYPE {METRIC_PREFIX}{name} {kind}')
+                        typed.add(name)
+                    lines.append(f'{METRIC_PREFIX}{name}{label_text(labels)} {value}')
+
+            typed = set()
+            for (name, labels), h in sorted(self.histograms.items()):
+                if name not in typed:
+                    lines.append(f'# TYPE {METRIC_PREFIX}{name} histogram')
+                    typed.add(name)
+
+                # bucket counts are cumulative in the exposition format
+                cumulative = 0
+                for bound, count in zip(h.buckets, h.counts):
+                    cumulative += count
+                    lines.append(f'{METRIC_PREFIX}{name}_bucket{label_text(labels, [("le", repr(bound))])} {cumulative}')
+                lines.append(f'{METRIC_PREFIX}{name}_bucket{label_text(labels, [("le", "+Inf")])} {h.count}')
+                lines.append(f'{METRIC_PREFIX}{name}_sum{label_text(labels)} {h.sum}')
+                lines.append(f'{METRIC_PREFIX}{name}_count{label_text(labels)} {h.count}')
+
+        return '\n'.join(lines) + '\n'
+
+    # write through a temp file and rename, so a scraper (e.g. node_exporter's textfile collector) never reads half a file
+    def write_prometheus(self, path=None):
+        path = path or os.getenv('METRICS_FILE', DEFAULT_METRICS_FILE)
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+        tmp_path = f'{path}.tmp'
+        with open(tmp_path, 'w') as f:
+            f.write(self.to_prometheus())
+        os.replace(tmp_path, path)
+        return path
+
+metrics = MetricsRegistry()
+
+## Define a log formatter that writes one JSON object per line
+class JsonFormatter(logging.Formatter):
+
+    def format(self, record):
+        entry = {
+            'ts': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname.lower(),
+            'event': getattr(record, 'event', record.name),
+            'message': record.getMessage(),
+            **getattr(record, 'fields', {})
+        }
+        return json.dumps(entry, default=str)
+
+## Define a log formatter for reading at a terminal: the message followed by its fields
+class TextFormatter(logging.Formatter):
+
+    def format(self, record):
+        fields = ' '.join(f'{k}={v}' for k, v in getattr(record, 'fields', {}).items())
+        return f'{record.getMessage()}  {fields}' if fields else record.getMessage()
+
+## Define a function to get the pipeline logger, configured from LOG_FORMAT (json or text) and LOG_LEVEL on first use
+_logger_lock = threading.Lock()
+
+def get_logger():
+    logger = logging.getLogger('nba')
+
+    with _logger_lock:
+        if not logger.handlers:
+            handler = logging.StreamHandler(sys.stdout)
+            handler.setFormatter(TextFormatter() if os.getenv('LOG_FORMAT', 'json').lower() == 'text' else JsonFormatter())
+            logger.addHandler(handler)
+            logger.setLevel(os.getenv('LOG_LEVEL', 'INFO').upper())
+            logger.propagate = False
+
+    return logger
+
+## Define a function to log one structured event, e.g. log_event('gamelogs_cleaned', 'Game logs cleaned', rows=1200)
+def log_event(event, message=None, level=logging.INFO, **fields):
+    get_logger().log(level, message or event, extra={'event': event, 'fields': fields})
+
+## Define a context manager that times a block into a latency histogram, e.g. with timed('db_batch', table='PLAYER_GAME_LOGS')
+@contextmanager
+def timed(name, buckets=LATENCY_BUCKETS, **labels):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics.observe(f'{name}_seconds', time.perf_counter() - start, buckets, **labels)
+
+## Define a context manager for a pipeline stage: logs its start and end, times it and counts the rows it handled
+## the block sets stage_info['rows'] when it knows how many rows it processed
+@contextmanager
+def stage(name):
+    stage_info = {'rows': None}
+    start = time.perf_counter()
+    log_event('stage_started', f'{name} started', stage=name)
+
+    try:
+        yield stage_info
+    except BaseException as e:
+        seconds = time.perf_counter() - start
+        metrics.inc('stage_failures_total', stage=name)
+        log_event('stage_failed', f'{name} failed after {seconds:.2f}s: {e}', logging.ERROR, stage=name, seconds=round(seconds, 3), error=repr(e))
+        raise
+
+    seconds = time.perf_counter() - start
+    rows = stage_info['rows']
+    metrics.observe('stage_duration_seconds', seconds, STAGE_BUCKETS, stage=name)
+    metrics.set('stage_last_duration_seconds', round(seconds, 6), stage=name)
+
+    fields = {'stage': name, 'seconds': round(seconds, 3)}
+    if rows is not None:
+        metrics.inc('rows_processed_total', rows, stage=name)
+        fields.update(rows=rows, rows_per_sec=round(rows / max(seconds, 1e-9), 1))
+
+    log_event('stage_finished', f'{name} finished in {seconds:.2f}s', **fields)
+
+## Define a decorator that runs a whole function as a stage, counting rows from its result with rows_of
+def staged(name, rows_of=len):
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with stage(name) as stage_info:
+                result = fn(*args, **kwargs)
+                stage_info['rows'] = rows_of(result) if rows_of is not None else None
+            return result
+        return wrapper
+    return decorate
@@ -0,0 +1,134 @@
+### THIS SCRIPT BRINGS AN EXISTING DATABASE UP TO sql/nba__schemas.sql WITHOUT DROPPING ANY DATA
+## Usage (from src): python migrate.py   (execute_pipeline.py also runs it at the start of every run)
+## Every step checks information_schema first, so running it again is a no-op
+## Import libraries
+from db_connection import pooled_connection
+from schema import table_statements, table_columns, table_indexes, view_definitions
+from aggregates import rebuild_season_aggregates
+from metrics import log_event, staged
+
+# columns and indexes added to tables that already existed, by table, in the order they were added
+# (definitions are read from the schema file, so a migrated database ends up the same as a fresh one)
+SCHEMA_CHANGES = [
+    # dashboard query shapes: recent games by date, monthly stats grouped on a stored month
+    ('PLAYER_GAME_LOGS', ['GAME_MONTH'], ['idx_player_date', 'idx_player_month']),
+    # row hashes, NULL on rows stored before them so those rows are rewritten once the next time they are pulled
+    ('PLAYER_METADATA', ['ROW_HASH'], []),
+    ('PLAYER_GAME_LOGS', ['ROW_HASH'], []),
+    # derived per-game metrics, their season sums and the best-games index
+    ('PLAYER_GAME_LOGS', ['GAME_SCORE', 'TSA', 'TS_PCT', 'EFG_PCT', 'POSS_USED', 'USG_PER_36'], ['idx_player_game_score']),
+    ('PLAYER_SEASON_SUMMARY', ['SUM_GAME_SCORE', 'SUM_TSA', 'SUM_POSS_USED', 'MAX_POSS_USED'], []),
+    # best TS%, eFG% and usage games per season, for the career highs view
+    ('PLAYER_SEASON_SUMMARY', ['MAX_TS_PCT', 'MAX_EFG_PCT', 'MAX_USG_PER_36'], [])
+]
+
+# fills a new column on the rows stored before it existed, run once right after the column is added
+# (derived metrics use the same formulas as clean_data.add_derived_metrics, 0 when there were no attempts)
+BACKFILLS = {
+    ('PLAYER_GAME_LOGS', 'GAME_SCORE'): """
+        UPDATE PLAYER_GAME_LOGS SET
+            GAME_SCORE = ROUND(PTS + 0.4 * FGM - 0.7 * FGA - 0.4 * (FTA - FTM) + 0.7 * OREB + 0.3 * DREB
+                               + STL + 0.7 * AST + 0.7 * BLK - 0.4 * PF - TOV, 1),
+            TSA = ROUND(FGA + 0.44 * FTA, 2),
+            TS_PCT = ROUND(COALESCE(PTS / NULLIF(2 * (FGA + 0.44 * FTA), 0), 0), 3),
+            EFG_PCT = ROUND(COALESCE((FGM + 0.5 * FG3M) / NULLIF(FGA, 0), 0), 3),
+            POSS_USED = ROUND(FGA + 0.44 * FTA + TOV, 2),
+            USG_PER_36 = ROUND(COALESCE(36 * (FGA + 0.44 * FTA + TOV) / NULLIF(MIN, 0), 0), 2)
+        WHERE GAME_SCORE IS NULL
+    """
+}
+
+# tables built from PLAYER_GAME_LOGS, which have to be rebuilt when they are created or change shape
+AGGREGATE_TABLES = ['PLAYER_SEASON_SUMMARY', 'PLAYER_SEASON_SPLITS', 'PLAYER_MATCHUP_CUBE']
+
+## Define a function to list the tables of the current database
+def existing_tables(cursor):
+    cursor.execute('SELECT TABLE_NAME FROM information_schema.TABLES WHERE TABLE_SCHEMA = DATABASE()')
+    return {row[0].upper() for row in cursor.fetchall()}
+
+## Define a function to list a table's columns in the current database
+def existing_columns(cursor, table):
+    cursor.execute('SELECT COLUMN_NAME FROM information_schema.COLUMNS WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s', (table,))
+    return {row[0].upper() for row in cursor.fetchall()}
+
+## Define a function to list a table's indexes in the current database
+def existing_indexes(cursor, table):
+    cursor.execute('SELECT DISTINCT INDEX_NAME FROM information_schema.STATISTICS WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s', (table,))
+    return {row[0] for row in cursor.fetchall()}
+
+## Define a function to build one ALTER TABLE adding a table's missing columns and indexes (one table rebuild, not one per change)
+## each new column goes after the nearest column before it in the schema file that the table already has
+def alter_statement(table, columns, indexes, present):
+    definitions = table_columns(table)
+    order = list(definitions)
+    present = set(present)
+
+    clauses = []
+    for col in sorted(columns, key=order.index):
+        previous = [c for c in order[:order.index(col)] if c in present]
+        clauses.append(f"ADD COLUMN {definitions[col]} {f'AFTER {previous[-1]}' if previous else 'FIRST'}")
+        present.add(col)
+
+    clauses += [f'ADD INDEX {index} {table_indexes(table)[index]}' for index in indexes]
+    return f"ALTER TABLE {table} {', '.join(clauses)}"
+
+## Define a function to apply every missing change, returning the steps it took
+@staged('migrate', rows_of=None)
+def migrate():
+    steps = []
+
+    with pooled_connection() as conn:
+        cursor = conn.cursor()
+
+        # tables added since the database was created (CREATE TABLE IF NOT EXISTS, in the schema file's order)
+        tables = existing_tables(cursor)
+        created = [table for table in table_statements() if table not in tables]
+        for table in created:
+            cursor.execute(table_statements()[table])
+            steps.append(f'create {table}')
+
+        # columns and indexes added to existing tables, each checked against information_schema first
+        missing = {}
+        for table, columns, indexes in SCHEMA_CHANGES:
+            if table in created:
+                continue
+
+            present_columns, present_indexes = existing_columns(cursor, table), existing_indexes(cursor, table)
+            add_columns, add_indexes = missing.setdefault(table, ([], []))
+            add_columns += [col for col in columns if col not in present_columns]
+            add_indexes += [index for index in indexes if index not in present_indexes]
+
+        altered, backfilled = [], False
+        for table, (columns, indexes) in missing.items():
+            if columns or indexes:
+                cursor.execute(alter_statement(table, columns, indexes, existing_columns(cursor, table)))
+                altered.append(table)
+                steps.append(f"alter {table}: {', '.join(columns + indexes)}")
+
+                for col in columns:
+                    if (table, col) in BACKFILLS:
+                        cursor.execute(BACKFILLS[table, col])
+                        steps.append(f'backfill {table}.{col}: {cursor.rowcount} rows')
+                        backfilled = True
+
+        # views last, they may read the columns added above
+        for view, query in view_definitions().items():
+            cursor.execute(f'CREATE OR REPLACE VIEW {view} AS {query}')
+
+        conn.commit()
+        cursor.close()
+
+    # new or reshaped aggregate tables start out empty or stale, and so do all of them after a backfill of the game logs
+    if backfilled or any(table in created + altered for table in AGGREGATE_TABLES):
+        rebuild_season_aggregates()
+        steps.append('rebuild aggregates')
+
+    if steps:
+        log_event('schema_migrated', f"Schema migrated: {'; '.join(steps)}", steps=steps)
+    else:
+        log_event('schema_current', 'Schema is up to date.')
+
+    return steps
+
+if __name__ == '__main__':
+    migrate()
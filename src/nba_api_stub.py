@@ -0,0 +1,66 @@
+### THIS SCRIPT DEFINES OFFLINE STAND-INS FOR THE NBA_API ENDPOINTS, SERVING SYNTHETIC DATA WITH CONFIGURABLE LATENCY AND ERRORS
+## Import libraries
+import threading
+import time
+import numpy as np
+from synthetic_data import make_player_gamelog, make_player_season, make_player_info
+
+## Define the stub api, its PlayerGameLog and CommonPlayerInfo attributes are drop-in endpoint classes for pull_data
+class StubNBAApi:
+
+    def __init__(self, player_list, seasons, latency=0.05, jitter=0.5, error_rate=0.0, seed=0):
+        self.players = {p['id']: p for p in player_list}
+        self.seasons = seasons
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.seed = seed
+
+        self.rng = np.random.default_rng(seed)
+        self.lock = threading.Lock()
+        self.calls = 0
+        self.errors = 0
+
+        # names differ from the real endpoints so stub responses can never land in the real response cache
+        self.PlayerGameLog = self.endpoint('StubPlayerGameLog', self.player_gamelog)
+        self.CommonPlayerInfo = self.endpoint('StubCommonPlayerInfo', self.player_info)
+
+    # wait like a network round trip and fail some requests like the real api does under load
+    def simulate_request(self):
+        with self.lock:
+            self.calls += 1
+            delay = self.latency * (1 + self.jitter * (2 * self.rng.random() - 1))
+            failed = self.rng.random() < self.error_rate
+            if failed:
+                self.errors += 1
+
+        time.sleep(max(delay, 0))
+        if failed:
+            raise TimeoutError('stub nba_api request timed out')
+
+    def player_gamelog(self, player_id, season='ALL', **kwargs):
+        if season == 'ALL':
+            return [make_player_gamelog(player_id, self.seasons, self.seed)]
+        return [make_player_season(player_id, season, self.seed)]
+
+    def player_info(self, player_id, **kwargs):
+        return [make_player_info(self.players[player_id], self.seed)]
+
+    # build an endpoint class: constructing it makes the request, get_data_frames() returns the frames
+    def endpoint(self, name, build):
+        api = self
+
+        class Endpoint:
+            def __init__(self, **params):
+                api.simulate_request()
+                self.frames = build(**params)
+
+            def get_data_frames(self):
+                return self.frames
+
+        Endpoint.__name__ = name
+        return Endpoint
+
+    def stats(self):
+        with self.lock:
+            return {'calls': self.calls, 'errors': self.errors}
@@ -0,0 +1,129 @@
+### THIS SCRIPT LOADS EVERYTHING A PLAYER PAGE SHOWS FROM THE SUMMARY TABLES AND INDEXES, NEVER THE PLAYER'S FULL GAME LOG
+## Import libraries
+from dataclasses import dataclass
+import time
+import pandas as pd
+from db_connection import pooled_connection
+from dashboard_queries import PLAYER_PAGE_QUERIES, PLAYER_GAME_LOGS_QUERY
+
+METADATA_COLS = [
+    'PLAYER_ID', 'PLAYER_NAME', 'DOB', 'HEIGHT', 'WEIGHT', 'POSITION',
+    'DRAFT_YEAR', 'DRAFT_ROUND', 'DRAFT_NUMBER', 'SCHOOL', 'COUNTRY', 'HEADSHOT_URL'
+]
+
+# columns of the page queries (metadata aside) that stay text, every other one is a number
+# (mysql returns DECIMAL columns as Decimal objects and NULL-able ones as objects)
+TEXT_COLS = {'PLAYER_NAME', 'SEASON_ID', 'GAME_DATE', 'TEAM', 'OPPONENT', 'HOME_AWAY', 'WL', 'LOCATION', 'RESULT', 'YEAR_MONTH'}
+
+# most recent games read for the recent games section, the most its slider shows
+RECENT_GAMES_LOADED = 20
+
+# best games shown on the career highs section
+BEST_GAMES_SHOWN = 5
+
+## Define the bundle handed to every section of the player page
+@dataclass
+class PlayerBundle:
+    player_id: int
+    metadata: pd.Series
+    seasons: pd.DataFrame
+    career_highs: pd.Series
+    best_games: pd.DataFrame
+    recent: pd.DataFrame
+    home_away: pd.DataFrame
+    win_loss: pd.DataFrame
+    monthly: pd.DataFrame
+    load_ms: float
+
+    # seasons oldest first, for the trend charts
+    def season_trend(self):
+        return self.seasons.sort_values('SEASON_ID')[['SEASON_ID', 'GP', 'PPG', 'RPG', 'APG', 'FG_PCT', 'FG3_PCT', 'FT_PCT']].reset_index(drop=True)
+
+    # the most recent N games, newest first (up to RECENT_GAMES_LOADED)
+    def recent_games(self, num_games=10):
+        return self.recent.head(num_games).reset_index(drop=True)
+
+## Define a function to give a page query's result the dtypes the sections expect
+## (only object columns are converted, the snapshot already returns typed columns)
+def numeric_frame(df):
+    df = df.copy()
+    for col in df.columns[df.dtypes == object]:
+        if col == 'GAME_DATE':
+            df[col] = pd.to_datetime(df[col])
+        elif col not in TEXT_COLS:
+            df[col] = pd.to_numeric(df[col])
+    return df
+
+## Define a function to read the career highs row (PLAYER_CAREER_HIGHS, the max of a player's season summary rows)
+def build_career_highs(highs):
+    if highs.empty:
+        return None
+
+    # players with no qualifying game have NULL shooting highs
+    return numeric_frame(highs).iloc[0]
+
+## Define a function to turn the page query results, by PLAYER_PAGE_QUERIES name, into a PlayerBundle
+def build_player_bundle(player_id, results, load_ms=0.0):
+    if results['metadata'].empty:
+        return None
+
+    return PlayerBundle(
+        player_id=player_id,
+        metadata=results['metadata'].iloc[0][METADATA_COLS],
+        seasons=numeric_frame(results['seasons']),
+        career_highs=build_career_highs(results['career_highs']),
+        best_games=numeric_frame(results['best_games']),
+        recent=numeric_frame(results['recent_games']),
+        home_away=numeric_frame(results['home_away']),
+        win_loss=numeric_frame(results['win_loss']),
+        monthly=numeric_frame(results['monthly']),
+        load_ms=load_ms
+    )
+
+## Define a function to run a query on a pooled mysql connection (the default read path)
+def read_mysql(query):
+    with pooled_connection() as conn:
+        return pd.read_sql(query, conn)
+
+## Define a function to send several SELECTs to mysql as one multi-statement call and read back a DataFrame per query, in order
+## (the connector enables multi statements by default, each result set is read with nextset)
+def fetch_result_sets(conn, queries):
+    cursor = conn.cursor()
+    try:
+        cursor.execute(';\n'.join(queries))
+
+        frames = [pd.DataFrame(cursor.fetchall(), columns=cursor.column_names)]
+        while cursor.nextset():
+            frames.append(pd.DataFrame(cursor.fetchall(), columns=cursor.column_names))
+    finally:
+        cursor.close()
+
+    return frames
+
+## Define a function to run several queries in one round trip on one pooled mysql connection (the default bundle read path)
+def read_mysql_many(queries):
+    with pooled_connection() as conn:
+        return fetch_result_sets(conn, queries)
+
+## Define a function to fetch and build a player's bundle, run_queries picks mysql or the snapshot
+## every page query goes out in one call, and each reads the summary tables or a LIMITed index range,
+## so a veteran's page costs one round trip, the same as a rookie's
+def load_player_bundle(player_id, run_queries=read_mysql_many):
+    start = time.perf_counter()
+
+    limits = {'recent_games': RECENT_GAMES_LOADED, 'best_games': BEST_GAMES_SHOWN}
+    queries = [
+        query.format(player_id=int(player_id), num_games=limits.get(name, 0), season_filter='')
+        for name, query in PLAYER_PAGE_QUERIES.items()
+    ]
+    results = dict(zip(PLAYER_PAGE_QUERIES, run_queries(queries)))
+
+    bundle = build_player_bundle(int(player_id), results)
+    if bundle is not None:
+        bundle.load_ms = 1000 * (time.perf_counter() - start)
+
+    return bundle
+
+## Define a function to fetch a player's full game log for the custom splits (splits.compute_splits), oldest game first
+def load_player_game_logs(player_id, run_query=read_mysql):
+    return numeric_frame(run_query(PLAYER_GAME_LOGS_QUERY.format(player_id=int(player_id))))
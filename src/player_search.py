@@ -0,0 +1,100 @@
+### THIS SCRIPT BUILDS THE SIDEBAR'S PLAYER SEARCH INDEX: ACCENT FOLDING, A PREFIX INDEX AND TRIGRAM SIMILARITY RANKING
+## Import libraries
+from bisect import bisect_left, bisect_right
+import re
+import unicodedata
+import numpy as np
+
+# letters that don't decompose into a base letter plus an accent
+EXTRA_FOLDS = str.maketrans({'ø': 'o', 'đ': 'd', 'ł': 'l', 'æ': 'ae', 'œ': 'oe', 'ß': 'ss', 'ı': 'i'})
+
+# fuzzy matches must share at least this share of the query's trigrams
+MIN_SIMILARITY = 0.4
+
+## Define a function to fold a name for matching: lower case, no accents, punctuation as spaces
+def fold(text):
+    text = unicodedata.normalize('NFKD', str(text).lower().translate(EXTRA_FOLDS))
+    text = ''.join(c for c in text if not unicodedata.combining(c))
+    return re.sub(r'[^a-z0-9]+', ' ', text).strip()
+
+## Define a function to list a folded string's trigrams, padded so short names and word starts still count
+def trigrams(text):
+    padded = f'  {text} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+## Define the index, built once per metadata version and queried on every rerun
+class PlayerSearchIndex:
+
+    def __init__(self, players):
+        self.player_ids = players['PLAYER_ID'].to_numpy(dtype='int64')
+        self.names = players['PLAYER_NAME'].astype(str).tolist()
+        folded = [fold(name) for name in self.names]
+
+        # prefix index: every folded full name and every word in it, sorted for binary search
+        entries = sorted(
+            (key, i) for i, name in enumerate(folded)
+            for key in {name, *name.split(' ')}
+            if key
+        )
+        self.prefix_keys = [key for key, _ in entries]
+        self.prefix_rows = [i for _, i in entries]
+
+        # trigram postings: for each trigram, the rows whose name contains it
+        postings = {}
+        name_trigrams = [trigrams(name) for name in folded]
+        for i, grams in enumerate(name_trigrams):
+            for gram in grams:
+                postings.setdefault(gram, []).append(i)
+
+        self.postings = {gram: np.array(rows, dtype='int32') for gram, rows in postings.items()}
+        self.trigram_counts = np.array([len(grams) for grams in name_trigrams], dtype='float64')
+
+    def __len__(self):
+        return len(self.names)
+
+    # rows with a word (or the full name) starting with the prefix
+    def prefix_rows_for(self, prefix):
+        start = bisect_left(self.prefix_keys, prefix)
+        stop = bisect_right(self.prefix_keys, prefix + '\uffff')
+        return set(self.prefix_rows[start:stop])
+
+    # rows ranked by trigram similarity to the query, best first
+    def trigram_rows_for(self, query):
+        query_grams = trigrams(query)
+        grams = [gram for gram in query_grams if gram in self.postings]
+        if not grams:
+            return []
+
+        shared = np.bincount(np.concatenate([self.postings[gram] for gram in grams]), minlength=len(self.names))
+
+        # share of the query found in the name (so a surname alone can match a full name), ties go to the closer name
+        similarity = shared / len(query_grams)
+        closeness = shared / (len(query_grams) + self.trigram_counts - shared)
+
+        candidates = np.flatnonzero(similarity >= MIN_SIMILARITY)
+        order = np.lexsort((-closeness[candidates], -similarity[candidates]))
+        return candidates[order].tolist()
+
+    # player ids matching the query, best match first (limit=None returns every match)
+    # allowed_ids restricts the matches before the limit is applied, so players that can't be shown don't use up the limit
+    def search(self, query, limit=50, allowed_ids=None):
+        query = fold(query)
+        if not query:
+            return []
+
+        allowed = np.ones(len(self.names), dtype=bool) if allowed_ids is None else np.isin(self.player_ids, np.asarray(allowed_ids, dtype='int64'))
+
+        # every word typed must start a word of the name, e.g. 'nik jok' finds Nikola Jokic
+        words = query.split(' ')
+        prefix_hits = self.prefix_rows_for(words[0])
+        for word in words[1:]:
+            prefix_hits &= self.prefix_rows_for(word)
+
+        ranked = sorted((i for i in prefix_hits if allowed[i]), key=lambda i: self.names[i])
+
+        # fill the rest with fuzzy matches so typos still find the player
+        if limit is None or len(ranked) < limit:
+            seen = set(ranked)
+            ranked += [i for i in self.trigram_rows_for(query) if i not in seen and allowed[i]]
+
+        return self.player_ids[ranked if limit is None else ranked[:limit]].tolist()
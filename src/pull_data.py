@@ -5,83 +5,261 @@ from nba_api.stats.endpoints import playergamelog
 from nba_api.stats.endpoints import playercareerstats
 from nba_api.stats.static import players
 from nba_api.stats.endpoints import commonplayerinfo
-import time
+from nba_api.stats.endpoints import leaguegamelog
+from fetch_engine import fetch_all
+from response_cache import ResponseCache, ttl_for_season, METADATA_TTL
+from checkpoints import CheckpointStore, DEFAULT_CHECKPOINT_DIR
+from metrics import metrics, log_event, staged
+import logging
 from datetime import datetime
 
+## Define a function to resolve the cache argument (None = default on-disk cache, False = no cache)
+def resolve_cache(cache):
+    if cache is None:
+        return ResponseCache()
+    return cache or None
+
+## Define a function to call one endpoint per player, serving repeat requests from the response cache
+def pull_per_player(player_list, endpoint, params_fn, ttl, label, cache, requests_per_second, max_workers, checkpoint=None):
+
+    # players finished by an earlier, interrupted run come straight from the checkpoint store
+    responses = checkpoint.load_done() if checkpoint else {}
+    to_fetch = []
+
+    # cache hits never touch the api, so they also skip the rate limiter
+    for player in player_list:
+        if player['id'] in responses:
+            continue
+
+        frames = cache.get(endpoint.__name__, params_fn(player)) if cache else None
+        if frames is not None:
+            responses[player['id']] = frames[0]
+            if checkpoint:
+                checkpoint.save(player['id'], frames[0])
+        else:
+            to_fetch.append(player)
+
+    if cache:
+        metrics.inc('response_cache_hits_total', len(responses), endpoint=endpoint.__name__)
+        log_event('response_cache', f'{len(responses)}/{len(player_list)} players served from the response cache',
+                  endpoint=endpoint.__name__, served=len(responses), players=len(player_list))
+
+    def fetch(player):
+        return endpoint(**params_fn(player)).get_data_frames()
+
+    completed = len(responses)
+
+    def report(i, player, frames, error):
+        nonlocal completed
+        completed += 1
+
+        if error is not None:
+            metrics.inc('players_failed_total', endpoint=endpoint.__name__)
+            log_event('pull_failed', f'Unable to pull {label} for {player["full_name"]}: {error}', logging.WARNING,
+                      endpoint=endpoint.__name__, player_id=player['id'], error=repr(error))
+            if checkpoint:
+                checkpoint.fail(player['id'], error)
+            return
+
+        if cache:
+            cache.put(endpoint.__name__, params_fn(player), frames, ttl)
+        if checkpoint:
+            checkpoint.save(player['id'], frames[0])
+
+        responses[player['id']] = frames[0]
+        metrics.inc('api_rows_received_total', len(frames[0]), endpoint=endpoint.__name__)
+        log_event('pull_player', f'{label.capitalize()} for {player["full_name"]} successfully retrieved ({completed}/{len(player_list)})',
+                  endpoint=endpoint.__name__, player_id=player['id'], rows=len(frames[0]), completed=completed, players=len(player_list))
+
+    fetch_all(
+        to_fetch,
+        fetch,
+        requests_per_second=requests_per_second,
+        max_workers=max_workers,
+        on_result=report,
+        name=endpoint.__name__
+    )
+
+    if cache:
+        cache.flush()
+    if checkpoint:
+        checkpoint.finish()
+
+    return responses
+
 ## Define a function to pull game logs
-def pull_gamelogs(season='ALL', sleep_time=3):
+## (player_list defaults to every active player, the benchmarks pass synthetic players and their own checkpoint_dir)
+@staged('pull_gamelogs')
+def pull_gamelogs(season='ALL', requests_per_second=2.0, max_workers=4, endpoint=playergamelog.PlayerGameLog, cache=None, resume=False,
+                  player_list=None, checkpoint_dir=DEFAULT_CHECKPOINT_DIR):
 
-    print(f'Pulling game logs for all active players...')
+    log_event('pull_gamelogs', 'Pulling game logs for all active players...', season=season)
     
-    active_players = players.get_active_players()
+    active_players = players.get_active_players() if player_list is None else player_list
     all_gamelogs = []
 
-    for i, player in enumerate(active_players):
-        player_id = player['id']
-        player_name = player['full_name']
-
-        try:
-            gamelog = playergamelog.PlayerGameLog(
-                player_id=player_id, 
-                season=season
-            ).get_data_frames()[0]
-           
-            if not gamelog.empty:
-                gamelog['PLAYER_ID'] = player_id
-                gamelog['PLAYER_NAME'] = player_name
-                all_gamelogs.append(gamelog)
-                print(f'Logs for {player_name} successfully retrieved ({i+1}/{len(active_players)})')
-            
-        except Exception as e:
-            print(f'Unable to pull logs for {player_name}: {e}')
-
-        time.sleep(sleep_time)
+    checkpoint = CheckpointStore('gamelogs', {'season': season}, [p['id'] for p in active_players], resume=resume, checkpoint_dir=checkpoint_dir)
+
+    responses = pull_per_player(
+        active_players,
+        endpoint,
+        lambda player: {'player_id': player['id'], 'season': season},
+        ttl_for_season(season),
+        'logs',
+        resolve_cache(cache),
+        requests_per_second,
+        max_workers,
+        checkpoint
+    )
+
+    # walk the players in their original order so the output is deterministic
+    for player in active_players:
+        gamelog = responses.get(player['id'])
+
+        if gamelog is not None and not gamelog.empty:
+            gamelog['PLAYER_ID'] = player['id']
+            gamelog['PLAYER_NAME'] = player['full_name']
+            all_gamelogs.append(gamelog)
 
     if all_gamelogs:
         raw_df = pd.concat(all_gamelogs, ignore_index=True)
-        print(f'\nSuccess! Retrieved {len(all_gamelogs)}/{len(active_players)} players')
+        log_event('pull_gamelogs', f'Success! Retrieved {len(all_gamelogs)}/{len(active_players)} players',
+                  players=len(all_gamelogs), requested=len(active_players), rows=len(raw_df))
         return raw_df
     else:
-        print('\nNo game logs retrieved!')
+        log_event('pull_gamelogs', 'No game logs retrieved!', logging.WARNING, players=0, requested=len(active_players))
         return pd.DataFrame()
 
-def pull_metadata(sleep_time=1):
+## Define the columns PlayerGameLog returns, league logs are reshaped to match so clean_gamelogs works on both
+PLAYER_GAMELOG_COLUMNS = [
+    'SEASON_ID', 'Player_ID', 'Game_ID', 'GAME_DATE', 'MATCHUP', 'WL',
+    'MIN', 'FGM', 'FGA', 'FG_PCT', 'FG3M', 'FG3A', 'FG3_PCT',
+    'FTM', 'FTA', 'FT_PCT', 'OREB', 'DREB', 'REB', 'AST', 'STL',
+    'BLK', 'TOV', 'PF', 'PTS', 'PLUS_MINUS', 'VIDEO_AVAILABLE',
+    'PLAYER_ID', 'PLAYER_NAME'
+]
+
+## Define a function to reshape a LeagueGameLog frame into the PlayerGameLog layout
+def normalize_league_gamelogs(league_df):
+    df = league_df.rename(columns={'GAME_ID': 'Game_ID'})
+    df['Player_ID'] = df['PLAYER_ID']
+
+    if 'VIDEO_AVAILABLE' not in df.columns:
+        df['VIDEO_AVAILABLE'] = 0
+
+    return df[PLAYER_GAMELOG_COLUMNS]
+
+## Define a function to backfill whole seasons with one league-wide request per season
+@staged('pull_league_gamelogs')
+def pull_league_gamelogs(seasons, season_type='Regular Season', requests_per_second=2.0, max_workers=4, endpoint=leaguegamelog.LeagueGameLog, cache=None):
+
+    log_event('pull_league_gamelogs', f'Pulling league game logs for {len(seasons)} seasons...', seasons=len(seasons))
+
+    cache = resolve_cache(cache)
+    params_for = lambda season: {
+        'season': season,
+        'season_type_all_star': season_type,
+        'player_or_team_abbreviation': 'P'
+    }
+
+    season_logs = {}
+    to_fetch = []
+
+    for season in seasons:
+        frames = cache.get(endpoint.__name__, params_for(season)) if cache else None
+        if frames is not None:
+            season_logs[season] = frames[0]
+        else:
+            to_fetch.append(season)
+
+    def fetch(season):
+        return endpoint(**params_for(season)).get_data_frames()
+
+    def report(i, season, frames, error):
+        if error is not None:
+            log_event('pull_failed', f'Unable to pull league logs for {season}: {error}', logging.WARNING,
+                      endpoint=endpoint.__name__, season=season, error=repr(error))
+            return
+
+        if cache:
+            cache.put(endpoint.__name__, params_for(season), frames, ttl_for_season(season))
+
+        season_logs[season] = frames[0]
+        metrics.inc('api_rows_received_total', len(frames[0]), endpoint=endpoint.__name__)
+        log_event('pull_season', f'League logs for {season} successfully retrieved ({len(frames[0])} rows)',
+                  endpoint=endpoint.__name__, season=season, rows=len(frames[0]))
+
+    fetch_all(
+        to_fetch,
+        fetch,
+        requests_per_second=requests_per_second,
+        max_workers=max_workers,
+        on_result=report,
+        name=endpoint.__name__
+    )
+
+    if cache:
+        cache.flush()
+
+    # league logs include every player who appeared that season, retired or not
+    all_gamelogs = [normalize_league_gamelogs(season_logs[s]) for s in seasons if s in season_logs and not season_logs[s].empty]
+
+    if all_gamelogs:
+        raw_df = pd.concat(all_gamelogs, ignore_index=True)
+        raw_df = raw_df.sort_values(['PLAYER_ID', 'GAME_DATE', 'Game_ID'], ignore_index=True)
+        log_event('pull_league_gamelogs', f'Success! Retrieved {len(raw_df)} game logs across {len(all_gamelogs)}/{len(seasons)} seasons',
+                  rows=len(raw_df), seasons=len(all_gamelogs), requested=len(seasons))
+        return raw_df
+    else:
+        log_event('pull_league_gamelogs', 'No game logs retrieved!', logging.WARNING, seasons=0, requested=len(seasons))
+        return pd.DataFrame()
+
+@staged('pull_metadata')
+def pull_metadata(requests_per_second=2.0, max_workers=4, endpoint=commonplayerinfo.CommonPlayerInfo, cache=None, resume=False,
+                  player_list=None, checkpoint_dir=DEFAULT_CHECKPOINT_DIR):
     
-    active_players = players.get_active_players()
+    active_players = players.get_active_players() if player_list is None else player_list
     metadata = []
-    print('Pulling player metadata...')
-
-    for i, player in enumerate(active_players):
-        try:
-            player_id = player['id']
-            player_name = player['full_name']
-
-            player_info = commonplayerinfo.CommonPlayerInfo(
-                player_id=player_id
-            ).get_data_frames()[0]
-            
-            # Extract raw data
-            player_dict = {
-                'PLAYER_ID': player_id,
-                'PLAYER_NAME': player_name,
-                'DOB': player_info.loc[0, 'BIRTHDATE'],
-                'HEIGHT': player_info.loc[0, 'HEIGHT'],
-                'WEIGHT': player_info.loc[0, 'WEIGHT'],
-                'POSITION': player_info.loc[0, 'POSITION'],
-                'DRAFT_YEAR': player_info.loc[0, 'DRAFT_YEAR'],
-                'DRAFT_ROUND': player_info.loc[0, 'DRAFT_ROUND'],
-                'DRAFT_NUMBER': player_info.loc[0, 'DRAFT_NUMBER'],
-                'SCHOOL': player_info.loc[0, 'SCHOOL'],
-                'COUNTRY': player_info.loc[0, 'COUNTRY'],
-                'HEADSHOT_URL': f'https://cdn.nba.com/headshots/nba/latest/260x190/{player_id}.png'
-            }
-
-            metadata.append(player_dict)
-            print(f'Metadata for {player_name} successfully retrieved ({i+1}/{len(active_players)})')
-            time.sleep(sleep_time)
-
-        except Exception as e:
-            print(f'Unable to pull metadata for {player_name}: {e}')
-
-    print(f'\nMetadata retrieved for {len(metadata)} players')
+    log_event('pull_metadata', 'Pulling player metadata...', players=len(active_players))
+
+    checkpoint = CheckpointStore('metadata', {}, [p['id'] for p in active_players], resume=resume, checkpoint_dir=checkpoint_dir)
+
+    responses = pull_per_player(
+        active_players,
+        endpoint,
+        lambda player: {'player_id': player['id']},
+        METADATA_TTL,
+        'metadata',
+        resolve_cache(cache),
+        requests_per_second,
+        max_workers,
+        checkpoint
+    )
+
+    for player in active_players:
+        player_info = responses.get(player['id'])
+        if player_info is None or player_info.empty:
+            continue
+
+        player_id = player['id']
+
+        # Extract raw data
+        player_dict = {
+            'PLAYER_ID': player_id,
+            'PLAYER_NAME': player['full_name'],
+            'DOB': player_info.loc[0, 'BIRTHDATE'],
+            'HEIGHT': player_info.loc[0, 'HEIGHT'],
+            'WEIGHT': player_info.loc[0, 'WEIGHT'],
+            'POSITION': player_info.loc[0, 'POSITION'],
+            'DRAFT_YEAR': player_info.loc[0, 'DRAFT_YEAR'],
+            'DRAFT_ROUND': player_info.loc[0, 'DRAFT_ROUND'],
+            'DRAFT_NUMBER': player_info.loc[0, 'DRAFT_NUMBER'],
+            'SCHOOL': player_info.loc[0, 'SCHOOL'],
+            'COUNTRY': player_info.loc[0, 'COUNTRY'],
+            'HEADSHOT_URL': f'https://cdn.nba.com/headshots/nba/latest/260x190/{player_id}.png'
+        }
+
+        metadata.append(player_dict)
+
+    log_event('pull_metadata', f'Metadata retrieved for {len(metadata)} players', players=len(metadata), requested=len(active_players))
     return pd.DataFrame(metadata)
@@ -0,0 +1,147 @@
+### THIS SCRIPT BUILDS LEAGUE-WIDE RANKINGS (SORTED ARRAYS PER STAT, PER SEASON AND CAREER) FOR PERCENTILES AND LEADERBOARDS
+## Import libraries
+import numpy as np
+import pandas as pd
+
+# each ranked stat as (numerator column, denominator column, minimum denominator per game played)
+RANKED_STATS = {
+    'PPG': ('SUM_PTS', 'GP', 0),
+    'RPG': ('SUM_REB', 'GP', 0),
+    'APG': ('SUM_AST', 'GP', 0),
+    'SPG': ('SUM_STL', 'GP', 0),
+    'BPG': ('SUM_BLK', 'GP', 0),
+    'MPG': ('SUM_MIN', 'GP', 0),
+    'FG_PCT': ('SUM_FGM', 'SUM_FGA', 3.0),
+    'FG3_PCT': ('SUM_FG3M', 'SUM_FG3A', 1.0),
+    'FT_PCT': ('SUM_FTM', 'SUM_FTA', 1.0),
+    'TS_PCT': ('SUM_PTS', 'TS_ATTEMPTS', 3.0),
+    'EFG_PCT': ('EFG_MADE', 'SUM_FGA', 3.0),
+    'GMSC': ('SUM_GAME_SCORE', 'GP', 0)
+}
+
+# games needed to qualify for a ranking
+SEASON_MIN_GAMES = 40
+CAREER_MIN_GAMES = 200
+
+CAREER = 'CAREER'
+
+SUM_COLS = [
+    'GP', 'SUM_MIN', 'SUM_PTS', 'SUM_FGM', 'SUM_FGA', 'SUM_FG3M', 'SUM_FG3A', 'SUM_FTM', 'SUM_FTA', 'SUM_REB', 'SUM_AST', 'SUM_STL', 'SUM_BLK',
+    'SUM_GAME_SCORE', 'SUM_TSA'
+]
+
+## Define one ranking: the qualified values of one stat in one scope, sorted ascending
+class RankingTable:
+
+    def __init__(self, player_ids, values):
+        order = np.argsort(values, kind='stable')
+        self.values = values[order]
+        self.player_ids = player_ids[order]
+        self.value_by_player = dict(zip(player_ids.tolist(), values.tolist()))
+
+    def __len__(self):
+        return len(self.values)
+
+    # share of qualified players at or below a value, ties count half (binary search, O(log n))
+    def percentile_of_value(self, value):
+        if len(self.values) == 0:
+            return None
+        below = np.searchsorted(self.values, value, side='left')
+        at_or_below = np.searchsorted(self.values, value, side='right')
+        return 100 * (below + at_or_below) / (2 * len(self.values))
+
+    # None when the player doesn't qualify in this scope
+    def percentile(self, player_id):
+        value = self.value_by_player.get(player_id)
+        return None if value is None else self.percentile_of_value(value)
+
+    # the N highest values, best first
+    def top_n(self, n):
+        n = min(n, len(self.values))
+        return pd.DataFrame({
+            'PLAYER_ID': self.player_ids[::-1][:n],
+            'VALUE': self.values[::-1][:n]
+        })
+
+    # players whose percentile falls in [low, high), highest first
+    def between_percentiles(self, low, high):
+        count = len(self.values)
+        start = int(np.ceil(count * low / 100))
+        stop = int(np.ceil(count * high / 100))
+        return pd.DataFrame({
+            'PLAYER_ID': self.player_ids[start:stop][::-1],
+            'VALUE': self.values[start:stop][::-1]
+        })
+
+## Define a function to add the sums the shooting efficiency stats divide by (true shooting attempts are stored per game)
+def with_derived_sums(sums):
+    sums = sums.copy()
+    sums['TS_ATTEMPTS'] = 2 * sums['SUM_TSA']
+    sums['EFG_MADE'] = sums['SUM_FGM'] + 0.5 * sums['SUM_FG3M']
+    return sums
+
+## Define a function to compute one stat for every row of a summary frame, NaN where it can't be computed
+def stat_values(sums, stat):
+    numerator, denominator, _ = RANKED_STATS[stat]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(sums[denominator] > 0, sums[numerator] / sums[denominator], np.nan)
+
+## Define a function to list which rows qualify for a stat
+def qualified(sums, stat, min_games):
+    _, denominator, min_per_game = RANKED_STATS[stat]
+    return (sums['GP'] >= min_games) & (sums[denominator] >= min_per_game * sums['GP']) & (sums[denominator] > 0)
+
+## Define the rankings for every stat, for the career and for each season
+class Rankings:
+
+    def __init__(self, summary, data_version=None):
+        self.data_version = data_version
+        self.tables = {}
+
+        summary = summary.copy()
+        for col in SUM_COLS:
+            summary[col] = pd.to_numeric(summary[col]).astype('float64')
+        summary = with_derived_sums(summary)
+
+        # the derived sums are linear, so summing them per player gives the career values
+        career = summary.groupby('PLAYER_ID', as_index=False)[SUM_COLS + ['TS_ATTEMPTS', 'EFG_MADE']].sum()
+        scopes = [(CAREER, career, CAREER_MIN_GAMES)]
+        scopes += [(season_id, group, SEASON_MIN_GAMES) for season_id, group in summary.groupby('SEASON_ID')]
+
+        for scope, sums, min_games in scopes:
+            player_ids = sums['PLAYER_ID'].to_numpy(dtype='int64')
+
+            for stat in RANKED_STATS:
+                keep = qualified(sums, stat, min_games).to_numpy()
+                self.tables[(scope, stat)] = RankingTable(player_ids[keep], stat_values(sums, stat)[keep])
+
+        # career order of every player with a game (qualified or not), used to sort the player list
+        self.sort_orders = {
+            stat: career['PLAYER_ID'].to_numpy(dtype='int64')[np.argsort(-np.nan_to_num(stat_values(career, stat), nan=-np.inf), kind='stable')]
+            for stat in RANKED_STATS
+        }
+
+    def table(self, stat, scope=CAREER):
+        return self.tables.get((scope, stat), RankingTable(np.array([], dtype='int64'), np.array([])))
+
+    def percentile(self, player_id, stat, scope=CAREER):
+        return self.table(stat, scope).percentile(int(player_id))
+
+    def top_n(self, stat, n=10, scope=CAREER):
+        return self.table(stat, scope).top_n(n)
+
+    def between_percentiles(self, stat, low, high, scope=CAREER):
+        return self.table(stat, scope).between_percentiles(low, high)
+
+    # every player id ordered by a career stat, highest first
+    def order(self, stat):
+        return self.sort_orders[stat]
+
+## Define a function to format a percentile as an ordinal badge, e.g. 93rd pct
+def percentile_badge(percentile):
+    if percentile is None:
+        return None
+
+    rank = int(round(percentile))
+    suffix = 'th' if 10 <= rank % 100 <= 20 else {1: 'st', 2: 'nd', 3: 'rd'}.get(rank % 10, 'th')
+    return f'{rank}{suffix} pct'
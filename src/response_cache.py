@@ -0,0 +1,140 @@
+### THIS SCRIPT DEFINES AN ON-DISK CACHE FOR NBA API RESPONSES SO RE-RUNS DON'T HIT THE API AGAIN
+## Import libraries
+import hashlib
+import json
+import os
+import pickle
+import threading
+import time
+import pandas as pd
+from seasons import current_season
+from metrics import log_event
+
+# default location and size budget of the cache
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '.cache', 'nba_api')
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+# time to live (seconds) for data that can still change, None means the entry never expires
+CURRENT_SEASON_TTL = 6 * 60 * 60
+METADATA_TTL = 7 * 24 * 60 * 60
+
+## Define a function to pick the ttl for a season's game logs
+def ttl_for_season(season):
+
+    # 'ALL' includes the season in progress so it has to be refreshed like it
+    if season == 'ALL' or season >= current_season():
+        return CURRENT_SEASON_TTL
+
+    # completed seasons can never change
+    return None
+
+## Define the cache, entries are keyed by a hash of the endpoint name and its parameters
+class ResponseCache:
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES):
+        self.cache_dir = os.path.abspath(cache_dir)
+        self.max_bytes = max_bytes
+        self.index_path = os.path.join(self.cache_dir, 'index.json')
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+        if os.path.exists(self.index_path):
+            with open(self.index_path) as f:
+                self.index = json.load(f)
+        else:
+            self.index = {}
+
+    # build the content address of a request
+    def key(self, endpoint_name, params):
+        payload = json.dumps({'endpoint': endpoint_name, 'params': params}, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def path(self, key):
+        return os.path.join(self.cache_dir, key[:2], f'{key}.pkl')
+
+    # return the cached data frames for a request, or None if missing or expired
+    def get(self, endpoint_name, params):
+        key = self.key(endpoint_name, params)
+
+        with self.lock:
+            entry = self.index.get(key)
+
+            if entry is None or (entry['expires_at'] is not None and entry['expires_at'] < time.time()):
+                self.misses += 1
+                return None
+
+            entry['last_access'] = time.time()
+
+        # a truncated or corrupted entry, or one pickled from a class that no longer exists, is a miss and is deleted
+        try:
+            frames = pd.read_pickle(self.path(key))
+        except (OSError, EOFError, ValueError, pickle.UnpicklingError, AttributeError, ImportError):
+            with self.lock:
+                self.remove(key)
+                self.misses += 1
+            return None
+
+        with self.lock:
+            self.hits += 1
+        return frames
+
+    # store the data frames for a request, ttl=None marks the entry as immutable
+    def put(self, endpoint_name, params, frames, ttl=None):
+        key = self.key(endpoint_name, params)
+        path = self.path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        # write to a temp file first so a crash never leaves a half written entry
+        tmp_path = f'{path}.{threading.get_ident()}.tmp'
+        pd.to_pickle(frames, tmp_path)
+        os.replace(tmp_path, path)
+
+        now = time.time()
+        with self.lock:
+            self.index[key] = {
+                'endpoint': endpoint_name,
+                'params': params,
+                'created_at': now,
+                'last_access': now,
+                'expires_at': None if ttl is None else now + ttl,
+                'size': os.path.getsize(path)
+            }
+            self.evict()
+            self.save_index()
+
+    # drop expired entries, then least recently used ones until we are under the size budget
+    def evict(self):
+        now = time.time()
+        expired = [k for k, e in self.index.items() if e['expires_at'] is not None and e['expires_at'] < now]
+        for key in expired:
+            self.remove(key)
+
+        total = sum(e['size'] for e in self.index.values())
+        for key in sorted(self.index, key=lambda k: self.index[k]['last_access']):
+            if total <= self.max_bytes:
+                break
+            total -= self.index[key]['size']
+            self.remove(key)
+
+    def remove(self, key):
+        self.index.pop(key, None)
+        try:
+            os.remove(self.path(key))
+        except FileNotFoundError:
+            pass
+
+    def save_index(self):
+        tmp_path = f'{self.index_path}.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(self.index, f)
+        os.replace(tmp_path, self.index_path)
+
+    # persist access times collected by get()
+    def flush(self):
+        with self.lock:
+            self.save_index()
+
+        log_event('response_cache_flushed', f'Response cache: {self.hits} hits, {self.misses} misses', hits=self.hits, misses=self.misses)
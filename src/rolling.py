@@ -0,0 +1,318 @@
+### THIS SCRIPT COMPUTES ROLLING AVERAGES, STREAKS AND BEST/WORST K-GAME STRETCHES FOR EVERY PLAYER IN ONE VECTORIZED PASS
+## Import libraries
+import glob
+import json
+import os
+import numpy as np
+import pandas as pd
+from dashboard_queries import ROLLING_GAMES_QUERY, ROLLING_FINGERPRINT_QUERY
+from rankings import CAREER
+
+# stats the rolling averages, streaks and stretches cover (the columns ROLLING_GAMES_QUERY reads)
+ROLLING_STATS = ['PTS', 'REB', 'AST', 'FG3M', 'GAME_SCORE']
+
+STAT_LABELS = {'PTS': 'Points', 'REB': 'Rebounds', 'AST': 'Assists', 'FG3M': '3-Pointers', 'GAME_SCORE': 'Game Score'}
+
+# rolling average windows in games, a window has a value once the player has played that many games
+ROLLING_WINDOWS = (5, 10, 20)
+
+# streaks count consecutive games at or above each threshold
+STREAK_THRESHOLDS = {
+    'PTS': (10, 20, 30, 40),
+    'REB': (10, 15),
+    'AST': (10,),
+    'FG3M': (3, 5),
+    'GAME_SCORE': (20, 30)
+}
+
+# best and worst stretches, in games
+STRETCH_WINDOWS = (5, 10, 20)
+
+# the analytics are saved here once per game log version, so a dashboard restart reads them back instead of recomputing
+# (override with ROLLING_DIR in the .env file)
+DEFAULT_ROLLING_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '.rolling')
+
+# saved versions to keep, the newest first
+ROLLING_KEEP = 2
+
+# the settings a file was computed with, a file saved with other settings is recomputed
+ROLLING_CONFIG = json.dumps([ROLLING_STATS, ROLLING_WINDOWS, STREAK_THRESHOLDS, STRETCH_WINDOWS])
+
+## Define a function to flag the first row of each segment (a run of rows with the same keys, rows are sorted by the keys)
+def segment_starts(*keys):
+    changed = np.zeros(max(len(keys[0]) - 1, 0), dtype=bool)
+    for key in keys:
+        changed |= key[1:] != key[:-1]
+    return np.concatenate([[True], changed])[:len(keys[0])]
+
+## Define a function to average the last `window` games up to each row with cumulative sums, NaN until its segment has that many games
+def rolling_means(values, row_first, window):
+    csum = np.concatenate([[0.0], np.cumsum(values)])
+    idx = np.arange(len(values))
+    means = (csum[idx + 1] - csum[np.maximum(idx + 1 - window, 0)]) / window
+    return np.where(idx - row_first >= window - 1, means, np.nan)
+
+## Define a function to count the consecutive games up to each row that hit a condition, restarting at each segment
+def run_lengths(hit, row_first):
+    idx = np.arange(len(hit))
+
+    # the last miss (or the row before the segment) bounds the run ending at each row
+    breaks = np.maximum(np.where(hit, -1, idx), row_first - 1)
+    return np.where(hit, idx - np.maximum.accumulate(breaks), 0)
+
+## Define a function to find the row holding each segment's largest value (the earliest on ties, NaN only when the segment has nothing else)
+def segment_argmax(values, seg_ids, n_segments):
+    order = np.lexsort((-values, seg_ids))
+    return order[np.searchsorted(seg_ids[order], np.arange(n_segments))]
+
+## Define a function to compute every array the analytics serve, from the game logs of every player
+def build_arrays(games):
+    player_ids = games['PLAYER_ID'].to_numpy(dtype='int64')
+    dates = pd.to_datetime(games['GAME_DATE']).to_numpy(dtype='datetime64[D]')
+    order = np.lexsort((dates, player_ids))
+
+    player_ids, dates = player_ids[order], dates[order]
+    season_ids = np.asarray(games['SEASON_ID'].astype(str).to_numpy(), dtype='U')[order]
+    values = {stat: pd.to_numeric(games[stat]).fillna(0).to_numpy(dtype='float64')[order] for stat in ROLLING_STATS}
+
+    arrays = {'config': np.array(ROLLING_CONFIG), 'player_ids': player_ids, 'dates': dates, 'season_ids': season_ids}
+    for stat in ROLLING_STATS:
+        arrays[f'value_{stat}'] = values[stat].astype('float32')
+
+    # career segments are a player's games, season segments a player's games in one season
+    for kind, starts in (('career', segment_starts(player_ids)), ('season', segment_starts(player_ids, season_ids))):
+        firsts = np.flatnonzero(starts)
+        seg_ids = np.cumsum(starts) - 1
+        row_first = firsts[seg_ids]
+        lasts = np.append(firsts[1:], len(player_ids)) - 1
+        arrays[f'{kind}_first'] = firsts
+
+        # rolling averages run across seasons, like a player's last N games
+        if kind == 'career':
+            for stat in ROLLING_STATS:
+                for window in ROLLING_WINDOWS:
+                    arrays[f'rolling_{stat}_{window}'] = rolling_means(values[stat], row_first, window).astype('float32')
+
+        # longest streak per segment (where it ends) and, for careers, the streak still running at the last game
+        for stat, thresholds in STREAK_THRESHOLDS.items():
+            for threshold in thresholds:
+                runs = run_lengths(values[stat] >= threshold, row_first)
+                end = segment_argmax(runs.astype('float64'), seg_ids, len(firsts))
+                arrays[f'{kind}_streak_{stat}_{threshold}'] = runs[end].astype('int32')
+                arrays[f'{kind}_streak_end_{stat}_{threshold}'] = end
+                if kind == 'career':
+                    arrays[f'career_active_{stat}_{threshold}'] = runs[lasts].astype('int32')
+
+        # best and worst k-game averages per segment (where they end), NaN when the segment is shorter than k
+        for stat in ROLLING_STATS:
+            for window in STRETCH_WINDOWS:
+                means = rolling_means(values[stat], row_first, window)
+                best_end = segment_argmax(means, seg_ids, len(firsts))
+                worst_end = segment_argmax(-means, seg_ids, len(firsts))
+                arrays[f'{kind}_best_{stat}_{window}'] = means[best_end].astype('float32')
+                arrays[f'{kind}_best_end_{stat}_{window}'] = best_end
+                arrays[f'{kind}_worst_{stat}_{window}'] = means[worst_end].astype('float32')
+                arrays[f'{kind}_worst_end_{stat}_{window}'] = worst_end
+
+    # leaderboard orders, highest first with NaN last, so a leaderboard is a filter and a slice
+    for name in [name for name in arrays if name.startswith(('career_streak_', 'career_active_', 'career_best_', 'season_streak_', 'season_best_'))]:
+        if '_end_' not in name:
+            arrays[f'{name}_order'] = np.argsort(-arrays[name].astype('float64'), kind='stable')
+
+    return arrays
+
+## Define the rolling analytics of every player for one data version, served by slicing the precomputed arrays
+class RollingAnalytics:
+
+    def __init__(self, arrays, data_version=None):
+        self.arrays = arrays
+        self.data_version = data_version
+
+        # players and seasons of each segment, and the segment of each player (and player season)
+        player_ids, season_ids = arrays['player_ids'], arrays['season_ids']
+        self.segment_players = {kind: player_ids[arrays[f'{kind}_first']] for kind in ('career', 'season')}
+        self.segment_seasons = {kind: season_ids[arrays[f'{kind}_first']] for kind in ('career', 'season')}
+        self.player_segment = {p: i for i, p in enumerate(self.segment_players['career'].tolist())}
+        self.season_segment = {
+            (p, s): i for i, (p, s) in enumerate(zip(self.segment_players['season'].tolist(), self.segment_seasons['season'].tolist()))
+        }
+        self.career_stop = np.append(arrays['career_first'][1:], len(player_ids))
+
+    @classmethod
+    def from_games(cls, games, data_version=None):
+        return cls(build_arrays(games), data_version)
+
+    # every season with games, newest first
+    @property
+    def seasons(self):
+        return sorted(set(self.segment_seasons['season'].tolist()), reverse=True)
+
+    # first and last date of the `games` games ending at row `end`
+    def span(self, end, games):
+        dates = self.arrays['dates']
+        return pd.Timestamp(dates[end - games + 1]), pd.Timestamp(dates[end])
+
+    # segment index for a player in a scope, None when they have no games there
+    def segment(self, player_id, scope):
+        if scope == CAREER:
+            return 'career', self.player_segment.get(int(player_id))
+        return 'season', self.season_segment.get((int(player_id), scope))
+
+    # a player's games in date order with the stat and its rolling averages
+    def player_rolling(self, player_id, stat):
+        seg = self.player_segment.get(int(player_id))
+        if seg is None:
+            return pd.DataFrame(columns=['GAME_DATE', 'SEASON_ID', stat] + [f'AVG_{w}' for w in ROLLING_WINDOWS])
+
+        rows = slice(self.arrays['career_first'][seg], self.career_stop[seg])
+        return pd.DataFrame({
+            'GAME_DATE': self.arrays['dates'][rows],
+            'SEASON_ID': self.arrays['season_ids'][rows],
+            stat: self.arrays[f'value_{stat}'][rows],
+            **{f'AVG_{w}': self.arrays[f'rolling_{stat}_{w}'][rows] for w in ROLLING_WINDOWS}
+        })
+
+    # a player's active and longest streak for every stat and threshold
+    def player_streaks(self, player_id):
+        seg = self.player_segment.get(int(player_id))
+        if seg is None:
+            return pd.DataFrame(columns=['STAT', 'THRESHOLD', 'ACTIVE', 'LONGEST', 'FROM', 'TO'])
+
+        rows = []
+        for stat, thresholds in STREAK_THRESHOLDS.items():
+            for threshold in thresholds:
+                longest = int(self.arrays[f'career_streak_{stat}_{threshold}'][seg])
+                start, end = self.span(int(self.arrays[f'career_streak_end_{stat}_{threshold}'][seg]), longest) if longest else (None, None)
+                rows.append({
+                    'STAT': STAT_LABELS[stat],
+                    'THRESHOLD': threshold,
+                    'ACTIVE': int(self.arrays[f'career_active_{stat}_{threshold}'][seg]),
+                    'LONGEST': longest,
+                    'FROM': start,
+                    'TO': end
+                })
+        return pd.DataFrame(rows)
+
+    # a player's best and worst `window`-game stretch for every stat, over the career or one season
+    def player_stretches(self, player_id, window, scope=CAREER):
+        kind, seg = self.segment(player_id, scope)
+        if seg is None:
+            return pd.DataFrame(columns=['STAT', 'BEST_AVG', 'BEST_FROM', 'BEST_TO', 'WORST_AVG', 'WORST_FROM', 'WORST_TO'])
+
+        rows = []
+        for stat in ROLLING_STATS:
+            best = self.arrays[f'{kind}_best_{stat}_{window}'][seg]
+            if np.isnan(best):
+                continue
+            worst = self.arrays[f'{kind}_worst_{stat}_{window}'][seg]
+            best_from, best_to = self.span(int(self.arrays[f'{kind}_best_end_{stat}_{window}'][seg]), window)
+            worst_from, worst_to = self.span(int(self.arrays[f'{kind}_worst_end_{stat}_{window}'][seg]), window)
+            rows.append({
+                'STAT': STAT_LABELS[stat],
+                'BEST_AVG': round(float(best), 1), 'BEST_FROM': best_from, 'BEST_TO': best_to,
+                'WORST_AVG': round(float(worst), 1), 'WORST_FROM': worst_from, 'WORST_TO': worst_to
+            })
+        return pd.DataFrame(rows)
+
+    # the top n segments of a scope in a precomputed order, skipping zero and NaN values
+    def leaders(self, kind, name, scope, n):
+        values = self.arrays[f'{kind}_{name}']
+        order = self.arrays[f'{kind}_{name}_order']
+        order = order[values[order] > 0]
+        if kind == 'season':
+            order = order[self.segment_seasons['season'][order] == scope]
+        return order[:n]
+
+    # longest streaks at or above a threshold; active=True ranks the streaks still running at each player's last game (career only)
+    def streak_leaders(self, stat, threshold, n=10, scope=CAREER, active=False):
+        kind = 'career' if scope == CAREER or active else 'season'
+        name = f'active_{stat}_{threshold}' if active else f'streak_{stat}_{threshold}'
+        top = self.leaders(kind, name, scope, n)
+        games = self.arrays[f'{kind}_{name}'][top]
+
+        # an active streak ends at the player's last game
+        ends = self.career_stop[top] - 1 if active else self.arrays[f'{kind}_streak_end_{stat}_{threshold}'][top]
+        spans = [self.span(int(end), int(g)) for end, g in zip(ends, games)]
+        return pd.DataFrame({
+            'PLAYER_ID': self.segment_players[kind][top],
+            'STREAK': games,
+            'FROM': [s[0] for s in spans],
+            'TO': [s[1] for s in spans]
+        })
+
+    # best `window`-game averages, over careers or in one season
+    def stretch_leaders(self, stat, window, n=10, scope=CAREER):
+        kind = 'career' if scope == CAREER else 'season'
+        top = self.leaders(kind, f'best_{stat}_{window}', scope, n)
+        spans = [self.span(int(end), window) for end in self.arrays[f'{kind}_best_end_{stat}_{window}'][top]]
+        return pd.DataFrame({
+            'PLAYER_ID': self.segment_players[kind][top],
+            'AVG': np.round(self.arrays[f'{kind}_best_{stat}_{window}'][top].astype('float64'), 1),
+            'FROM': [s[0] for s in spans],
+            'TO': [s[1] for s in spans]
+        })
+
+## Define a function to fingerprint the stored game logs as their count and newest game date
+## (versions start over when sql/nba__schemas.sql recreates the database, the fingerprint tells the new data from the old)
+def rolling_fingerprint(run_query):
+    row = run_query(ROLLING_FINGERPRINT_QUERY).iloc[0]
+    last_game = 'none' if pd.isna(row['LAST_GAME_DATE']) else pd.Timestamp(row['LAST_GAME_DATE']).strftime('%Y%m%d')
+    return f"{int(row['GAMES'])}-{last_game}"
+
+## Define a function to get where a game log version's analytics are saved
+def rolling_path(data_version, fingerprint):
+    return os.path.join(os.getenv('ROLLING_DIR', DEFAULT_ROLLING_DIR), f'rolling-{data_version}-{fingerprint}.npz')
+
+## Define a function to list the saved analytics files
+def saved_rolling_paths():
+    return glob.glob(os.path.join(os.getenv('ROLLING_DIR', DEFAULT_ROLLING_DIR), 'rolling-*.npz'))
+
+## Define a function to delete every saved analytics file, e.g. once the database they were computed from is gone
+def clear_rolling():
+    for path in saved_rolling_paths():
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+## Define a function to tell whether the database was recreated since analytics were saved:
+## the game log version only goes up, so a file saved at a higher version than the current one came from a dropped database
+def schema_was_reset(data_version):
+    saved_versions = [os.path.basename(path).split('-')[1] for path in saved_rolling_paths()]
+    return any(version.isdigit() and int(version) > int(data_version) for version in saved_versions)
+
+## Define a function to save the analytics to a path, through a temp file so a reader never sees half a file
+def save_rolling(analytics, path):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    with open(tmp_path, 'wb') as f:
+        np.savez(f, **analytics.arrays)
+    os.replace(tmp_path, path)
+
+    # drop older versions, keeping the newest few
+    saved = sorted(glob.glob(os.path.join(os.path.dirname(path), 'rolling-*.npz')), key=os.path.getmtime, reverse=True)
+    for old_path in saved[ROLLING_KEEP:]:
+        os.remove(old_path)
+
+## Define a function to load a game log version's analytics, computing and saving them the first time that version is asked for
+## (the file is keyed on the version and the game log fingerprint, so a recreated database never reads analytics of the old one)
+def load_rolling(data_version, run_query):
+    if schema_was_reset(data_version):
+        clear_rolling()
+
+    path = rolling_path(data_version, rolling_fingerprint(run_query))
+
+    if os.path.exists(path):
+        with np.load(path, allow_pickle=False) as saved:
+            arrays = {name: saved[name] for name in saved.files}
+        if str(arrays['config']) == ROLLING_CONFIG:
+            return RollingAnalytics(arrays, data_version)
+
+    analytics = RollingAnalytics.from_games(run_query(ROLLING_GAMES_QUERY), data_version)
+    try:
+        save_rolling(analytics, path)
+    except OSError:
+        # a read-only checkout still serves the analytics, they're just recomputed after a restart
+        pass
+    return analytics
@@ -0,0 +1,170 @@
+### THIS SCRIPT FINGERPRINTS ROWS SO UPSERTS ONLY SEND ROWS THAT ARE NEW OR HAVE ACTUALLY CHANGED
+## Import libraries
+import threading
+import numpy as np
+import pandas as pd
+from db_connection import pooled_connection
+from clean_data import DERIVED_DECIMALS
+
+# decimal places a column is stored with, so values that only differ past what the table keeps hash the same
+# (other float columns are rounded to FLOAT_DECIMALS to absorb float32/float64 noise)
+STORED_DECIMALS = {'MIN': 2, 'FG_PCT': 3, 'FG3_PCT': 3, 'FT_PCT': 3, **DERIVED_DECIMALS}
+FLOAT_DECIMALS = 6
+
+# every hashed table is keyed on the player (plus the game for game logs), hashes are loaded one player at a time
+TABLE_KEYS = {
+    'PLAYER_GAME_LOGS': ['PLAYER_ID', 'GAME_ID'],
+    'PLAYER_METADATA': ['PLAYER_ID']
+}
+
+# player ids per lookup query
+LOAD_CHUNK_SIZE = 1000
+
+## Define a function to put the columns in one canonical form, so the same content always hashes the same
+## (whatever the dtypes, e.g. int16 vs int64 or a categorical vs plain strings)
+def canonical_frame(df, columns):
+    canonical = {}
+
+    for col in columns:
+        series = df[col] if col in df.columns else pd.Series(None, index=df.index, dtype=object)
+
+        if pd.api.types.is_datetime64_any_dtype(series):
+            series = series.dt.strftime('%Y-%m-%d').fillna('')
+        elif (pd.api.types.is_bool_dtype(series) or pd.api.types.is_integer_dtype(series)) and not series.isna().any():
+            series = series.astype('int64')
+        elif pd.api.types.is_float_dtype(series):
+            series = series.astype('float64').round(STORED_DECIMALS.get(col, FLOAT_DECIMALS))
+        else:
+            series = series.astype(object).where(series.notna(), '').astype(str)
+
+        canonical[col] = series
+
+    return pd.DataFrame(canonical, index=df.index)
+
+## Define a function to fingerprint each row's content as a uint64
+def row_hashes(df, columns):
+    return pd.util.hash_pandas_object(canonical_frame(df, columns), index=False).to_numpy(dtype='uint64')
+
+## Define a function to fingerprint each row's key, so lookups compare one uint64 instead of a tuple
+def key_hashes(df, key_columns):
+    keys = pd.DataFrame({col: df[col].astype(str).to_numpy() for col in key_columns})
+    return pd.util.hash_pandas_object(keys, index=False).to_numpy(dtype='uint64')
+
+## Define the outcome of comparing a frame with the stored hashes
+class RowChanges:
+
+    def __init__(self, keys, hashes, is_new, is_changed):
+        self.keys = keys
+        self.hashes = hashes
+        self.is_new = is_new
+        self.is_changed = is_changed
+
+    # rows to send: new keys and keys whose content changed
+    @property
+    def send(self):
+        return self.is_new | self.is_changed
+
+    def counts(self):
+        inserted = int(self.is_new.sum())
+        updated = int(self.is_changed.sum())
+        return {'inserted': inserted, 'updated': updated, 'skipped': len(self.keys) - inserted - updated}
+
+## Define an in-memory index of the stored row hashes of one table, as sorted uint64 arrays
+## each player's hashes are read once per run, the first time one of their rows is written
+class RowHashIndex:
+
+    def __init__(self, table, columns):
+        self.table = table
+        self.key_columns = TABLE_KEYS[table]
+        self.columns = columns
+        self.lock = threading.Lock()
+
+        self.keys = np.array([], dtype='uint64')
+        self.hashes = np.array([], dtype='uint64')
+        self.loaded_players = set()
+
+    # add or replace entries, keeping the keys sorted for binary search
+    def merge(self, keys, hashes):
+        positions, found = self.lookup(keys)
+        self.hashes[positions[found]] = hashes[found]
+
+        if (~found).any():
+            keys = np.concatenate([self.keys, keys[~found]])
+            hashes = np.concatenate([self.hashes, hashes[~found]])
+            order = np.argsort(keys, kind='stable')
+            self.keys, self.hashes = keys[order], hashes[order]
+
+    def lookup(self, keys):
+        if len(self.keys) == 0:
+            return np.zeros(len(keys), dtype='int64'), np.zeros(len(keys), dtype=bool)
+
+        positions = np.minimum(np.searchsorted(self.keys, keys), len(self.keys) - 1)
+        return positions, self.keys[positions] == keys
+
+    # read the stored hashes of players not seen yet in this run
+    def load_players(self, player_ids):
+        new_ids = sorted(set(int(p) for p in player_ids) - self.loaded_players)
+        if not new_ids:
+            return
+
+        rows = []
+        with pooled_connection() as conn:
+            cursor = conn.cursor()
+            for start in range(0, len(new_ids), LOAD_CHUNK_SIZE):
+                chunk = new_ids[start:start + LOAD_CHUNK_SIZE]
+                cursor.execute(
+                    f"SELECT {', '.join(self.key_columns)}, ROW_HASH FROM {self.table} WHERE PLAYER_ID IN ({', '.join(['%s'] * len(chunk))})",
+                    chunk
+                )
+                rows += cursor.fetchall()
+            cursor.close()
+
+        if rows:
+            # hashes go straight to uint64 (through a frame, NULLs would turn them into lossy floats);
+            # rows stored before hashing was added have no hash (0 never matches), so they are rewritten once and get one
+            stored = pd.DataFrame([row[:-1] for row in rows], columns=self.key_columns)
+            self.merge(key_hashes(stored, self.key_columns), np.array([row[-1] or 0 for row in rows], dtype='uint64'))
+
+        self.loaded_players.update(new_ids)
+
+    # compare a frame with the stored hashes
+    def changes(self, df):
+        keys = key_hashes(df, self.key_columns)
+        hashes = row_hashes(df, self.columns)
+
+        with self.lock:
+            self.load_players(df['PLAYER_ID'].unique())
+            positions, found = self.lookup(keys)
+            stored = np.where(found, self.hashes[positions] if len(self.hashes) else 0, 0)
+
+        return RowChanges(keys, hashes, ~found, found & (stored != hashes))
+
+    # remember what was written, once it has committed
+    def record(self, row_changes):
+        send = row_changes.send
+        with self.lock:
+            self.merge(row_changes.keys[send], row_changes.hashes[send])
+
+    # forget everything, e.g. after rows were deleted outside the insert path
+    def reset(self):
+        with self.lock:
+            self.keys = np.array([], dtype='uint64')
+            self.hashes = np.array([], dtype='uint64')
+            self.loaded_players = set()
+
+# one index per table per process (a pipeline run), the pipeline is the only writer to these tables
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+## Define a function to get a table's shared hash index, creating it on first use
+def get_row_hash_index(table, columns):
+    with _indexes_lock:
+        if table not in _indexes:
+            _indexes[table] = RowHashIndex(table, columns)
+        return _indexes[table]
+
+## Define a function to drop every loaded hash, so the next write reads them again
+def reset_row_hash_indexes():
+    with _indexes_lock:
+        for index in _indexes.values():
+            index.reset()
@@ -0,0 +1,57 @@
+### THIS SCRIPT READS TABLE, INDEX AND VIEW DEFINITIONS OUT OF sql/nba__schemas.sql SO OTHER SCRIPTS DON'T KEEP THEIR OWN COPIES
+## Import libraries
+import functools
+import os
+import re
+
+SCHEMA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'sql', 'nba__schemas.sql')
+
+CREATE_TABLE_PATTERN = re.compile(r'^CREATE TABLE IF NOT EXISTS (\w+) \((.*)\)$', re.S)
+CREATE_VIEW_PATTERN = re.compile(r'^CREATE OR REPLACE VIEW (\w+) AS\s*(.*)$', re.S)
+
+# lines of a CREATE TABLE body that define keys rather than columns
+KEY_PREFIXES = ('PRIMARY KEY', 'UNIQUE KEY', 'KEY', 'FOREIGN KEY')
+
+## Define a function to split the schema file into statements, without its comment lines
+@functools.lru_cache(maxsize=None)
+def schema_statements(path=SCHEMA_PATH):
+    with open(path) as f:
+        text = '\n'.join(line for line in f.read().splitlines() if not line.strip().startswith('--'))
+    return tuple(s.strip() for s in text.split(';') if s.strip())
+
+## Define a function to get every CREATE TABLE statement, by table, in the order the file creates them
+def table_statements(path=SCHEMA_PATH):
+    tables = {}
+    for statement in schema_statements(path):
+        match = CREATE_TABLE_PATTERN.match(statement)
+        if match:
+            tables[match.group(1)] = statement
+    return tables
+
+## Define a function to split a table's body into its column and key definitions (one per line in the schema file)
+def table_body(table, path=SCHEMA_PATH):
+    body = CREATE_TABLE_PATTERN.match(table_statements(path)[table]).group(2)
+    return [line.strip().rstrip(',') for line in body.splitlines() if line.strip()]
+
+## Define a function to get a table's columns in order, as {name: definition}
+def table_columns(table, path=SCHEMA_PATH):
+    lines = [line for line in table_body(table, path) if not line.startswith(KEY_PREFIXES)]
+    return {line.split()[0]: line for line in lines}
+
+## Define a function to get a table's secondary indexes, as {name: column list}
+def table_indexes(table, path=SCHEMA_PATH):
+    indexes = {}
+    for line in table_body(table, path):
+        match = re.match(r'^KEY (\w+) (\(.*\))$', line)
+        if match:
+            indexes[match.group(1)] = match.group(2)
+    return indexes
+
+## Define a function to get every view's query, by view, in the order the file creates them
+def view_definitions(path=SCHEMA_PATH):
+    views = {}
+    for statement in schema_statements(path):
+        match = CREATE_VIEW_PATTERN.match(statement)
+        if match:
+            views[match.group(1)] = match.group(2)
+    return views
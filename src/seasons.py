@@ -0,0 +1,19 @@
+### THIS SCRIPT HOLDS SMALL HELPERS FOR WORKING WITH NBA SEASON STRINGS (e.g. 2025-26)
+## Import libraries
+from datetime import date
+
+## Define a function to work out the season string for a given day
+def current_season(today=None):
+    today = today or date.today()
+
+    # the regular season tips off in october, anything before that belongs to the previous season
+    start_year = today.year if today.month >= 10 else today.year - 1
+    return f'{start_year}-{str(start_year + 1)[-2:]}'
+
+## Define a function to list every season from first_season to last_season (inclusive)
+def seasons_between(first_season, last_season=None):
+    last_season = last_season or current_season()
+
+    first_year = int(first_season[:4])
+    last_year = int(last_season[:4])
+    return [f'{year}-{str(year + 1)[-2:]}' for year in range(first_year, last_year + 1)]
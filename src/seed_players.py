@@ -0,0 +1,103 @@
+### THIS SCRIPT LOADS SEED PLAYERS INTO THE DATABASE THROUGH THE NORMAL INSERT PATH AND REMOVES THEM AGAIN
+## Used by the query plan tests (tests/test_query_plans.py) and bench_pipeline.py
+## Usage (from src): python seed_players.py   or   python seed_players.py --remove
+## Import libraries
+import argparse
+import numpy as np
+import pandas as pd
+from db_connection import pooled_connection
+from clean_data import clean_gamelogs
+from db_insert import insert_missing_players, insert_gamelogs
+from data_version import bump_data_version, GAMELOGS, METADATA, PIPELINE_RUNS
+from row_hashes import reset_row_hash_indexes
+
+# seeded players live in their own id range so they can be removed afterwards
+SEED_PLAYER_BASE = 9_900_000
+
+TEAMS = ['ATL', 'BOS', 'BKN', 'CHI', 'DAL', 'DEN', 'GSW', 'LAL', 'MIA', 'MIL', 'NYK', 'PHX']
+
+## Define a function to build raw game logs for the seeded players in the pull_gamelogs layout
+def make_seed_gamelogs(n_players, seasons, games_per_season, seed=0):
+    rng = np.random.default_rng(seed)
+    frames = []
+
+    for i in range(n_players):
+        player_id = SEED_PLAYER_BASE + i
+        team = TEAMS[i % len(TEAMS)]
+
+        for season in seasons:
+            start_year = int(season[:4])
+            dates = pd.date_range(f'{start_year}-10-22', periods=games_per_season, freq='2D')
+            opponents = rng.choice([t for t in TEAMS if t != team], games_per_season)
+            home = rng.random(games_per_season) < 0.5
+            fga = rng.integers(5, 25, games_per_season)
+            fgm = rng.binomial(fga, 0.47)
+            fg3a = rng.integers(0, 10, games_per_season)
+            fg3m = np.minimum(rng.binomial(fg3a, 0.36), fgm)
+            fta = rng.integers(0, 10, games_per_season)
+            ftm = rng.binomial(fta, 0.8)
+
+            frames.append(pd.DataFrame({
+                'SEASON_ID': f'2{start_year}',
+                'Game_ID': [f'002{str(start_year)[-2:]}{n:05d}' for n in range(1, games_per_season + 1)],
+                'GAME_DATE': dates.strftime('%b %d, %Y').str.upper(),
+                'MATCHUP': [f'{team} @ {opp}' if away else f'{team} vs. {opp}' for opp, away in zip(opponents, ~home)],
+                'WL': rng.choice(['W', 'L'], games_per_season),
+                'MIN': rng.integers(10, 40, games_per_season),
+                'FGM': fgm, 'FGA': fga, 'FG_PCT': np.round(fgm / fga, 3),
+                'FG3M': fg3m, 'FG3A': fg3a, 'FG3_PCT': np.round(np.divide(fg3m, fg3a, out=np.zeros(games_per_season), where=fg3a > 0), 3),
+                'FTM': ftm, 'FTA': fta, 'FT_PCT': np.round(np.divide(ftm, fta, out=np.zeros(games_per_season), where=fta > 0), 3),
+                'OREB': rng.integers(0, 4, games_per_season), 'DREB': rng.integers(0, 10, games_per_season),
+                'AST': rng.integers(0, 10, games_per_season), 'STL': rng.integers(0, 4, games_per_season),
+                'BLK': rng.integers(0, 4, games_per_season), 'TOV': rng.integers(0, 6, games_per_season),
+                'PF': rng.integers(0, 6, games_per_season), 'PTS': 2 * fgm + fg3m + ftm,
+                'PLUS_MINUS': rng.integers(-20, 20, games_per_season),
+                'PLAYER_ID': player_id,
+                'PLAYER_NAME': f'Seed Player {i}'
+            }))
+
+    raw_df = pd.concat(frames, ignore_index=True)
+    raw_df['REB'] = raw_df['OREB'] + raw_df['DREB']
+    return raw_df
+
+## Define a function to load the seeded players through the normal insert path
+def seed_database(n_players, seasons, games_per_season):
+    raw_df = make_seed_gamelogs(n_players, seasons, games_per_season)
+    insert_missing_players(raw_df)
+    insert_gamelogs(clean_gamelogs(raw_df))
+
+    # refresh index statistics so the optimizer sees realistic cardinalities
+    with pooled_connection() as conn:
+        cursor = conn.cursor()
+        for table in ['PLAYER_METADATA', 'PLAYER_GAME_LOGS', 'PLAYER_SEASON_SUMMARY', 'PLAYER_SEASON_SPLITS', 'PLAYER_MATCHUP_CUBE']:
+            cursor.execute(f'ANALYZE TABLE {table}')
+            cursor.fetchall()
+        cursor.close()
+
+## Define a function to delete everything the seed step added
+def remove_seed():
+    with pooled_connection() as conn:
+        cursor = conn.cursor()
+        for table in ['PLAYER_MATCHUP_CUBE', 'PLAYER_SEASON_SPLITS', 'PLAYER_SEASON_SUMMARY', 'PLAYER_WATERMARKS', 'PLAYER_GAME_LOGS', 'PLAYER_METADATA']:
+            cursor.execute(f'DELETE FROM {table} WHERE PLAYER_ID >= %s', (SEED_PLAYER_BASE,))
+        bump_data_version(cursor, GAMELOGS)
+        bump_data_version(cursor, METADATA)
+        bump_data_version(cursor, PIPELINE_RUNS)
+        conn.commit()
+        cursor.close()
+
+    # the deleted rows' hashes are still loaded, forget them so the seed can be inserted again in this process
+    reset_row_hash_indexes()
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Load seed players into the database, or remove them with --remove.')
+    parser.add_argument('--remove', action='store_true', help='delete the seed players instead of loading them')
+    parser.add_argument('--players', type=int, default=200)
+    parser.add_argument('--seasons', nargs='+', default=['2022-23', '2023-24', '2024-25'])
+    parser.add_argument('--games', type=int, default=60)
+    args = parser.parse_args()
+
+    if args.remove:
+        remove_seed()
+    else:
+        seed_database(args.players, args.seasons, args.games)
@@ -0,0 +1,204 @@
+### THIS SCRIPT PUBLISHES A PARQUET SNAPSHOT OF THE DATABASE AND SERVES DASHBOARD QUERIES FROM IT WITH DUCKDB
+## Usage (from src): python snapshot.py
+## Import libraries
+import json
+import os
+import shutil
+import threading
+import time
+from datetime import datetime
+import pandas as pd
+from db_connection import pooled_connection
+from metrics import log_event, staged
+from schema import view_definitions
+
+# default location of the snapshot, and how many published versions to keep on disk
+DEFAULT_SNAPSHOT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '.snapshot')
+KEEP_VERSIONS = 2
+
+# small row groups let duckdb skip most of a season file when filtering on PLAYER_ID
+ROW_GROUP_SIZE = 16_384
+
+# tables copied whole, and the order their rows are written in
+SNAPSHOT_TABLES = {
+    'PLAYER_METADATA': 'PLAYER_ID',
+    'PLAYER_SEASON_SUMMARY': 'PLAYER_ID, SEASON_ID',
+    'PLAYER_SEASON_SPLITS': 'PLAYER_ID, SPLIT_TYPE, SPLIT_VALUE, SEASON_ID',
+    'PLAYER_MATCHUP_CUBE': 'PLAYER_ID, SEASON_ID, OPPONENT, HOME_AWAY, WL',
+    'DATA_VERSION': 'SCOPE'
+}
+
+# game logs are written one directory per season (hive layout, SEASON_ID=22024/part-0.parquet)
+GAMELOG_TABLE = 'PLAYER_GAME_LOGS'
+
+# mysql returns DECIMAL columns as Decimal objects, which parquet can't store as plain floats
+DECIMAL_COLUMNS = [
+    'MIN', 'FG_PCT', 'FG3_PCT', 'FT_PCT', 'GAME_SCORE', 'TSA', 'TS_PCT', 'EFG_PCT', 'POSS_USED', 'USG_PER_36',
+    'SUM_MIN', 'SUM_GAME_SCORE', 'SUM_TSA', 'SUM_POSS_USED', 'MAX_MIN', 'MAX_GMSCORE', 'MAX_POSS_USED',
+    'MAX_TS_PCT', 'MAX_EFG_PCT', 'MAX_USG_PER_36'
+]
+
+# the mysql views, created in duckdb over the snapshot tables from the same definitions (sql/nba__schemas.sql)
+SNAPSHOT_VIEWS = view_definitions()
+
+## Define a function to convert mysql DECIMAL columns to floats
+def convert_decimals(df):
+    for col in DECIMAL_COLUMNS:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col]).astype('float64')
+    return df
+
+## Define a function to write one table to a parquet file
+def write_table(df, path):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    convert_decimals(df).to_parquet(path, index=False, row_group_size=ROW_GROUP_SIZE)
+
+## Define a function to read which version readers should use
+def current_version(snapshot_dir=DEFAULT_SNAPSHOT_DIR):
+    try:
+        with open(os.path.join(snapshot_dir, 'CURRENT')) as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+## Define a function to name a new snapshot version, returning it and the directory its files go in
+def new_version(snapshot_dir):
+    version = datetime.now().strftime('v%Y%m%dT%H%M%S%f')
+    return version, os.path.join(os.path.abspath(snapshot_dir), version)
+
+## Define a function to finish a written version: write its manifest, point readers at it and drop old versions
+def activate_version(snapshot_dir, version, row_counts):
+    snapshot_dir = os.path.abspath(snapshot_dir)
+    version_dir = os.path.join(snapshot_dir, version)
+
+    with open(os.path.join(version_dir, 'manifest.json'), 'w') as f:
+        json.dump({'version': version, 'published_at': datetime.now().isoformat(), 'row_counts': row_counts}, f, indent=2)
+
+    # swap the pointer atomically so readers only ever see a complete version
+    pointer_tmp = os.path.join(snapshot_dir, 'CURRENT.tmp')
+    with open(pointer_tmp, 'w') as f:
+        f.write(version)
+    os.replace(pointer_tmp, os.path.join(snapshot_dir, 'CURRENT'))
+
+    # keep the previous version around so readers that haven't switched yet can finish their queries
+    versions = sorted(d for d in os.listdir(snapshot_dir) if d.startswith('v') and os.path.isdir(os.path.join(snapshot_dir, d)))
+    for old in versions[:-KEEP_VERSIONS]:
+        shutil.rmtree(os.path.join(snapshot_dir, old), ignore_errors=True)
+
+## Define a function to export the database to a new snapshot version and point readers at it
+@staged('publish_snapshot', rows_of=None)
+def publish_snapshot(snapshot_dir=DEFAULT_SNAPSHOT_DIR):
+    start = time.perf_counter()
+    version, version_dir = new_version(snapshot_dir)
+    row_counts = {}
+
+    with pooled_connection() as conn:
+        for table, order_by in SNAPSHOT_TABLES.items():
+            df = pd.read_sql(f'SELECT * FROM {table} ORDER BY {order_by}', conn)
+
+            # row hashes only matter to the pipeline (and unsigned 64-bit values don't fit parquet's int64)
+            df = df.drop(columns=['ROW_HASH'], errors='ignore')
+            write_table(df, os.path.join(version_dir, f'{table}.parquet'))
+            row_counts[table] = len(df)
+
+        # one season at a time keeps memory bounded, rows are sorted by player so row groups prune well
+        seasons = pd.read_sql(f'SELECT DISTINCT SEASON_ID FROM {GAMELOG_TABLE}', conn)['SEASON_ID']
+        row_counts[GAMELOG_TABLE] = 0
+
+        for season_id in sorted(seasons):
+            df = pd.read_sql(
+                f'SELECT * FROM {GAMELOG_TABLE} WHERE SEASON_ID = %s ORDER BY PLAYER_ID, GAME_DATE',
+                conn,
+                params=(season_id,)
+            )
+            write_table(
+                df.drop(columns=['SEASON_ID', 'CREATED_AT', 'ROW_HASH']),
+                os.path.join(version_dir, GAMELOG_TABLE, f'SEASON_ID={season_id}', 'part-0.parquet')
+            )
+            row_counts[GAMELOG_TABLE] += len(df)
+
+    activate_version(snapshot_dir, version, row_counts)
+    log_event('snapshot_published', f'Published snapshot {version} ({row_counts[GAMELOG_TABLE]:,} game logs) in {time.perf_counter() - start:.1f}s',
+              version=version, row_counts=row_counts)
+    return version
+
+## Define a reader that answers dashboard SQL from the latest published snapshot
+class SnapshotReader:
+
+    def __init__(self, snapshot_dir=DEFAULT_SNAPSHOT_DIR):
+        self.snapshot_dir = os.path.abspath(snapshot_dir)
+        self.lock = threading.Lock()
+        self.version = None
+        self.con = None
+
+    # open an in-memory duckdb database loaded from the snapshot files
+    # (loading once per version costs well under a second, and saves decoding parquet on every query after it)
+    def open_version(self, version):
+        import duckdb
+
+        version_dir = os.path.join(self.snapshot_dir, version)
+        con = duckdb.connect(':memory:')
+
+        for table in SNAPSHOT_TABLES:
+            path = os.path.join(version_dir, f'{table}.parquet')
+            con.execute(f"CREATE TABLE {table} AS SELECT * FROM read_parquet('{path}')")
+
+        # SEASON_ID comes back from the directory names, kept as text like the mysql column
+        # rows are loaded in player order so a player's games sit in a few row groups across every season
+        gamelog_glob = os.path.join(version_dir, GAMELOG_TABLE, '*', '*.parquet')
+        con.execute(
+            f"CREATE TABLE {GAMELOG_TABLE} AS SELECT * FROM read_parquet('{gamelog_glob}', "
+            f"hive_partitioning = true, hive_types = {{'SEASON_ID': VARCHAR}}) ORDER BY PLAYER_ID, GAME_DATE"
+        )
+
+        for view, query in SNAPSHOT_VIEWS.items():
+            con.execute(f'CREATE VIEW {view} AS {query}')
+
+        return con
+
+    # switch to a newer version if the pipeline has published one since the last query
+    def refresh(self):
+        version = current_version(self.snapshot_dir)
+        if version is None:
+            raise FileNotFoundError(f'No snapshot published in {self.snapshot_dir}, run snapshot.py or the pipeline first')
+
+        # the old connection isn't closed here, queries still running on it finish and it is garbage collected
+        with self.lock:
+            if version != self.version:
+                self.con = self.open_version(version)
+                self.version = version
+
+        return self.con
+
+    # each query gets its own cursor, duckdb cursors are safe to use from different threads
+    def query(self, sql):
+        cursor = self.refresh().cursor()
+        try:
+            return cursor.execute(sql).df()
+        finally:
+            cursor.close()
+
+    # several queries on one cursor, the snapshot counterpart of one multi-statement mysql call (player_bundle.py)
+    def query_many(self, sqls):
+        cursor = self.refresh().cursor()
+        try:
+            return [cursor.execute(sql).df() for sql in sqls]
+        finally:
+            cursor.close()
+
+# one reader per process, like the connection pool
+_reader = None
+_reader_lock = threading.Lock()
+
+## Define a function to get the shared reader, creating it on first use
+def get_snapshot_reader():
+    global _reader
+
+    with _reader_lock:
+        if _reader is None:
+            _reader = SnapshotReader(os.getenv('SNAPSHOT_DIR', DEFAULT_SNAPSHOT_DIR))
+
+    return _reader
+
+if __name__ == '__main__':
+    publish_snapshot()
@@ -0,0 +1,164 @@
+### THIS SCRIPT COMPUTES ANY SET OF SPLITS FROM A PLAYER'S GAME LOG FRAME IN ONE VECTORIZED PASS
+## Import libraries
+from datetime import date, timedelta
+import numpy as np
+import pandas as pd
+
+# sums collected for every split group
+SUM_COLS = ['MIN', 'PTS', 'FGM', 'FGA', 'FG3M', 'FG3A', 'FTM', 'FTA', 'REB', 'AST', 'STL', 'BLK', 'TOV', 'PLUS_MINUS', 'GAME_SCORE', 'TSA']
+
+# all-star sunday by season start year, seasons not listed fall back to the third sunday of february
+ALL_STAR_DATES = {
+    2015: date(2016, 2, 14),
+    2016: date(2017, 2, 19),
+    2017: date(2018, 2, 18),
+    2018: date(2019, 2, 17),
+    2019: date(2020, 2, 16),
+    2020: date(2021, 3, 7),
+    2021: date(2022, 2, 20),
+    2022: date(2023, 2, 19),
+    2023: date(2024, 2, 18),
+    2024: date(2025, 2, 16),
+    2025: date(2026, 2, 15)
+}
+
+# games with at least this many minutes count as starter minutes (the logs don't record who started)
+STARTER_MINUTES = 24
+
+## Define a function that rounds half away from zero like MySQL's ROUND on decimals
+def sql_round(values, digits):
+    factor = 10 ** digits
+    values = np.asarray(values, dtype='float64')
+
+    # the small nudge keeps values such as 2.45 (stored as 2.4499999...) rounding up like the database does
+    return np.sign(values) * np.floor(np.abs(values) * factor + 0.5 + 1e-9) / factor
+
+## Define a function to divide sums, returning NaN where the denominator is zero (NULLIF in SQL)
+def ratio(numerator, denominator, digits=3):
+    numerator = np.asarray(numerator, dtype='float64')
+    denominator = np.asarray(denominator, dtype='float64')
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return sql_round(np.where(denominator != 0, numerator / denominator, np.nan), digits)
+
+## Define a function to find the all-star sunday for a season start year
+def all_star_date(start_year):
+    if start_year in ALL_STAR_DATES:
+        return ALL_STAR_DATES[start_year]
+
+    first = date(start_year + 1, 2, 1)
+    first_sunday = first + timedelta(days=(6 - first.weekday()) % 7)
+    return first_sunday + timedelta(weeks=2)
+
+## Define the key builders for each split dimension, each returns (sort key, label) series
+def home_away_key(logs):
+    return logs['HOME_AWAY'], logs['HOME_AWAY'].map({'H': 'Home', 'A': 'Away'})
+
+def win_loss_key(logs):
+    # wins first, like ORDER BY WL DESC
+    return logs['WL'].map({'W': 0, 'L': 1}), logs['WL'].map({'W': 'Wins', 'L': 'Losses'})
+
+def opponent_key(logs):
+    return logs['OPPONENT'], logs['OPPONENT']
+
+def season_key(logs):
+    return logs['SEASON_ID'], logs['SEASON_ID']
+
+def month_key(logs):
+    month = logs['GAME_DATE'].dt.strftime('%Y-%m')
+    return month, month
+
+def rest_days_key(logs):
+    # days off since the player's previous game that season, season openers count as fully rested
+    ordered = logs.sort_values('GAME_DATE', kind='stable')
+    previous = ordered.groupby(['PLAYER_ID', 'SEASON_ID'], observed=True)['GAME_DATE'].shift().reindex(logs.index)
+    rest = ((logs['GAME_DATE'] - previous).dt.days - 1).clip(lower=0, upper=3).fillna(3).astype(int)
+    labels = rest.map({0: '0 (back-to-back)', 1: '1 day', 2: '2 days', 3: '3+ days'})
+    return rest, labels
+
+def all_star_key(logs):
+    start_years = logs['SEASON_ID'].astype(str).str[-4:].astype(int)
+    cutoffs = pd.to_datetime(start_years.map(all_star_date))
+    after = (logs['GAME_DATE'] > cutoffs).astype(int)
+    return after, after.map({0: 'Pre All-Star', 1: 'Post All-Star'})
+
+def minutes_role_key(logs):
+    bench = (logs['MIN'] < STARTER_MINUTES).astype(int)
+    return bench, bench.map({0: f'Starter minutes ({STARTER_MINUTES}+)', 1: f'Bench minutes (<{STARTER_MINUTES})'})
+
+SPLIT_DIMENSIONS = {
+    'HOME_AWAY': home_away_key,
+    'WL': win_loss_key,
+    'OPPONENT': opponent_key,
+    'SEASON': season_key,
+    'MONTH': month_key,
+    'REST_DAYS': rest_days_key,
+    'ALL_STAR': all_star_key,
+    'MINUTES_ROLE': minutes_role_key
+}
+
+## Define a function to compute every requested split with one bincount per stat across all dimensions
+def compute_splits(logs, dimensions):
+    unknown = [d for d in dimensions if d not in SPLIT_DIMENSIONS]
+    if unknown:
+        raise ValueError(f'Unknown split dimensions {unknown}, expected some of {list(SPLIT_DIMENSIONS)}')
+
+    values = logs[SUM_COLS].to_numpy(dtype='float64')
+
+    # give every (dimension, value) pair its own group id so all dimensions share one code array
+    all_codes = []
+    all_rows = []
+    groups = {}
+    offset = 0
+
+    for dim in dimensions:
+        keys, labels = SPLIT_DIMENSIONS[dim](logs)
+        codes, uniques = pd.factorize(keys, sort=True)
+        valid = codes >= 0
+
+        # every key maps to exactly one label, so take the first label seen for each group
+        group_labels = pd.Series(np.asarray(labels)[valid]).groupby(codes[valid]).first().to_numpy()
+        groups[dim] = (offset, len(uniques), group_labels)
+
+        all_codes.append(codes[valid] + offset)
+        all_rows.append(np.flatnonzero(valid))
+        offset += len(uniques)
+
+    if offset == 0:
+        return {dim: empty_split() for dim in dimensions}
+
+    all_codes = np.concatenate(all_codes)
+    all_rows = np.concatenate(all_rows)
+
+    gp = np.bincount(all_codes, minlength=offset)
+    sums = {
+        col: np.bincount(all_codes, weights=values[all_rows, j], minlength=offset)
+        for j, col in enumerate(SUM_COLS)
+    }
+
+    return {
+        dim: split_table(gp[start:start + n], {col: s[start:start + n] for col, s in sums.items()}, labels)
+        for dim, (start, n, labels) in groups.items()
+    }
+
+## Define a function to turn group sums into per-game averages and percentages (same formulas as the SQL views)
+def split_table(gp, sums, labels):
+    return pd.DataFrame({
+        'SPLIT': labels,
+        'GP': gp.astype(int),
+        'MPG': sql_round(sums['MIN'] / gp, 1),
+        'PPG': sql_round(sums['PTS'] / gp, 1),
+        'RPG': sql_round(sums['REB'] / gp, 1),
+        'APG': sql_round(sums['AST'] / gp, 1),
+        'SPG': sql_round(sums['STL'] / gp, 1),
+        'BPG': sql_round(sums['BLK'] / gp, 1),
+        'TPG': sql_round(sums['TOV'] / gp, 1),
+        'FG_PCT': ratio(sums['FGM'], sums['FGA']),
+        'FG3_PCT': ratio(sums['FG3M'], sums['FG3A']),
+        'FT_PCT': ratio(sums['FTM'], sums['FTA']),
+        'TS_PCT': ratio(sums['PTS'], 2 * sums['TSA']),
+        'GMSC': sql_round(sums['GAME_SCORE'] / gp, 1),
+        'AVG_PLUS_MINUS': sql_round(sums['PLUS_MINUS'] / gp, 1)
+    })
+
+def empty_split():
+    return split_table(np.array([], dtype=int), {col: np.array([]) for col in SUM_COLS}, [])
@@ -0,0 +1,257 @@
+### THIS SCRIPT RUNS PULL -> CLEAN -> INSERT AS A STREAM: PER-PLAYER FRAMES FLOW THROUGH BOUNDED QUEUES SO FETCHING, CLEANING AND INSERTING OVERLAP
+## Import libraries
+import logging
+import queue
+import threading
+import time
+import pandas as pd
+from nba_api.stats.endpoints import playergamelog
+from nba_api.stats.static import players
+from fetch_engine import fetch_all
+from pull_data import resolve_cache
+from response_cache import ttl_for_season
+from clean_data import clean_gamelogs
+from db_insert import insert_gamelogs, ROW_ACTIONS
+from watermarks import filter_new_gamelogs
+from metrics import metrics, log_event, stage
+
+# players waiting to be cleaned; with the responses still in flight this caps how many raw frames are in memory
+DEFAULT_QUEUE_SIZE = 64
+
+# cleaned batches waiting to be inserted
+CLEAN_QUEUE_BATCHES = 2
+
+# rows per cleaned batch (and per insert transaction)
+DEFAULT_BATCH_SIZE = 5000
+
+# how often blocked puts and gets check whether another stage failed
+POLL_SECONDS = 0.5
+
+# marks the end of a queue
+DONE = object()
+
+## Define the error a stage raises when another stage failed and the stream is shutting down
+class StreamStopped(Exception):
+    pass
+
+## Define the stream: a fetch thread, a clean thread and an insert thread joined by two bounded queues
+class StreamPipeline:
+
+    def __init__(self, queue_size=DEFAULT_QUEUE_SIZE, batch_size=DEFAULT_BATCH_SIZE, insert_fn=insert_gamelogs):
+        self.queue_size = queue_size
+        self.batch_size = batch_size
+        self.insert_fn = insert_fn
+        self.raw_queue = queue.Queue(maxsize=queue_size)
+        self.clean_queue = queue.Queue(maxsize=CLEAN_QUEUE_BATCHES)
+
+        # the first stage to fail stops the others
+        self.stopped = threading.Event()
+        self.errors = []
+
+        # counters for the end-of-run summary
+        self.lock = threading.Lock()
+        self.players_fetched = 0
+        self.players_failed = 0
+        self.rows_pulled = 0
+        self.rows_stored = 0
+        self.row_actions = dict.fromkeys(ROW_ACTIONS, 0)
+        self.batches = 0
+        self.peak_raw_queue = 0
+        self.peak_clean_queue = 0
+
+    # blocking put that gives up once another stage has failed (a full queue is what holds the upstream stage back)
+    def put(self, q, item):
+        while not self.stopped.is_set():
+            try:
+                q.put(item, timeout=POLL_SECONDS)
+                return q.qsize()
+            except queue.Full:
+                continue
+        raise StreamStopped()
+
+    def get(self, q):
+        while not self.stopped.is_set():
+            try:
+                return q.get(timeout=POLL_SECONDS)
+            except queue.Empty:
+                continue
+        raise StreamStopped()
+
+    # run a stage on its own thread, recording its error and stopping the stream if it fails
+    def start(self, name, fn, *args):
+        def target():
+            try:
+                fn(*args)
+            except StreamStopped:
+                pass
+            except BaseException as e:
+                self.errors.append(e)
+                self.stopped.set()
+                log_event('stream_stage_failed', f'Stream {name} stage failed: {e}', logging.ERROR, stage=name, error=repr(e))
+
+        thread = threading.Thread(target=target, name=f'stream-{name}', daemon=True)
+        thread.start()
+        return thread
+
+    # hand one player's raw game logs to the clean stage
+    def put_raw(self, player, gamelog):
+        if gamelog is None or gamelog.empty:
+            return
+
+        gamelog['PLAYER_ID'] = player['id']
+        gamelog['PLAYER_NAME'] = player['full_name']
+        depth = self.put(self.raw_queue, gamelog)
+
+        with self.lock:
+            self.players_fetched += 1
+            self.rows_pulled += len(gamelog)
+            self.peak_raw_queue = max(self.peak_raw_queue, depth)
+        metrics.set('stream_raw_queue_depth', depth)
+
+    # fetch stage: cached responses first, then the api with at most queue_size responses in flight
+    def fetch(self, player_list, season, endpoint, cache, requests_per_second, max_workers):
+        params_fn = lambda player: {'player_id': player['id'], 'season': season}
+        to_fetch = []
+
+        try:
+            for player in player_list:
+                frames = cache.get(endpoint.__name__, params_fn(player)) if cache else None
+                if frames is not None:
+                    self.put_raw(player, frames[0])
+                else:
+                    to_fetch.append(player)
+
+            def report(i, player, frames, error):
+                if error is not None:
+                    with self.lock:
+                        self.players_failed += 1
+                    metrics.inc('players_failed_total', endpoint=endpoint.__name__)
+                    log_event('pull_failed', f'Unable to pull logs for {player["full_name"]}: {error}', logging.WARNING,
+                              endpoint=endpoint.__name__, player_id=player['id'], error=repr(error))
+                    return
+
+                if cache:
+                    cache.put(endpoint.__name__, params_fn(player), frames, ttl_for_season(season))
+                metrics.inc('api_rows_received_total', len(frames[0]), endpoint=endpoint.__name__)
+                self.put_raw(player, frames[0])
+
+            fetch_all(
+                to_fetch,
+                lambda player: endpoint(**params_fn(player)).get_data_frames(),
+                requests_per_second=requests_per_second,
+                max_workers=max_workers,
+                on_result=report,
+                name=endpoint.__name__,
+                max_pending=self.queue_size,
+                collect=False
+            )
+        finally:
+            if cache:
+                cache.flush()
+
+        self.put(self.raw_queue, DONE)
+
+    # clean stage: gather players until a batch is full, drop already stored games, clean and pass the batch on
+    def clean(self, watermarks):
+        pending = []
+        pending_rows = 0
+
+        def flush():
+            raw_df = pd.concat(pending, ignore_index=True)
+            pending.clear()
+
+            if watermarks is not None:
+                raw_df = filter_new_gamelogs(raw_df, watermarks)
+            if raw_df.empty:
+                return
+
+            depth = self.put(self.clean_queue, clean_gamelogs(raw_df))
+            with self.lock:
+                self.peak_clean_queue = max(self.peak_clean_queue, depth)
+            metrics.set('stream_clean_queue_depth', depth)
+
+        while True:
+            gamelog = self.get(self.raw_queue)
+            if gamelog is DONE:
+                break
+
+            pending.append(gamelog)
+            pending_rows += len(gamelog)
+            if pending_rows >= self.batch_size:
+                flush()
+                pending_rows = 0
+
+        if pending:
+            flush()
+
+        self.put(self.clean_queue, DONE)
+
+    # insert stage: one transaction per cleaned batch, so watermarks, aggregates and the data version advance as batches land
+    def insert(self):
+        while True:
+            gamelogs_df = self.get(self.clean_queue)
+            if gamelogs_df is DONE:
+                return
+
+            result = self.insert_fn(gamelogs_df, batch_size=self.batch_size, mode='batched') or {}
+            with self.lock:
+                self.rows_stored += len(gamelogs_df)
+                self.batches += 1
+                for action in ROW_ACTIONS:
+                    self.row_actions[action] += result.get(action, 0)
+
+    def run(self, player_list, season, endpoint, cache, requests_per_second, max_workers, watermarks=None):
+        start = time.perf_counter()
+        threads = [
+            self.start('fetch', self.fetch, player_list, season, endpoint, cache, requests_per_second, max_workers),
+            self.start('clean', self.clean, watermarks),
+            self.start('insert', self.insert)
+        ]
+
+        try:
+            for thread in threads:
+                while thread.is_alive():
+                    thread.join(timeout=POLL_SECONDS)
+        except KeyboardInterrupt:
+            # let the stages unwind (the insert in progress finishes its transaction), then re-raise
+            self.stopped.set()
+            for thread in threads:
+                thread.join()
+            raise
+
+        if self.errors:
+            raise self.errors[0]
+
+        return self.summary(time.perf_counter() - start)
+
+    def summary(self, seconds):
+        with self.lock:
+            return {
+                'players_fetched': self.players_fetched,
+                'players_failed': self.players_failed,
+                'rows_pulled': self.rows_pulled,
+                'rows_stored': self.rows_stored,
+                **self.row_actions,
+                'batches': self.batches,
+                'peak_raw_queue': self.peak_raw_queue,
+                'peak_clean_queue': self.peak_clean_queue,
+                'seconds': round(seconds, 3)
+            }
+
+## Define a function to pull, clean and store game logs as a stream
+## (pass watermarks for incremental runs so already stored games are dropped before cleaning;
+## stream runs don't checkpoint, a rerun upserts what was stored and reuses the cached responses;
+## the benchmarks pass their own insert_fn to time the stream without a database)
+def stream_gamelogs(season='ALL', requests_per_second=2.0, max_workers=4, endpoint=playergamelog.PlayerGameLog, cache=None,
+                    player_list=None, watermarks=None, queue_size=DEFAULT_QUEUE_SIZE, batch_size=DEFAULT_BATCH_SIZE, insert_fn=insert_gamelogs):
+
+    player_list = players.get_active_players() if player_list is None else player_list
+    pipeline = StreamPipeline(queue_size, batch_size, insert_fn)
+
+    with stage('stream_gamelogs') as stage_info:
+        summary = pipeline.run(player_list, season, endpoint, resolve_cache(cache), requests_per_second, max_workers, watermarks)
+        stage_info['rows'] = summary['rows_stored']
+
+    log_event('stream_finished', f'Streamed {summary["rows_stored"]} game logs ({summary["inserted"]} new, {summary["updated"]} changed) from {summary["players_fetched"]}/{len(player_list)} players '
+              f'in {summary["batches"]} batches', **summary)
+    return summary
@@ -0,0 +1,128 @@
+### THIS SCRIPT GENERATES REALISTIC SYNTHETIC PLAYERGAMELOG AND COMMONPLAYERINFO FRAMES FOR BENCHMARKS AND OFFLINE RUNS
+## Import libraries
+from datetime import date
+import zlib
+import numpy as np
+import pandas as pd
+
+# synthetic players live in their own id range (same as seed_players.py) so they can be removed afterwards
+SYNTHETIC_PLAYER_BASE = 9_900_000
+
+TEAMS = [
+    'ATL', 'BOS', 'BKN', 'CHA', 'CHI', 'CLE', 'DAL', 'DEN', 'DET', 'GSW',
+    'HOU', 'IND', 'LAC', 'LAL', 'MEM', 'MIA', 'MIL', 'MIN', 'NOP', 'NYK',
+    'OKC', 'ORL', 'PHI', 'PHX', 'POR', 'SAC', 'SAS', 'TOR', 'UTA', 'WAS'
+]
+
+FIRST_NAMES = ['Luka', 'Nikola', 'Jayson', 'Anthony', 'Devin', 'Tyrese', 'Jalen', 'Kristaps', 'Shai', 'Dāvis', 'Bogdan', 'Jaren']
+LAST_NAMES = ['Jokić', 'Dončić', 'Porziņģis', 'Bogdanović', 'Williams', 'Brown', 'Green', 'Johnson', 'Bertāns', 'Smith', 'Walker', 'Harris']
+POSITIONS = ['Guard', 'Forward', 'Center', 'Guard-Forward', 'Forward-Center']
+COUNTRIES = ['USA', 'USA', 'USA', 'Serbia', 'Slovenia', 'Latvia', 'Canada', 'France', 'Australia']
+
+# columns PlayerGameLog returns, in its order
+GAMELOG_RESPONSE_COLUMNS = [
+    'SEASON_ID', 'Player_ID', 'Game_ID', 'GAME_DATE', 'MATCHUP', 'WL',
+    'MIN', 'FGM', 'FGA', 'FG_PCT', 'FG3M', 'FG3A', 'FG3_PCT',
+    'FTM', 'FTA', 'FT_PCT', 'OREB', 'DREB', 'REB', 'AST', 'STL',
+    'BLK', 'TOV', 'PF', 'PTS', 'PLUS_MINUS', 'VIDEO_AVAILABLE'
+]
+
+## Define a function to build a seeded random generator that is stable for the same inputs across runs
+def rng_for(seed, *parts):
+    return np.random.default_rng([seed, *[zlib.crc32(str(p).encode()) for p in parts]])
+
+## Define a function to list synthetic players in the nba_api static players layout
+def make_players(n_players, seed=0):
+    rng = np.random.default_rng(seed)
+    player_list = []
+
+    for i in range(n_players):
+        first = FIRST_NAMES[rng.integers(len(FIRST_NAMES))]
+        last = LAST_NAMES[rng.integers(len(LAST_NAMES))]
+        player_list.append({
+            'id': SYNTHETIC_PLAYER_BASE + i,
+            'full_name': f'{first} {last} {i}',
+            'first_name': first,
+            'last_name': f'{last} {i}',
+            'is_active': True
+        })
+
+    return player_list
+
+## Define a function to build one player's season in the PlayerGameLog layout, newest game first like the api
+def make_player_season(player_id, season, seed=0):
+    rng = rng_for(seed, player_id, season)
+    start_year = int(season[:4])
+
+    # a player's role sets their minutes and usage, so stat lines are correlated like real box scores
+    skill = rng_for(seed, player_id).beta(2, 5)
+    games = int(rng.integers(40, 83))
+    team = TEAMS[player_id % len(TEAMS)]
+
+    dates = pd.Timestamp(date(start_year, 10, 22)) + pd.to_timedelta(np.sort(rng.choice(175, games, replace=False)), unit='D')
+    opponents = rng.choice([t for t in TEAMS if t != team], games)
+    home = rng.random(games) < 0.5
+
+    minutes = np.clip(rng.normal(12 + 26 * skill, 5, games), 1, 48).round()
+    fga = rng.poisson(minutes * (0.25 + 0.3 * skill))
+    fg3a = rng.binomial(fga, 0.38)
+    fg3m = rng.binomial(fg3a, 0.36)
+    fgm = rng.binomial(fga - fg3a, 0.52) + fg3m
+    fta = rng.poisson(minutes * 0.12 * (0.5 + skill))
+    ftm = rng.binomial(fta, 0.78)
+    oreb = rng.poisson(minutes * 0.03)
+    dreb = rng.poisson(minutes * 0.11)
+
+    pct = lambda made, att: np.round(np.where(att > 0, made / np.maximum(att, 1), 0.0), 3)
+
+    frame = pd.DataFrame({
+        'SEASON_ID': f'2{start_year}',
+        'Player_ID': player_id,
+        'Game_ID': [f'002{str(start_year)[-2:]}{n:05d}' for n in rng.choice(1230, games, replace=False) + 1],
+        'GAME_DATE': dates.strftime('%b %d, %Y').str.upper(),
+        'MATCHUP': [f'{team} @ {opp}' if not h else f'{team} vs. {opp}' for opp, h in zip(opponents, home)],
+        'WL': rng.choice(['W', 'L'], games),
+        'MIN': minutes.astype(int),
+        'FGM': fgm, 'FGA': fga, 'FG_PCT': pct(fgm, fga),
+        'FG3M': fg3m, 'FG3A': fg3a, 'FG3_PCT': pct(fg3m, fg3a),
+        'FTM': ftm, 'FTA': fta, 'FT_PCT': pct(ftm, fta),
+        'OREB': oreb, 'DREB': dreb, 'REB': oreb + dreb,
+        'AST': rng.poisson(minutes * (0.05 + 0.1 * skill)),
+        'STL': rng.poisson(minutes * 0.03),
+        'BLK': rng.poisson(minutes * 0.02),
+        'TOV': rng.poisson(minutes * 0.05),
+        'PF': rng.poisson(minutes * 0.06),
+        'PTS': 2 * fgm + fg3m + ftm,
+        'PLUS_MINUS': rng.integers(-25, 26, games),
+        'VIDEO_AVAILABLE': 1
+    })
+
+    return frame[GAMELOG_RESPONSE_COLUMNS].iloc[::-1].reset_index(drop=True)
+
+## Define a function to build a player's game logs for several seasons (season='ALL' in the api)
+def make_player_gamelog(player_id, seasons, seed=0):
+    frames = [make_player_season(player_id, season, seed) for season in reversed(seasons)]
+    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=GAMELOG_RESPONSE_COLUMNS)
+
+## Define a function to build a player's CommonPlayerInfo frame (the first frame the endpoint returns)
+def make_player_info(player, seed=0):
+    rng = rng_for(seed, player['id'], 'info')
+    drafted = rng.random() < 0.85
+    draft_year = int(rng.integers(2003, 2025))
+
+    return pd.DataFrame([{
+        'PERSON_ID': player['id'],
+        'FIRST_NAME': player['first_name'],
+        'LAST_NAME': player['last_name'],
+        'DISPLAY_FIRST_LAST': player['full_name'],
+        'BIRTHDATE': f'{draft_year - int(rng.integers(19, 23))}-{int(rng.integers(1, 13)):02d}-{int(rng.integers(1, 29)):02d}T00:00:00',
+        'SCHOOL': rng.choice(['Duke', 'Kentucky', 'Kansas', 'UCLA', 'Gonzaga', '']),
+        'COUNTRY': rng.choice(COUNTRIES),
+        'HEIGHT': f'{int(rng.integers(6, 8))}-{int(rng.integers(0, 12))}',
+        'WEIGHT': str(int(rng.integers(175, 280))),
+        'POSITION': rng.choice(POSITIONS),
+        'TEAM_ABBREVIATION': TEAMS[player['id'] % len(TEAMS)],
+        'DRAFT_YEAR': str(draft_year) if drafted else 'Undrafted',
+        'DRAFT_ROUND': str(int(rng.integers(1, 3))) if drafted else 'Undrafted',
+        'DRAFT_NUMBER': str(int(rng.integers(1, 61))) if drafted else 'Undrafted'
+    }])
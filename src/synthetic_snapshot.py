@@ -0,0 +1,115 @@
+### THIS SCRIPT PUBLISHES A SNAPSHOT OF SYNTHETIC PLAYERS, SO THE SNAPSHOT BACKEND AND THE DASHBOARD CAN BE BENCHMARKED WITHOUT MYSQL
+## Usage (from src): python synthetic_snapshot.py --players 500 --seasons 10 --snapshot-dir ../.bench/snapshot
+## The logs come from the stub api through pull_data and clean_data, the aggregate tables from the same SELECTs the pipeline
+## runs in mysql (aggregates.py), here run by duckdb
+## Import libraries
+import argparse
+import os
+import re
+import shutil
+import tempfile
+from datetime import datetime
+import pandas as pd
+from aggregates import SUMMARY_SELECT, SUMMARY_INSERT, SPLITS_SELECT, SPLITS_INSERT, CUBE_SELECT, CUBE_INSERT, SPLIT_COLUMNS
+from clean_data import clean_gamelogs, clean_metadata
+from data_version import GAMELOGS, METADATA, PIPELINE_RUNS
+from nba_api_stub import StubNBAApi
+from pull_data import pull_gamelogs, pull_metadata
+from seasons import current_season, seasons_between
+from schema import table_columns
+from snapshot import new_version, activate_version, write_table, GAMELOG_TABLE, DEFAULT_SNAPSHOT_DIR
+from synthetic_data import make_players
+
+## Define a function to read the table and column list of an aggregate INSERT, the names its SELECT's columns get
+def insert_target(insert_sql):
+    match = re.search(r'INSERT INTO (\w+) \((.*)\)', insert_sql, re.S)
+    return match.group(1), [col.strip() for col in match.group(2).split(',')]
+
+## Define a function to run an aggregate SELECT over the cleaned logs in duckdb, named and typed like the mysql table
+def aggregate(con, select_sql, insert_sql):
+    table, columns = insert_target(insert_sql)
+    df = con.execute(select_sql).df()
+    df.columns = columns
+
+    # duckdb returns integer sums as floats, the mysql table stores them as INT (DECIMAL columns are read back as floats)
+    definitions = table_columns(table)
+    for col in columns:
+        if definitions[col].split()[1].startswith(('INT', 'BIGINT', 'SMALLINT')):
+            df[col] = df[col].astype('int64')
+    return df
+
+## Define a function to build every snapshot table for synthetic players, shaped like the mysql tables publish_snapshot reads
+def build_tables(n_players, n_seasons, seed=0):
+    import duckdb
+
+    first_start = int(current_season()[:4]) - n_seasons + 1
+    seasons = seasons_between(f'{first_start}-{str(first_start + 1)[-2:]}')
+    player_list = make_players(n_players, seed)
+    api = StubNBAApi(player_list, seasons, latency=0, seed=seed)
+
+    checkpoint_dir = tempfile.mkdtemp(prefix='synthetic_checkpoints_')
+    try:
+        metadata = clean_metadata(pull_metadata(1000, 4, endpoint=api.CommonPlayerInfo, cache=False,
+                                                player_list=player_list, checkpoint_dir=checkpoint_dir))
+        gamelogs = clean_gamelogs(pull_gamelogs('ALL', 1000, 4, endpoint=api.PlayerGameLog, cache=False,
+                                                player_list=player_list, checkpoint_dir=checkpoint_dir))
+    finally:
+        shutil.rmtree(checkpoint_dir, ignore_errors=True)
+
+    # mysql hands back dates as dates, the stored GAME_MONTH column, text where the cleaned frame has categoricals
+    # and DECIMAL values at their column's scale where the cleaned frame has float32
+    for col, definition in table_columns(GAMELOG_TABLE).items():
+        scale = re.match(r'\w+ DECIMAL\(\d+,(\d+)\)', definition)
+        if scale and col in gamelogs.columns:
+            gamelogs[col] = gamelogs[col].astype('float64').round(int(scale.group(1)))
+    gamelogs['GAME_MONTH'] = gamelogs['GAME_DATE'].dt.strftime('%Y-%m')
+    gamelogs['GAME_DATE'] = gamelogs['GAME_DATE'].dt.date
+    for col in gamelogs.select_dtypes('category').columns:
+        gamelogs[col] = gamelogs[col].astype(str)
+    metadata['DOB'] = metadata['DOB'].dt.date
+
+    con = duckdb.connect(':memory:')
+    con.register(GAMELOG_TABLE, gamelogs)
+
+    tables = {
+        'PLAYER_METADATA': metadata.sort_values('PLAYER_ID'),
+        'PLAYER_SEASON_SUMMARY': aggregate(con, SUMMARY_SELECT.format(where='') + ' ORDER BY 1, 2', SUMMARY_INSERT),
+        'PLAYER_SEASON_SPLITS': pd.concat([
+            aggregate(con, SPLITS_SELECT.format(split_type=split_type, split_col=split_col, where='WHERE'), SPLITS_INSERT)
+            for split_type, split_col in SPLIT_COLUMNS.items()
+        ]).sort_values(['PLAYER_ID', 'SPLIT_TYPE', 'SPLIT_VALUE', 'SEASON_ID']),
+        'PLAYER_MATCHUP_CUBE': aggregate(con, CUBE_SELECT.format(where='') + ' ORDER BY 1, 2, 3, 4, 5', CUBE_INSERT),
+        'DATA_VERSION': pd.DataFrame({'SCOPE': [GAMELOGS, METADATA, PIPELINE_RUNS], 'VERSION': 1, 'UPDATED_AT': datetime.now()})
+    }
+    con.close()
+
+    return tables, gamelogs.sort_values(['PLAYER_ID', 'GAME_DATE'])
+
+## Define a function to publish the synthetic tables as a snapshot version, in the layout publish_snapshot writes
+def publish_synthetic_snapshot(n_players, n_seasons, snapshot_dir=DEFAULT_SNAPSHOT_DIR, seed=0):
+    tables, gamelogs = build_tables(n_players, n_seasons, seed)
+    version, version_dir = new_version(snapshot_dir)
+    row_counts = {}
+
+    for table, df in tables.items():
+        write_table(df.reset_index(drop=True), os.path.join(version_dir, f'{table}.parquet'))
+        row_counts[table] = len(df)
+
+    for season_id, df in gamelogs.groupby('SEASON_ID'):
+        write_table(df.drop(columns=['SEASON_ID']).reset_index(drop=True),
+                    os.path.join(version_dir, GAMELOG_TABLE, f'SEASON_ID={season_id}', 'part-0.parquet'))
+    row_counts[GAMELOG_TABLE] = len(gamelogs)
+
+    activate_version(snapshot_dir, version, row_counts)
+    return version, row_counts
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Publish a snapshot of synthetic players for offline benchmarks.')
+    parser.add_argument('--players', type=int, default=500)
+    parser.add_argument('--seasons', type=int, default=10)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--snapshot-dir', default=DEFAULT_SNAPSHOT_DIR, help='where to publish (point SNAPSHOT_DIR at it to serve it)')
+    args = parser.parse_args()
+
+    version, row_counts = publish_synthetic_snapshot(args.players, args.seasons, args.snapshot_dir, args.seed)
+    print(f'Published synthetic snapshot {version} to {os.path.abspath(args.snapshot_dir)}: {row_counts}')
@@ -0,0 +1,127 @@
+### THIS SCRIPT DEFINES THE DASHBOARD CACHE: ENTRIES ARE KEYED BY DATA VERSION AND REFRESHED IN THE BACKGROUND WHEN IT CHANGES
+## Import libraries
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import logging
+import threading
+from metrics import log_event
+
+## Define the cache, entries never expire on a timer, they are replaced when a newer data version is asked for
+class VersionedCache:
+
+    def __init__(self, max_entries=256, refresh_workers=2):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.in_flight = {}
+        self.warmed = set()
+        self.lock = threading.Lock()
+        self.executor = ThreadPoolExecutor(max_workers=refresh_workers, thread_name_prefix='cache-refresh')
+
+        self.hits = 0
+        self.warm_hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.loads = 0
+        self.errors = 0
+
+    # return the value for key at version, loading it with loader() if needed
+    def get(self, key, version, loader):
+        with self.lock:
+            entry = self.entries.get(key)
+
+            if entry is not None:
+                self.entries.move_to_end(key)
+                cached_version, value = entry
+
+                if cached_version == version:
+                    self.hits += 1
+                    if key in self.warmed:
+                        self.warm_hits += 1
+                    return value
+
+                # stale while revalidate: answer with the old value and load the new version in the background
+                self.stale_hits += 1
+                self.start_load(key, version, loader, refresh=True)
+                return value
+
+            self.misses += 1
+            future = self.start_load(key, version, loader)
+
+        # cold miss: wait for the load, sharing it with any other session asking for the same key
+        return future.result()
+
+    # the current value for key whatever its version, without counting a request (None if not cached)
+    def peek(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            return None if entry is None else entry[1]
+
+    # load a value ahead of the first request for it (cache_warmer.py), returns the future of the load
+    def warm(self, key, version, loader):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and entry[0] == version:
+                return None
+            return self.start_load(key, version, loader, warming=True)
+
+    # start a load unless one is already running for this key and version (single flight), caller holds the lock
+    def start_load(self, key, version, loader, warming=False, refresh=False):
+        future = self.in_flight.get((key, version))
+        if future is None:
+            future = self.executor.submit(self.load, key, version, loader, warming, refresh)
+            self.in_flight[(key, version)] = future
+        return future
+
+    def load(self, key, version, loader, warming=False, refresh=False):
+        try:
+            value = loader()
+        except Exception as e:
+            # a failed refresh keeps serving the stale value, the next request retries it
+            with self.lock:
+                self.errors += 1
+                self.in_flight.pop((key, version), None)
+
+            # nobody waits on a background refresh's future, so its error is logged here (misses raise to the caller, the warmer logs its own)
+            if refresh:
+                log_event('cache_refresh_failed', f'Refreshing {key} to version {version} failed, still serving the previous version: {e}',
+                          logging.WARNING, key=key, version=version, error=repr(e))
+            raise
+
+        with self.lock:
+            self.loads += 1
+            self.in_flight.pop((key, version), None)
+
+            # a slow load of an older version must not replace a newer one
+            current = self.entries.get(key)
+            if current is None or not current[0] > version:
+                self.entries[key] = (version, value)
+                self.entries.move_to_end(key)
+
+                # remember which entries the warmer loaded so their hits can be told apart from ones a visitor paid for
+                if warming:
+                    self.warmed.add(key)
+                else:
+                    self.warmed.discard(key)
+
+            while len(self.entries) > self.max_entries:
+                evicted, _ = self.entries.popitem(last=False)
+                self.warmed.discard(evicted)
+
+        return value
+
+    # report how often requests were answered from the cache
+    def stats(self):
+        with self.lock:
+            requests = self.hits + self.stale_hits + self.misses
+            return {
+                'entries': len(self.entries),
+                'hits': self.hits,
+                'warm_hits': self.warm_hits,
+                'stale_hits': self.stale_hits,
+                'cold_misses': self.misses,
+                'hit_rate': (self.hits + self.stale_hits) / requests if requests else 0.0,
+                'warm_hit_rate': self.warm_hits / requests if requests else 0.0,
+                'loads': self.loads,
+                'loading': len(self.in_flight),
+                'errors': self.errors
+            }
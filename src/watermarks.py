@@ -0,0 +1,84 @@
+### THIS SCRIPT TRACKS THE LATEST GAME STORED FOR EACH PLAYER SO REFRESHES ONLY LOAD NEW GAMES
+## Import libraries
+from db_connection import pooled_connection
+import pandas as pd
+from metrics import log_event
+
+## Define a function to seed the watermark table from the game logs already stored
+def rebuild_watermarks(conn):
+    cursor = conn.cursor()
+
+    cursor.execute("""
+        INSERT INTO PLAYER_WATERMARKS (PLAYER_ID, LAST_GAME_DATE, LAST_GAME_ID)
+        SELECT g.PLAYER_ID, g.GAME_DATE, MAX(g.GAME_ID)
+        FROM PLAYER_GAME_LOGS g
+        JOIN (
+            SELECT PLAYER_ID, MAX(GAME_DATE) AS LAST_GAME_DATE
+            FROM PLAYER_GAME_LOGS
+            GROUP BY PLAYER_ID
+        ) latest ON latest.PLAYER_ID = g.PLAYER_ID AND latest.LAST_GAME_DATE = g.GAME_DATE
+        GROUP BY g.PLAYER_ID, g.GAME_DATE
+        ON DUPLICATE KEY UPDATE
+            LAST_GAME_DATE = VALUES(LAST_GAME_DATE),
+            LAST_GAME_ID = VALUES(LAST_GAME_ID)
+    """)
+    conn.commit()
+    cursor.close()
+
+## Define a function to load every player's watermark as {PLAYER_ID: (LAST_GAME_DATE, LAST_GAME_ID)}
+def get_watermarks():
+    query = 'SELECT PLAYER_ID, LAST_GAME_DATE, LAST_GAME_ID FROM PLAYER_WATERMARKS'
+
+    with pooled_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(query)
+        rows = cursor.fetchall()
+
+        # databases loaded before the watermark table existed get seeded once from the game logs
+        if not rows:
+            rebuild_watermarks(conn)
+            cursor.execute(query)
+            rows = cursor.fetchall()
+
+        cursor.close()
+
+    log_event('watermarks_loaded', f'Watermarks loaded for {len(rows)} players', players=len(rows))
+    return {player_id: (game_date, game_id) for player_id, game_date, game_id in rows}
+
+## Define a function to drop raw game logs that are already stored
+def filter_new_gamelogs(raw_df, watermarks):
+    if raw_df.empty:
+        return raw_df
+
+    game_dates = pd.to_datetime(raw_df['GAME_DATE'])
+    last_dates = pd.to_datetime(
+        raw_df['PLAYER_ID'].map({player_id: wm[0] for player_id, wm in watermarks.items()})
+    )
+
+    # a player plays at most once a day, so anything after the last stored date is new
+    is_new = last_dates.isna() | (game_dates > last_dates)
+    new_df = raw_df[is_new]
+
+    log_event('gamelogs_filtered', f'{len(new_df)} of {len(raw_df)} game logs are newer than the stored watermarks', new=len(new_df), pulled=len(raw_df))
+    return new_df
+
+## Define a function to advance the watermarks for the players in a batch of cleaned logs
+def update_watermarks(cursor, df):
+    if df.empty:
+        return
+
+    latest = df.sort_values('GAME_DATE').drop_duplicates('PLAYER_ID', keep='last')
+
+    data = [
+        (int(player_id), pd.Timestamp(game_date).date(), str(game_id))
+        for player_id, game_date, game_id in zip(latest['PLAYER_ID'], latest['GAME_DATE'], latest['GAME_ID'])
+    ]
+
+    # LAST_GAME_ID is assigned first so it still compares against the old LAST_GAME_DATE
+    cursor.executemany("""
+        INSERT INTO PLAYER_WATERMARKS (PLAYER_ID, LAST_GAME_DATE, LAST_GAME_ID)
+        VALUES (%s, %s, %s)
+        ON DUPLICATE KEY UPDATE
+            LAST_GAME_ID = IF(VALUES(LAST_GAME_DATE) >= LAST_GAME_DATE, VALUES(LAST_GAME_ID), LAST_GAME_ID),
+            LAST_GAME_DATE = GREATEST(LAST_GAME_DATE, VALUES(LAST_GAME_DATE))
+    """, data)
@@ -4,7 +4,27 @@ import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 from datetime import datetime
-from src.db_connection import connect_to_db
+import functools
+import os
+import sys
+
+# the modules in src import each other by name, so put src itself on the path
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src'))
+
+from db_connection import get_pool
+from dashboard_queries import ALL_PLAYERS_QUERY, SEASON_SUMMARY_QUERY, PLAYER_NAMES_QUERY, OPPONENTS_QUERY
+from player_bundle import load_player_bundle, load_player_game_logs, fetch_result_sets
+from aggregates import MIN_HIGH_TSA, MIN_HIGH_FGA, MIN_HIGH_MIN
+from snapshot import get_snapshot_reader
+from splits import SPLIT_DIMENSIONS, compute_splits
+from rankings import Rankings, percentile_badge, CAREER
+from rolling import load_rolling, ROLLING_STATS, ROLLING_WINDOWS, STREAK_THRESHOLDS, STRETCH_WINDOWS, STAT_LABELS
+from matchup_cube import opponent_splits_query, best_vs_team_query, LEADERBOARD_STATS
+from player_search import PlayerSearchIndex
+from data_version import DataVersionPoller, GAMELOGS, METADATA, PIPELINE_RUNS
+from versioned_cache import VersionedCache
+from cache_warmer import CacheWarmer, HitCounter, WARM_PLAYERS
+from metrics import metrics, timed
 
 # Page config
 st.set_page_config(
@@ -32,264 +52,238 @@ st.markdown("""
     </style>
 """, unsafe_allow_html=True)
 
-# Database connection
+# Read path: 'mysql' queries the database, 'snapshot' queries the parquet snapshot the pipeline publishes
+DASHBOARD_BACKEND = os.getenv('DASHBOARD_BACKEND', 'mysql').lower()
+
+# run_query is also called from the cache's refresh threads, so it uses the process-wide pool and reader, not st.* caches
+def run_query(query, section='other'):
+    """Run a query on the configured backend, timed under the dashboard section it loads"""
+    with timed('dashboard_query', section=section, backend=DASHBOARD_BACKEND):
+        if DASHBOARD_BACKEND == 'snapshot':
+            return get_snapshot_reader().query(query)
+
+        with get_pool().connection() as conn:
+            return pd.read_sql(query, conn)
+
+# several queries in one round trip, for the player page bundle
+def run_queries(queries, section='other'):
+    """Run several queries in one call on the configured backend, timed under the dashboard section they load"""
+    with timed('dashboard_query', section=section, backend=DASHBOARD_BACKEND):
+        if DASHBOARD_BACKEND == 'snapshot':
+            return get_snapshot_reader().query_many(queries)
+
+        with get_pool().connection() as conn:
+            return fetch_result_sets(conn, queries)
+
+# Cache and data version stamps, shared by every session and thread
+@st.cache_resource
+def get_cache():
+    return VersionedCache()
+
+@st.cache_resource
+def get_version_poller():
+    return DataVersionPoller(lambda query: run_query(query, 'data_version'))
+
+# Cache entries as (key, version, loader): keyed on the data version, so they live until the pipeline commits new data
+# and are then reloaded in the background while the previous version keeps being served
+def all_players_entry(versions):
+    return ('all_players',), (versions[GAMELOGS], versions[METADATA]), lambda: run_query(ALL_PLAYERS_QUERY, 'all_players')
+
+def rankings_entry(versions):
+    return ('rankings',), (versions[GAMELOGS],), lambda: Rankings(run_query(SEASON_SUMMARY_QUERY, 'rankings'), versions[GAMELOGS])
+
+# a full scan of the game logs, so it is reloaded on the per-run stamp rather than every insert batch of an ingest,
+# and saved under the game log version it was computed from
+def rolling_entry(versions):
+    return ('rolling',), (versions[PIPELINE_RUNS],), lambda: load_rolling(versions[GAMELOGS], lambda query: run_query(query, 'rolling'))
+
+# matchup cube rollups, one entry per player/season/layout and per leaderboard selection
+def opponent_splits_entry(versions, player_id, season_id, by_location):
+    key = ('opponent_splits', player_id, season_id, by_location)
+    return key, (versions[GAMELOGS],), lambda: run_query(opponent_splits_query(player_id, season_id, by_location), 'matchups')
+
+def best_vs_team_entry(versions, opponent, stat, season_id, min_games):
+    key = ('best_vs_team', opponent, stat, season_id, min_games)
+    return key, (versions[GAMELOGS],), lambda: run_query(best_vs_team_query(opponent, stat, season_id, min_games), 'matchups')
+
+def opponents_entry(versions):
+    return ('opponents',), (versions[GAMELOGS],), lambda: run_query(OPPONENTS_QUERY, 'matchups')['OPPONENT'].tolist()
+
+def search_index_entry(versions):
+    return ('search_index',), (versions[METADATA],), lambda: PlayerSearchIndex(run_query(PLAYER_NAMES_QUERY, 'search_index'))
+
+def player_bundle_entry(versions, player_id):
+    return ('player_bundle', player_id), (versions[GAMELOGS], versions[METADATA]), lambda: load_player_bundle(player_id, run_queries=lambda queries: run_queries(queries, 'player_bundle'))
+
+# the full game log, only loaded when the custom splits view is opened
+def player_game_logs_entry(versions, player_id):
+    return ('player_game_logs', player_id), (versions[GAMELOGS],), lambda: load_player_game_logs(player_id, run_query=lambda query: run_query(query, 'player_game_logs'))
+
+# Page views per player, used to pick which player pages to warm
+@st.cache_resource
+def get_hit_counter():
+    return HitCounter()
+
+# Warm plan: the shared loaders first, then the landing player, the most viewed players and the top scorers
+def make_warm_plan(cache, hit_counter):
+    def plan(versions):
+        yield all_players_entry(versions)
+        yield rankings_entry(versions)
+        yield search_index_entry(versions)
+        yield rolling_entry(versions)
+
+        players_df = cache.peek(all_players_entry(versions)[0])
+        rankings = cache.peek(rankings_entry(versions)[0])
+        if players_df is None or players_df.empty:
+            return
+
+        candidates = [players_df['PLAYER_ID'].iloc[0]] + hit_counter.top(WARM_PLAYERS)
+        if rankings is not None:
+            candidates += rankings.top_n('PPG', WARM_PLAYERS)['PLAYER_ID'].tolist()
+
+        for player_id in list(dict.fromkeys(int(p) for p in candidates))[:WARM_PLAYERS + 1]:
+            yield player_bundle_entry(versions, player_id)
+
+    return plan
+
 @st.cache_resource
-def get_connection():
-    return connect_to_db()
+def get_warmer():
+    return CacheWarmer(get_cache(), make_warm_plan(get_cache(), get_hit_counter()))
 
 # Data loading functions
-@st.cache_data(ttl=600)
 def get_all_players():
     """Get all players with career stats"""
-    conn = get_connection()
-    query = """
-        SELECT * FROM PLAYER_CAREER_STATS 
-        WHERE GP > 0
-        ORDER BY PLAYER_NAME
-    """
-    df = pd.read_sql(query, conn)
-    return df
-
-@st.cache_data(ttl=600)
-def get_player_metadata(player_id):
-    """Get player metadata"""
-    conn = get_connection()
-    query = f"""
-        SELECT * FROM PLAYER_METADATA 
-        WHERE PLAYER_ID = {player_id}
-    """
-    df = pd.read_sql(query, conn)
-    return df.iloc[0] if not df.empty else None
-
-@st.cache_data(ttl=600)
-def get_player_career_stats(player_id):
-    """Get career stats for a player"""
-    conn = get_connection()
-    query = f"""
-        SELECT * FROM PLAYER_CAREER_STATS 
-        WHERE PLAYER_ID = {player_id}
-    """
-    df = pd.read_sql(query, conn)
-    return df.iloc[0] if not df.empty else None
-
-@st.cache_data(ttl=600)
-def get_player_seasons(player_id):
-    """Get season-by-season stats"""
-    conn = get_connection()
-    query = f"""
-        SELECT * FROM PLAYER_SEASON_STATS 
-        WHERE PLAYER_ID = {player_id}
-        ORDER BY SEASON_ID DESC
-    """
-    df = pd.read_sql(query, conn)
-    return df
-
-@st.cache_data(ttl=600)
-def get_recent_games(player_id, num_games=10):
-    """Get most recent N games"""
-    conn = get_connection()
-    query = f"""
-        SELECT 
-            GAME_DATE,
-            TEAM,
-            OPPONENT,
-            HOME_AWAY,
-            WL,
-            MIN,
-            PTS,
-            REB,
-            AST,
-            STL,
-            BLK,
-            TOV,
-            FGM,
-            FGA,
-            FG_PCT,
-            FG3M,
-            FG3A,
-            FG3_PCT,
-            FTM,
-            FTA,
-            FT_PCT,
-            PLUS_MINUS
-        FROM PLAYER_GAME_LOGS
-        WHERE PLAYER_ID = {player_id}
-        ORDER BY GAME_DATE DESC
-        LIMIT {num_games}
-    """
-    df = pd.read_sql(query, conn)
-    return df
-
-@st.cache_data(ttl=600)
-def get_career_highs(player_id):
-    """Get career high performances"""
-    conn = get_connection()
-    query = f"""
-        SELECT * FROM PLAYER_CAREER_HIGHS
-        WHERE PLAYER_ID = {player_id}
-    """
-    df = pd.read_sql(query, conn)
-    return df.iloc[0] if not df.empty else None
-
-@st.cache_data(ttl=600)
-def get_home_away_splits(player_id):
-    """Get home vs away splits"""
-    conn = get_connection()
-    query = f"""
-        SELECT 
-            CASE 
-                WHEN HOME_AWAY = 'H' THEN 'Home'
-                WHEN HOME_AWAY = 'A' THEN 'Away'
-                ELSE 'Unknown'
-            END as LOCATION,
-            COUNT(*) as GP,
-            ROUND(AVG(MIN), 1) as MPG,
-            ROUND(AVG(PTS), 1) as PPG,
-            ROUND(AVG(REB), 1) as RPG,
-            ROUND(AVG(AST), 1) as APG,
-            ROUND(AVG(STL), 1) as SPG,
-            ROUND(AVG(BLK), 1) as BPG,
-            ROUND(SUM(FGM) / NULLIF(SUM(FGA), 0), 3) as FG_PCT,
-            ROUND(SUM(FG3M) / NULLIF(SUM(FG3A), 0), 3) as FG3_PCT,
-            ROUND(SUM(FTM) / NULLIF(SUM(FTA), 0), 3) as FT_PCT
-        FROM PLAYER_GAME_LOGS
-        WHERE PLAYER_ID = {player_id} AND HOME_AWAY IS NOT NULL
-        GROUP BY HOME_AWAY
-        ORDER BY HOME_AWAY
-    """
-    df = pd.read_sql(query, conn)
-    return df
-
-@st.cache_data(ttl=600)
-def get_win_loss_splits(player_id):
-    """Get win vs loss splits"""
-    conn = get_connection()
-    query = f"""
-        SELECT 
-            CASE 
-                WHEN WL = 'W' THEN 'Wins'
-                WHEN WL = 'L' THEN 'Losses'
-                ELSE 'Unknown'
-            END as RESULT,
-            COUNT(*) as GP,
-            ROUND(AVG(PTS), 1) as PPG,
-            ROUND(AVG(REB), 1) as RPG,
-            ROUND(AVG(AST), 1) as APG,
-            ROUND(AVG(STL), 1) as SPG,
-            ROUND(AVG(BLK), 1) as BPG,
-            ROUND(SUM(FGM) / NULLIF(SUM(FGA), 0), 3) as FG_PCT,
-            ROUND(AVG(PLUS_MINUS), 1) as AVG_PLUS_MINUS
-        FROM PLAYER_GAME_LOGS
-        WHERE PLAYER_ID = {player_id} AND WL IS NOT NULL
-        GROUP BY WL
-        ORDER BY WL DESC
-    """
-    df = pd.read_sql(query, conn)
-    return df
-
-@st.cache_data(ttl=600)
-def get_season_trend(player_id):
-    """Get season trend data for charts"""
-    conn = get_connection()
-    query = f"""
-        SELECT 
-            SEASON_ID,
-            GP,
-            PPG,
-            RPG,
-            APG,
-            FG_PCT,
-            FG3_PCT,
-            FT_PCT
-        FROM PLAYER_SEASON_STATS
-        WHERE PLAYER_ID = {player_id}
-        ORDER BY SEASON_ID
-    """
-    df = pd.read_sql(query, conn)
-    return df
-
-@st.cache_data(ttl=600)
-def get_monthly_stats(player_id, season_id=None):
-    """Get monthly performance"""
-    conn = get_connection()
-    
-    season_filter = f"AND SEASON_ID = '{season_id}'" if season_id else ""
-    
-    query = f"""
-        SELECT 
-            YEAR(GAME_DATE) as YEAR,
-            MONTH(GAME_DATE) as MONTH,
-            DATE_FORMAT(GAME_DATE, '%Y-%m') as YEAR_MONTH,
-            COUNT(*) as GP,
-            ROUND(AVG(PTS), 1) as PPG,
-            ROUND(AVG(REB), 1) as RPG,
-            ROUND(AVG(AST), 1) as APG
-        FROM PLAYER_GAME_LOGS
-        WHERE PLAYER_ID = {player_id} {season_filter}
-        GROUP BY YEAR(GAME_DATE), MONTH(GAME_DATE), DATE_FORMAT(GAME_DATE, '%Y-%m')
-        ORDER BY YEAR_MONTH
-    """
-    df = pd.read_sql(query, conn)
-    return df
+    return get_cache().get(*all_players_entry(get_version_poller().current()))
 
-# Main app
-def main():
-    # Header
-    st.markdown('<h1 class="main-header">🏀 NBA Player Stats Dashboard</h1>', unsafe_allow_html=True)
-    
-    # Load all players
-    players_df = get_all_players()
+def get_rankings():
+    """Get the league rankings, rebuilt once per game log version"""
+    return get_cache().get(*rankings_entry(get_version_poller().current()))
+
+def get_rolling():
+    """Get the rolling averages, streaks and stretches of every player, computed once per pipeline run"""
+    return get_cache().get(*rolling_entry(get_version_poller().current()))
+
+def get_opponent_splits(player_id, season_id=None, by_location=False):
+    """Get a player's line against each opponent, rolled up from the matchup cube"""
+    return get_cache().get(*opponent_splits_entry(get_version_poller().current(), player_id, season_id, by_location))
+
+def get_best_vs_team(opponent, stat, season_id=None, min_games=3):
+    """Get the best players against one opponent, rolled up from the matchup cube"""
+    return get_cache().get(*best_vs_team_entry(get_version_poller().current(), opponent, stat, season_id, min_games))
+
+def get_opponents():
+    """Get every opponent in the matchup cube"""
+    return get_cache().get(*opponents_entry(get_version_poller().current()))
+
+def get_search_index():
+    """Get the player search index, rebuilt once per metadata version"""
+    return get_cache().get(*search_index_entry(get_version_poller().current()))
+
+def get_player_bundle(player_id):
+    """Get everything the player page shows, from the summary tables and indexed reads"""
+    return get_cache().get(*player_bundle_entry(get_version_poller().current(), player_id))
+
+def get_player_game_logs(player_id):
+    """Get a player's full game log, for the custom splits"""
+    return get_cache().get(*player_game_logs_entry(get_version_poller().current(), player_id))
+
+## Page sections: each is timed, and the ones with widgets are fragments so their widgets only rerun that section
+def page_section(name, fragment=True):
+    def decorate(fn):
+        @functools.wraps(fn)
+        def timed_section(*args, **kwargs):
+            with timed('dashboard_section', section=name):
+                return fn(*args, **kwargs)
+        return st.fragment(timed_section) if fragment else timed_section
+    return decorate
+
+# Player picker: typing a search or changing the sort only reruns the picker, picking another player reruns the page
+@page_section('player_picker')
+def player_picker(players_df, rankings):
+    """Search, sort and select a player, the selection is kept in st.session_state['player_name']"""
+    st.header("🔍 Player Selection")
+    
+    # Search/filter options
+    search_term = st.text_input("Search player name", "", key='player_search')
+    
+    # Filter players based on search: accent-insensitive prefix matches first, then fuzzy matches, best first
+    # (every match is listed, only among players with stored games since there is nothing to show for the others)
+    if search_term:
+        matches = get_search_index().search(search_term, limit=None, allowed_ids=players_df['PLAYER_ID'])
+        positions = pd.Index(players_df['PLAYER_ID']).get_indexer(matches)
+        filtered_players = players_df.iloc[positions[positions >= 0]]
+    else:
+        filtered_players = players_df
     
-    if players_df.empty:
-        st.error("No player data found. Please run the data pipeline first.")
+    if filtered_players.empty:
+        st.warning(f"No players match '{search_term}'")
         return
     
-    # Sidebar - Player selection and filters
-    with st.sidebar:
-        st.header("🔍 Player Selection")
-        
-        # Search/filter options
-        search_term = st.text_input("Search player name", "")
-        
-        # Filter players based on search
-        if search_term:
-            filtered_players = players_df[
-                players_df['PLAYER_NAME'].str.contains(search_term, case=False, na=False)
-            ]
+    # Sort options
+    sort_by = st.selectbox(
+        "Sort by",
+        ["Name (A-Z)", "PPG (High to Low)", "RPG (High to Low)", "APG (High to Low)"],
+        key='player_sort'
+    )
+    
+    # players come back sorted by name (by relevance while searching), stat orders are precomputed with the rankings
+    sort_stats = {"PPG (High to Low)": 'PPG', "RPG (High to Low)": 'RPG', "APG (High to Low)": 'APG'}
+    if sort_by in sort_stats:
+        positions = pd.Index(filtered_players['PLAYER_ID']).get_indexer(rankings.order(sort_stats[sort_by]))
+        filtered_players = filtered_players.iloc[positions[positions >= 0]]
+    
+    # Player selection, the shown player stays selected while they're still in the filtered list
+    options = filtered_players['PLAYER_NAME'].tolist()
+    current = st.session_state.get('player_name')
+    player_name = st.selectbox(
+        "Select Player",
+        options=options,
+        index=options.index(current) if current in options else 0
+    )
+    
+    st.markdown("---")
+    
+    # Display count
+    st.caption(f"Showing {len(filtered_players)} of {len(players_df)} players")
+    
+    # a new player needs the whole page: during a full run the page below renders them anyway, after a fragment rerun ask for one
+    if player_name != current:
+        st.session_state['player_name'] = player_name
+        if not st.session_state.get('full_run'):
+            st.rerun()
+
+def sidebar_details():
+    """Read path, cache and latency details under the player picker"""
+    # Read path details: pool usage (used to size DB_POOL_SIZE) or the snapshot being served
+    if DASHBOARD_BACKEND == 'snapshot':
+        st.caption(f"Serving snapshot {get_snapshot_reader().version}")
+    else:
+        with st.expander("Connection pool"):
+            st.json(get_pool().stats())
+    
+    with st.expander("Cache"):
+        st.json({'data_versions': get_version_poller().current(), **get_cache().stats(), 'warmer': get_warmer().stats()})
+    
+    # database/snapshot time per dashboard section since the server started (cache hits don't query, so they aren't counted)
+    with st.expander("Query latency"):
+        latency = metrics.summary('dashboard_query_seconds')
+        if latency:
+            st.dataframe(pd.DataFrame(latency), use_container_width=True, hide_index=True)
         else:
-            filtered_players = players_df
-        
-        # Sort options
-        sort_by = st.selectbox(
-            "Sort by",
-            ["Name (A-Z)", "PPG (High to Low)", "RPG (High to Low)", "APG (High to Low)"]
-        )
-        
-        if sort_by == "Name (A-Z)":
-            filtered_players = filtered_players.sort_values('PLAYER_NAME')
-        elif sort_by == "PPG (High to Low)":
-            filtered_players = filtered_players.sort_values('PPG', ascending=False)
-        elif sort_by == "RPG (High to Low)":
-            filtered_players = filtered_players.sort_values('RPG', ascending=False)
-        elif sort_by == "APG (High to Low)":
-            filtered_players = filtered_players.sort_values('APG', ascending=False)
-        
-        # Player selection
-        player_name = st.selectbox(
-            "Select Player",
-            options=filtered_players['PLAYER_NAME'].tolist(),
-            index=0
-        )
-        
-        st.markdown("---")
-        
-        # Display count
-        st.caption(f"Showing {len(filtered_players)} of {len(players_df)} players")
+            st.caption("No queries run yet")
     
-    # Get selected player data
-    player_career = players_df[players_df['PLAYER_NAME'] == player_name].iloc[0]
-    player_id = int(player_career['PLAYER_ID'])
-    player_meta = get_player_metadata(player_id)
+    # server time per page section, a widget inside a section only reruns that section
+    with st.expander("Section render time"):
+        render = metrics.summary('dashboard_section_seconds')
+        if render:
+            st.dataframe(pd.DataFrame(render), use_container_width=True, hide_index=True)
+        else:
+            st.caption("No sections rendered yet")
+
+@page_section('overview', fragment=False)
+def render_overview(player_id, player_name, player_career, bundle, rankings):
+    """Player bio, career averages and shooting with league percentile badges"""
+    player_meta = bundle.metadata if bundle is not None else None
     
     # ========================================
     # SECTION 1: PLAYER OVERVIEW
@@ -319,40 +313,45 @@ def main():
                 st.write(f"**College:** {player_meta['SCHOOL']}")
             st.write(f"**Seasons:** {player_career['SEASONS']}")
     
+    # League percentile badges (career, qualified players only)
+    def badge(stat):
+        return percentile_badge(rankings.percentile(player_id, stat))
+    
     with col3:
         st.metric("Games Played", f"{player_career['GP']}")
-        st.metric("Minutes Per Game", f"{player_career['MPG']:.1f}")
+        st.metric("Minutes Per Game", f"{player_career['MPG']:.1f}", delta=badge('MPG'), delta_color="off")
     
     # Career averages
     st.subheader("Career Averages")
     
     col1, col2, col3, col4, col5 = st.columns(5)
-    col1.metric("PPG", f"{player_career['PPG']:.1f}")
-    col2.metric("RPG", f"{player_career['RPG']:.1f}")
-    col3.metric("APG", f"{player_career['APG']:.1f}")
-    col4.metric("SPG", f"{player_career['SPG']:.1f}")
-    col5.metric("BPG", f"{player_career['BPG']:.1f}")
+    col1.metric("PPG", f"{player_career['PPG']:.1f}", delta=badge('PPG'), delta_color="off")
+    col2.metric("RPG", f"{player_career['RPG']:.1f}", delta=badge('RPG'), delta_color="off")
+    col3.metric("APG", f"{player_career['APG']:.1f}", delta=badge('APG'), delta_color="off")
+    col4.metric("SPG", f"{player_career['SPG']:.1f}", delta=badge('SPG'), delta_color="off")
+    col5.metric("BPG", f"{player_career['BPG']:.1f}", delta=badge('BPG'), delta_color="off")
     
     # Shooting percentages
     st.subheader("Career Shooting")
     col1, col2, col3, col4, col5 = st.columns(5)
-    col1.metric("FG%", f"{player_career['FG_PCT']:.1%}" if pd.notna(player_career['FG_PCT']) else "N/A")
-    col2.metric("3P%", f"{player_career['FG3_PCT']:.1%}" if pd.notna(player_career['FG3_PCT']) else "N/A")
-    col3.metric("FT%", f"{player_career['FT_PCT']:.1%}" if pd.notna(player_career['FT_PCT']) else "N/A")
-    col4.metric("TS%", f"{player_career['TS_PCT']:.1%}" if pd.notna(player_career['TS_PCT']) else "N/A")
-    col5.metric("eFG%", f"{player_career['EFG_PCT']:.1%}" if pd.notna(player_career['EFG_PCT']) else "N/A")
-    
-    st.markdown("---")
-    
+    col1.metric("FG%", f"{player_career['FG_PCT']:.1%}" if pd.notna(player_career['FG_PCT']) else "N/A", delta=badge('FG_PCT'), delta_color="off")
+    col2.metric("3P%", f"{player_career['FG3_PCT']:.1%}" if pd.notna(player_career['FG3_PCT']) else "N/A", delta=badge('FG3_PCT'), delta_color="off")
+    col3.metric("FT%", f"{player_career['FT_PCT']:.1%}" if pd.notna(player_career['FT_PCT']) else "N/A", delta=badge('FT_PCT'), delta_color="off")
+    col4.metric("TS%", f"{player_career['TS_PCT']:.1%}" if pd.notna(player_career['TS_PCT']) else "N/A", delta=badge('TS_PCT'), delta_color="off")
+    col5.metric("eFG%", f"{player_career['EFG_PCT']:.1%}" if pd.notna(player_career['EFG_PCT']) else "N/A", delta=badge('EFG_PCT'), delta_color="off")
+
+@page_section('career_highs', fragment=False)
+def render_career_highs(bundle):
+    """Career highs and best games"""
     # ========================================
     # SECTION 2: CAREER HIGHS
     # ========================================
     st.header("🔥 Career Highs")
     
-    career_highs = get_career_highs(player_id)
+    career_highs = bundle.career_highs if bundle is not None else None
     
     if career_highs is not None:
-        col1, col2, col3, col4, col5, col6 = st.columns(6)
+        col1, col2, col3, col4, col5, col6, col7 = st.columns(7)
         
         col1.metric("Points", f"{int(career_highs['CAREER_HIGH_PTS'])}")
         col2.metric("Rebounds", f"{int(career_highs['CAREER_HIGH_REB'])}")
@@ -360,24 +359,40 @@ def main():
         col4.metric("Steals", f"{int(career_highs['CAREER_HIGH_STL'])}")
         col5.metric("Blocks", f"{int(career_highs['CAREER_HIGH_BLK'])}")
         col6.metric("3-Pointers", f"{int(career_highs['CAREER_HIGH_3PM'])}")
+        col7.metric("Game Score", f"{career_highs['CAREER_HIGH_GMSCORE']:.1f}")
+
+        # Shooting and usage highs only count games with real volume
+        col1, col2, col3 = st.columns(3)
+        ts_high, efg_high, usg_high = (career_highs[c] for c in ['CAREER_HIGH_TS_PCT', 'CAREER_HIGH_EFG_PCT', 'CAREER_HIGH_USG_PER_36'])
+        col1.metric(f"TS% ({MIN_HIGH_TSA}+ shot attempts)", f"{ts_high:.1%}" if pd.notna(ts_high) else "N/A")
+        col2.metric(f"eFG% ({MIN_HIGH_FGA}+ FGA)", f"{efg_high:.1%}" if pd.notna(efg_high) else "N/A")
+        col3.metric(f"Usage per 36 ({MIN_HIGH_MIN}+ min)", f"{usg_high:.1f}" if pd.notna(usg_high) else "N/A")
+        
+        # Best games by the stored Game Score
+        with st.expander("Best games (Game Score)"):
+            best_games = bundle.best_games.copy()
+            best_games['GAME_DATE'] = best_games['GAME_DATE'].dt.strftime('%Y-%m-%d')
+            st.dataframe(best_games, use_container_width=True, hide_index=True)
     else:
         st.info("No career high data available")
-    
-    st.markdown("---")
-    
+
+@page_section('seasons')
+def season_section(bundle):
+    """Season-by-season table and the selected trend chart"""
     # ========================================
     # SECTION 3: SEASON-BY-SEASON STATS
     # ========================================
     st.header("📅 Season-by-Season Stats")
     
-    season_df = get_player_seasons(player_id)
+    season_df = bundle.seasons if bundle is not None else pd.DataFrame()
     
     if not season_df.empty:
         # Display table
         st.dataframe(
             season_df[[
                 'SEASON_ID', 'GP', 'MPG', 'PPG', 'RPG', 'APG', 
-                'SPG', 'BPG', 'FG_PCT', 'FG3_PCT', 'FT_PCT'
+                'SPG', 'BPG', 'FG_PCT', 'FG3_PCT', 'FT_PCT',
+                'TS_PCT', 'EFG_PCT', 'GMSC', 'USG_PER_36'
             ]],
             use_container_width=True,
             hide_index=True
@@ -386,13 +401,13 @@ def main():
         # Trend charts
         st.subheader("Performance Trends")
         
-        trend_data = get_season_trend(player_id)
+        trend_data = bundle.season_trend()
         
         if not trend_data.empty and len(trend_data) > 1:
-            # Create tabs for different charts
-            tab1, tab2, tab3 = st.tabs(["Scoring", "All Stats", "Shooting %"])
+            # Only the selected chart is built (tabs would build all three on every run)
+            trend_view = st.radio("View", ["Scoring", "All Stats", "Shooting %"], horizontal=True, label_visibility="collapsed", key='trend_view')
             
-            with tab1:
+            if trend_view == "Scoring":
                 fig = px.line(
                     trend_data,
                     x='SEASON_ID',
@@ -403,7 +418,7 @@ def main():
                 fig.update_layout(xaxis_title="Season", yaxis_title="PPG")
                 st.plotly_chart(fig, use_container_width=True)
             
-            with tab2:
+            elif trend_view == "All Stats":
                 fig = go.Figure()
                 fig.add_trace(go.Scatter(x=trend_data['SEASON_ID'], y=trend_data['PPG'], 
                                         mode='lines+markers', name='PPG'))
@@ -419,7 +434,7 @@ def main():
                 )
                 st.plotly_chart(fig, use_container_width=True)
             
-            with tab3:
+            elif trend_view == "Shooting %":
                 fig = go.Figure()
                 fig.add_trace(go.Scatter(x=trend_data['SEASON_ID'], y=trend_data['FG_PCT']*100, 
                                         mode='lines+markers', name='FG%'))
@@ -436,16 +451,17 @@ def main():
                 st.plotly_chart(fig, use_container_width=True)
     else:
         st.info("No season data available")
-    
-    st.markdown("---")
-    
+
+@page_section('recent_games')
+def recent_games_section(bundle):
+    """Last N games table, scoring chart and averages"""
     # ========================================
     # SECTION 4: RECENT GAMES
     # ========================================
     st.header("🎯 Recent Games")
     
-    num_games = st.slider("Number of games to show", 5, 20, 10)
-    recent_games = get_recent_games(player_id, num_games)
+    num_games = st.slider("Number of games to show", 5, 20, 10, key='recent_games_count')
+    recent_games = bundle.recent_games(num_games) if bundle is not None else pd.DataFrame()
     
     if not recent_games.empty:
         # Format the dataframe for display
@@ -460,7 +476,7 @@ def main():
         st.dataframe(
             display_df[[
                 'GAME_DATE', 'MATCHUP', 'WL', 'MIN', 'PTS', 'REB', 'AST', 
-                'STL', 'BLK', 'FG_PCT', 'FG3_PCT', 'PLUS_MINUS'
+                'STL', 'BLK', 'FG_PCT', 'FG3_PCT', 'TS_PCT', 'PLUS_MINUS', 'GAME_SCORE'
             ]],
             use_container_width=True,
             hide_index=True
@@ -489,18 +505,19 @@ def main():
         col5.metric("+/-", f"{recent_games['PLUS_MINUS'].mean():.1f}")
     else:
         st.info("No recent game data available")
-    
-    st.markdown("---")
-    
+
+@page_section('splits')
+def splits_section(bundle, player_id):
+    """The selected split view"""
     # ========================================
     # SECTION 5: SPLITS
     # ========================================
     st.header("📊 Splits Analysis")
     
-    tab1, tab2 = st.tabs(["Home vs Away", "Wins vs Losses"])
+    splits_view = st.radio("View", ["Home vs Away", "Wins vs Losses", "Custom Splits", "vs Opponents"], horizontal=True, label_visibility="collapsed", key='splits_view')
     
-    with tab1:
-        home_away = get_home_away_splits(player_id)
+    if splits_view == "Home vs Away":
+        home_away = bundle.home_away if bundle is not None else pd.DataFrame()
         
         if not home_away.empty:
             col1, col2 = st.columns(2)
@@ -522,8 +539,8 @@ def main():
         else:
             st.info("No home/away split data available")
     
-    with tab2:
-        win_loss = get_win_loss_splits(player_id)
+    elif splits_view == "Wins vs Losses":
+        win_loss = bundle.win_loss if bundle is not None else pd.DataFrame()
         
         if not win_loss.empty:
             col1, col2 = st.columns(2)
@@ -546,9 +563,219 @@ def main():
         else:
             st.info("No win/loss split data available")
     
+    elif splits_view == "Custom Splits":
+        # every split here is computed from the player's cached game logs, loaded once when this view is first opened,
+        # so changing the selection never hits the database
+        dimensions = st.multiselect(
+            "Split by",
+            options=list(SPLIT_DIMENSIONS),
+            default=['OPPONENT', 'REST_DAYS'],
+            format_func=lambda d: d.replace('_', ' ').title()
+        )
+        
+        game_logs = get_player_game_logs(player_id) if dimensions else pd.DataFrame()
+        
+        if not game_logs.empty:
+            for dimension, split_df in compute_splits(game_logs, dimensions).items():
+                st.subheader(dimension.replace('_', ' ').title())
+                col1, col2 = st.columns(2)
+                
+                with col1:
+                    st.dataframe(split_df, use_container_width=True, hide_index=True)
+                
+                with col2:
+                    fig = px.bar(split_df, x='SPLIT', y='PPG', title=f"Points Per Game by {dimension.replace('_', ' ').title()}")
+                    st.plotly_chart(fig, use_container_width=True)
+        else:
+            st.info("Pick one or more split dimensions")
+    
+    elif splits_view == "vs Opponents":
+        # rolled up from the matchup cube, so any season or home/away breakdown is one indexed query
+        col1, col2 = st.columns(2)
+        player_seasons = bundle.seasons['SEASON_ID'].tolist() if bundle is not None else []
+        opponent_season = col1.selectbox("Season", [None] + player_seasons, format_func=lambda s: 'Career' if s is None else s, key='opponent_season')
+        by_location = col2.checkbox("Split home and away", key='opponent_by_location')
+        
+        opponent_df = get_opponent_splits(player_id, opponent_season, by_location)
+        
+        if not opponent_df.empty:
+            col1, col2 = st.columns(2)
+            
+            with col1:
+                st.dataframe(opponent_df, use_container_width=True, hide_index=True)
+            
+            with col2:
+                fig = px.bar(
+                    opponent_df,
+                    x='OPPONENT',
+                    y='PPG',
+                    color='HOME_AWAY' if by_location else None,
+                    barmode='group',
+                    title='Points Per Game by Opponent'
+                )
+                st.plotly_chart(fig, use_container_width=True)
+        else:
+            st.info("No opponent data available")
+
+@page_section('form')
+def form_section(player_id):
+    """Rolling averages, streaks and stretches of the player"""
+    # ========================================
+    # SECTION 6: FORM & STREAKS
+    # ========================================
+    st.header("📈 Form & Streaks")
+    
+    # everything here is sliced from the league-wide analytics computed once per data version
+    rolling = get_rolling()
+    
+    col1, col2 = st.columns([1, 3])
+    with col1:
+        rolling_stat = st.selectbox("Stat", ROLLING_STATS, format_func=STAT_LABELS.get, key='rolling_stat')
+    
+    form_df = rolling.player_rolling(player_id, rolling_stat)
+    
+    if not form_df.empty:
+        with col2:
+            fig = go.Figure()
+            fig.add_trace(go.Scatter(x=form_df['GAME_DATE'], y=form_df[rolling_stat], mode='markers',
+                                     name='Game', marker=dict(size=4, opacity=0.4)))
+            for window in ROLLING_WINDOWS:
+                fig.add_trace(go.Scatter(x=form_df['GAME_DATE'], y=form_df[f'AVG_{window}'], mode='lines', name=f'{window}-game avg'))
+            fig.update_layout(
+                title=f'{STAT_LABELS[rolling_stat]}: Rolling Averages',
+                xaxis_title='Game Date',
+                yaxis_title=STAT_LABELS[rolling_stat],
+                hovermode='x unified'
+            )
+            st.plotly_chart(fig, use_container_width=True)
+        
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            st.subheader("Streaks")
+            st.dataframe(rolling.player_streaks(player_id), use_container_width=True, hide_index=True)
+        
+        with col2:
+            st.subheader("Best & Worst Stretches")
+            stretch_window = st.select_slider("Games", options=list(STRETCH_WINDOWS), value=10, key='player_stretch_window')
+            st.dataframe(rolling.player_stretches(player_id, stretch_window), use_container_width=True, hide_index=True)
+    else:
+        st.info("No game log data available")
+
+@page_section('leaderboards')
+def leaderboards_section(players_df):
+    """League leaderboards for streaks, stretches and best vs. team"""
+    # ========================================
+    # SECTION 7: LEADERBOARDS
+    # ========================================
+    st.header("🏆 Leaderboards")
+    
+    rolling = get_rolling()
+    
+    player_names = dict(zip(players_df['PLAYER_ID'], players_df['PLAYER_NAME']))
+    
+    def with_names(leaders_df):
+        leaders_df.insert(0, 'PLAYER_NAME', leaders_df['PLAYER_ID'].map(player_names))
+        return leaders_df.drop(columns='PLAYER_ID')
+    
+    scope = st.selectbox("Scope", [CAREER] + rolling.seasons, format_func=lambda s: 'Career' if s == CAREER else s, key='leaderboard_scope')
+    
+    leaderboard_view = st.radio("View", ["Streaks", "Best Stretches", "Best vs. Team"], horizontal=True, label_visibility="collapsed", key='leaderboard_view')
+    
+    if leaderboard_view == "Streaks":
+        col1, col2, col3 = st.columns(3)
+        streak_stat = col1.selectbox("Stat", list(STREAK_THRESHOLDS), format_func=STAT_LABELS.get, key='streak_stat')
+        threshold = col2.selectbox("At least", STREAK_THRESHOLDS[streak_stat], key='streak_threshold')
+        active = col3.checkbox("Active streaks only (career)", key='streak_active')
+        
+        st.dataframe(
+            with_names(rolling.streak_leaders(streak_stat, threshold, 10, scope, active)),
+            use_container_width=True,
+            hide_index=True
+        )
+    
+    elif leaderboard_view == "Best Stretches":
+        col1, col2 = st.columns(2)
+        stretch_stat = col1.selectbox("Stat", ROLLING_STATS, format_func=STAT_LABELS.get, key='stretch_stat')
+        stretch_window = col2.select_slider("Games", options=list(STRETCH_WINDOWS), value=10, key='leaderboard_stretch_window')
+        
+        st.dataframe(
+            with_names(rolling.stretch_leaders(stretch_stat, stretch_window, 10, scope)),
+            use_container_width=True,
+            hide_index=True
+        )
+    
+    elif leaderboard_view == "Best vs. Team":
+        col1, col2, col3 = st.columns(3)
+        opponents = get_opponents()
+        opponent = col1.selectbox("Opponent", opponents, key='best_vs_team_opponent')
+        team_stat = col2.selectbox("Stat", LEADERBOARD_STATS, key='best_vs_team_stat')
+        min_games = col3.number_input("Minimum games", min_value=1, max_value=50, value=3, key='best_vs_team_min_games')
+        
+        if opponent is not None:
+            st.dataframe(
+                with_names(get_best_vs_team(opponent, team_stat, None if scope == CAREER else scope, int(min_games)).copy()),
+                use_container_width=True,
+                hide_index=True
+            )
+        else:
+            st.info("No opponent data available")
+
+# Main app
+def main():
+    # Header
+    st.markdown('<h1 class="main-header">🏀 NBA Player Stats Dashboard</h1>', unsafe_allow_html=True)
+    
+    # Warm the cache on the first run after startup and after every data version change (no-op otherwise)
+    get_warmer().maybe_warm(get_version_poller().current())
+    
+    # Load all players
+    players_df = get_all_players()
+    
+    if players_df.empty:
+        st.error("No player data found. Please run the data pipeline first.")
+        return
+    
+    rankings = get_rankings()
+    
+    # Sidebar - Player selection and filters (full_run tells the picker this run renders the whole page)
+    with st.sidebar:
+        st.session_state['full_run'] = True
+        try:
+            player_picker(players_df, rankings)
+        finally:
+            st.session_state['full_run'] = False
+        sidebar_details()
+    
+    # Get selected player data
+    player_name = st.session_state.get('player_name')
+    if player_name is None:
+        return
+    player_career = players_df[players_df['PLAYER_NAME'] == player_name].iloc[0]
+    player_id = int(player_career['PLAYER_ID'])
+    get_hit_counter().record(player_id)
+    bundle = get_player_bundle(player_id)
+    
+    # Sections, only the selected view of each tabbed section is built
+    render_overview(player_id, player_name, player_career, bundle, rankings)
+    st.markdown("---")
+    render_career_highs(bundle)
+    st.markdown("---")
+    season_section(bundle)
+    st.markdown("---")
+    recent_games_section(bundle)
+    st.markdown("---")
+    splits_section(bundle, player_id)
+    st.markdown("---")
+    form_section(player_id)
+    st.markdown("---")
+    leaderboards_section(players_df)
+    
     # Footer
     st.markdown("---")
     st.caption(f"Data last updated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    if bundle is not None:
+        st.caption(f"Player data loaded in {bundle.load_ms:.0f} ms")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
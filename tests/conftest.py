@@ -0,0 +1,7 @@
+### SHARED TEST SETUP: THE SCRIPTS IN src IMPORT EACH OTHER BY NAME, SO THE TESTS IMPORT THEM THE SAME WAY
+## Usage (from the repo root): python -m pytest -q
+## Import libraries
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
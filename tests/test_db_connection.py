@@ -0,0 +1,108 @@
+### TESTS FOR THE CONNECTION POOL IN db_connection.py, ON FAKE CONNECTIONS (NO DATABASE NEEDED)
+## Import libraries
+import threading
+import time
+import pytest
+from db_connection import ConnectionPool
+
+## A connection that can be made to drop, or to fail its reconnect and rollback
+class FakeConnection:
+    def __init__(self, number):
+        self.number = number
+        self.connected = True
+        self.broken = False
+
+    def is_connected(self):
+        return self.connected
+
+    def reconnect(self, attempts=1, delay=0):
+        if self.broken:
+            raise OSError('server gone')
+        self.connected = True
+
+    def rollback(self):
+        if self.broken:
+            raise OSError('server gone')
+
+## Define a function to build a pool whose connections are numbered in the order they were opened
+def make_pool(size, timeout=5):
+    opened = []
+
+    def connect():
+        opened.append(FakeConnection(len(opened)))
+        return opened[-1]
+
+    return ConnectionPool(size=size, timeout=timeout, connect=connect), opened
+
+def test_caller_times_out_when_every_connection_is_checked_out():
+    pool, opened = make_pool(size=2)
+    held = [pool.get_connection(), pool.get_connection()]
+
+    start = time.monotonic()
+    with pytest.raises(TimeoutError):
+        pool.get_connection(timeout=0.2)
+    assert time.monotonic() - start >= 0.2
+    assert len(opened) == 2 and pool.stats()['timeouts'] == 1
+
+    for conn in held:
+        pool.release(conn)
+
+def test_waiter_gets_the_connection_released_while_it_waits():
+    pool, opened = make_pool(size=1)
+    conn = pool.get_connection()
+    got = []
+
+    waiter = threading.Thread(target=lambda: got.append(pool.get_connection(timeout=5)))
+    waiter.start()
+    time.sleep(0.1)
+    pool.release(conn)
+    waiter.join(timeout=2)
+
+    assert got == [conn] and len(opened) == 1
+
+def test_connection_failing_its_health_check_is_replaced():
+    pool, opened = make_pool(size=1)
+    conn = pool.get_connection()
+    pool.release(conn)
+
+    # the server dropped it and it can't reconnect: the checkout fails and gives the slot up
+    conn.connected, conn.broken = False, True
+    with pytest.raises(OSError):
+        pool.get_connection()
+    assert pool.stats()['open'] == 0
+
+    fresh = pool.get_connection(timeout=0.5)
+    assert fresh is opened[1] and fresh.is_connected()
+
+def test_dropped_connection_is_reconnected_in_place():
+    pool, opened = make_pool(size=1)
+    conn = pool.get_connection()
+    pool.release(conn)
+
+    conn.connected = False
+    assert pool.get_connection() is conn
+    assert pool.stats()['reconnects'] == 1 and len(opened) == 1
+
+def test_broken_connection_frees_its_slot_on_release():
+    pool, opened = make_pool(size=1)
+    conn = pool.get_connection()
+    conn.broken = True
+    pool.release(conn)
+
+    assert pool.get_connection(timeout=0.5) is opened[1]
+
+def test_connection_is_returned_when_the_body_raises():
+    pool, opened = make_pool(size=1)
+
+    with pytest.raises(ValueError):
+        with pool.connection() as conn:
+            raise ValueError('query failed')
+
+    assert pool.stats()['in_use'] == 0
+    assert pool.get_connection(timeout=0.5) is conn and len(opened) == 1
+
+def test_failed_connect_frees_its_slot():
+    pool = ConnectionPool(size=1, timeout=0.5, connect=lambda: None)
+    with pytest.raises(ConnectionError):
+        pool.get_connection()
+    assert pool.stats()['open'] == 0
@@ -0,0 +1,90 @@
+### TESTS FOR THE INSERT PATHS IN db_insert.py: A FAILED CONNECTION OR LOAD NEVER LEAKS A CONNECTION OR HALF A TRANSACTION,
+### AND THE DATA VERSION IS ONLY BUMPED WHEN ROWS WERE WRITTEN
+## Import libraries
+from contextlib import contextmanager
+import pandas as pd
+import pytest
+import db_insert
+
+## A connection that records what was done to it
+class FakeConnection:
+    def __init__(self, rowcount=0):
+        self.calls = []
+        self.rowcount = rowcount
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def commit(self):
+        self.calls.append('commit')
+
+    def rollback(self):
+        self.calls.append('rollback')
+
+    def close(self):
+        self.calls.append('close')
+
+class FakeCursor:
+    def __init__(self, conn):
+        self.conn = conn
+        self.rowcount = -1
+
+    def executemany(self, operation, data):
+        self.conn.calls.append('executemany')
+        self.rowcount = self.conn.rowcount
+
+    def close(self):
+        self.conn.calls.append('cursor_close')
+
+@pytest.fixture
+def changed(monkeypatch):
+    df = pd.DataFrame({'PLAYER_ID': [1], 'GAME_ID': ['0022400001']})
+    monkeypatch.setattr(db_insert, 'changed_rows', lambda df, table, columns: (df, None))
+    return df
+
+def test_load_data_raises_when_the_connection_fails(monkeypatch, changed):
+    monkeypatch.setattr(db_insert, 'connect_to_db', lambda allow_local_infile: None)
+    with pytest.raises(ConnectionError):
+        db_insert.insert_gamelogs(changed, mode='load_data')
+
+def test_failed_load_rolls_back_and_closes(monkeypatch, changed):
+    conn = FakeConnection()
+    monkeypatch.setattr(db_insert, 'connect_to_db', lambda allow_local_infile: conn)
+
+    def failing_load(cursor, *args):
+        raise RuntimeError('load failed')
+    monkeypatch.setattr(db_insert, 'load_data_infile', failing_load)
+
+    with pytest.raises(RuntimeError, match='load failed'):
+        db_insert.insert_gamelogs(changed, mode='load_data')
+    assert conn.calls == ['rollback', 'cursor_close', 'close']
+
+def test_failed_aggregate_refresh_rolls_back_and_closes(monkeypatch, changed):
+    conn = FakeConnection()
+    monkeypatch.setattr(db_insert, 'connect_to_db', lambda allow_local_infile: conn)
+    monkeypatch.setattr(db_insert, 'load_data_infile', lambda cursor, *args: None)
+    monkeypatch.setattr(db_insert, 'update_watermarks', lambda cursor, df: None)
+    monkeypatch.setattr(db_insert, 'touched_groups', lambda df: [])
+
+    def failing_refresh(cursor, groups):
+        raise RuntimeError('refresh failed')
+    monkeypatch.setattr(db_insert, 'refresh_season_aggregates', failing_refresh)
+
+    with pytest.raises(RuntimeError, match='refresh failed'):
+        db_insert.insert_gamelogs(changed, mode='load_data')
+    assert conn.calls == ['rollback', 'cursor_close', 'close']
+
+@pytest.mark.parametrize('added, bumped', [(0, False), (2, True)])
+def test_missing_players_bump_the_metadata_version_only_when_rows_are_added(monkeypatch, added, bumped):
+    conn = FakeConnection(rowcount=added)
+
+    @contextmanager
+    def fake_pooled_connection():
+        yield conn
+    monkeypatch.setattr(db_insert, 'pooled_connection', fake_pooled_connection)
+    monkeypatch.setattr(db_insert, 'bump_data_version', lambda cursor, name: conn.calls.append(f'bump {name}'))
+
+    db_insert.insert_missing_players(pd.DataFrame({'PLAYER_ID': [1, 2, 2], 'PLAYER_NAME': ['A', 'B', 'B']}))
+
+    expected = ['executemany'] + ([f'bump {db_insert.METADATA}'] if bumped else []) + ['commit', 'cursor_close']
+    assert conn.calls == expected
@@ -0,0 +1,126 @@
+### TESTS FOR fetch_engine.fetch_all WITH A FAKE fetch_fn IN PLACE OF THE NBA API
+## Import libraries
+import threading
+import time
+import pytest
+from fetch_engine import fetch_all, TokenBucket
+from metrics import metrics
+
+## Define a limiter that never waits but counts how many tokens were taken
+class CountingLimiter:
+
+    def __init__(self):
+        self.acquired = 0
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        with self.lock:
+            self.acquired += 1
+
+@pytest.fixture(autouse=True)
+def reset_metrics():
+    metrics.reset()
+    yield
+    metrics.reset()
+
+## Define a fetch_fn that fails the first attempts at some items and always fails others
+def flaky_fetch(fail_once=(), fail_always=()):
+    attempts = {}
+    lock = threading.Lock()
+
+    def fetch(item):
+        with lock:
+            attempts[item] = attempts.get(item, 0) + 1
+            attempt = attempts[item]
+        if item in fail_always or (item in fail_once and attempt == 1):
+            raise RuntimeError(f'boom {item}')
+        return item * 10
+
+    return fetch, attempts
+
+def test_results_come_back_in_item_order():
+    # later items finish first, so completion order is the reverse of item order
+    items = list(range(8))
+
+    def fetch(item):
+        time.sleep(0.01 * (len(items) - item))
+        return item * 10
+
+    results = fetch_all(items, fetch, max_workers=8, limiter=CountingLimiter())
+    assert results == [(i, i * 10, None) for i in items]
+
+def test_on_result_sees_every_item_with_its_index():
+    seen = []
+    results = fetch_all(['a', 'b', 'c'], str.upper, max_workers=2, limiter=CountingLimiter(),
+                        on_result=lambda i, item, result, error: seen.append((i, item, result, error)), collect=False)
+
+    assert results is None
+    assert sorted(seen) == [(0, 'a', 'A', None), (1, 'b', 'B', None), (2, 'c', 'C', None)]
+
+def test_failed_attempts_are_retried():
+    fetch, attempts = flaky_fetch(fail_once={2, 4})
+    limiter = CountingLimiter()
+    results = fetch_all(list(range(5)), fetch, retries=2, backoff=0, limiter=limiter, name='test')
+
+    assert results == [(i, i * 10, None) for i in range(5)]
+    assert attempts == {0: 1, 1: 1, 2: 2, 3: 1, 4: 2}
+    # every attempt, retries included, takes a token
+    assert limiter.acquired == 7
+    assert metrics.counter('api_retries_total', endpoint='test') == 2
+    assert metrics.counter('api_failures_total', endpoint='test') == 0
+
+def test_failures_are_reported_after_the_last_retry():
+    fetch, attempts = flaky_fetch(fail_always={1})
+    results = fetch_all([0, 1, 2], fetch, retries=2, backoff=0, limiter=CountingLimiter(), name='test')
+
+    assert [(item, result) for item, result, _ in results] == [(0, 0), (1, None), (2, 20)]
+    assert results[0][2] is None and results[2][2] is None
+    assert isinstance(results[1][2], RuntimeError) and str(results[1][2]) == 'boom 1'
+    assert attempts[1] == 3
+    assert metrics.counter('api_retries_total', endpoint='test') == 2
+    assert metrics.counter('api_failures_total', endpoint='test') == 1
+
+def test_no_retries_reports_the_first_failure():
+    fetch, attempts = flaky_fetch(fail_once={0})
+    results = fetch_all([0], fetch, retries=0, backoff=0, limiter=CountingLimiter(), name='test')
+
+    assert results[0][1] is None and isinstance(results[0][2], RuntimeError)
+    assert attempts == {0: 1}
+    assert metrics.counter('api_retries_total', endpoint='test') == 0
+
+def test_failing_callback_stops_the_run():
+    def callback(i, item, result, error):
+        raise KeyError(item)
+
+    with pytest.raises(KeyError):
+        fetch_all(list(range(20)), lambda item: item, max_workers=2, limiter=CountingLimiter(), on_result=callback)
+
+def test_requests_are_paced_by_the_token_bucket():
+    # 8 requests at 20/s with a burst of 1: the first goes straight away, each one after waits for its own token
+    rate = 20.0
+    starts = []
+    lock = threading.Lock()
+
+    def fetch(item):
+        with lock:
+            starts.append(time.monotonic())
+        return item
+
+    begin = time.monotonic()
+    fetch_all(list(range(8)), fetch, requests_per_second=rate, max_workers=4)
+    starts.sort()
+
+    assert starts[-1] - begin >= 7 / rate * 0.9
+    assert min(b - a for a, b in zip(starts, starts[1:])) >= 1 / rate * 0.8
+    assert metrics.summary('api_rate_limit_wait_seconds')[0]['count'] == 8
+
+def test_token_bucket_allows_its_burst_then_paces():
+    bucket = TokenBucket(requests_per_second=10, burst=3)
+
+    start = time.monotonic()
+    for _ in range(3):
+        bucket.acquire()
+    assert time.monotonic() - start < 0.05
+
+    bucket.acquire()
+    assert time.monotonic() - start >= 0.1 * 0.9
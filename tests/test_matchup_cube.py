@@ -0,0 +1,75 @@
+### TESTS FOR THE MATCHUP CUBE ROLLUP QUERIES IN matchup_cube.py
+## Import libraries
+import numpy as np
+import pytest
+from matchup_cube import rollup_query, sql_value, opponent_splits_query, best_vs_team_query, CUBE_STATS
+
+def test_sql_value_writes_player_ids_as_integers():
+    assert sql_value('PLAYER_ID', 2544) == '2544'
+    assert sql_value('PLAYER_ID', np.int64(2544)) == '2544'
+
+@pytest.mark.parametrize('value', ['2544', 2544.0, True, None])
+def test_sql_value_rejects_non_integer_player_ids(value):
+    with pytest.raises(ValueError, match='PLAYER_ID'):
+        sql_value('PLAYER_ID', value)
+
+def test_sql_value_quotes_codes():
+    assert sql_value('OPPONENT', 'BOS') == "'BOS'"
+    assert sql_value('SEASON_ID', 22024) == "'22024'"
+    assert sql_value('HOME_AWAY', 'HOME') == "'HOME'"
+
+@pytest.mark.parametrize('value', ["BOS' OR '1'='1", 'BOS;', 'B O S', 'BOS\\', '"BOS"'])
+def test_sql_value_rejects_other_text(value):
+    with pytest.raises(ValueError, match='OPPONENT'):
+        sql_value('OPPONENT', value)
+
+def test_unknown_dimensions_are_rejected():
+    with pytest.raises(ValueError, match='TEAM'):
+        rollup_query(['TEAM'])
+    with pytest.raises(ValueError, match='GAME_DATE'):
+        rollup_query(['OPPONENT'], {'GAME_DATE': '2024-01-01'})
+
+def test_unknown_order_by_is_rejected():
+    with pytest.raises(ValueError, match='POINTS'):
+        rollup_query(['PLAYER_ID'], order_by='POINTS')
+
+def test_empty_filter_list_is_rejected():
+    with pytest.raises(ValueError, match='Empty OPPONENT filter'):
+        rollup_query(['PLAYER_ID'], {'OPPONENT': []})
+
+def test_rollup_without_dimensions_or_filters_covers_the_whole_cube():
+    query = rollup_query()
+    assert query.splitlines()[1] == 'FROM PLAYER_MATCHUP_CUBE'
+    assert len(query.splitlines()) == 2
+    assert all(f'AS {stat}' in query for stat in CUBE_STATS)
+
+def test_rollup_renders_every_clause_in_order():
+    query = rollup_query(['PLAYER_ID'], {'OPPONENT': 'BOS', 'SEASON_ID': ['22023', '22024']}, min_games=3, order_by='PPG', limit=10)
+    lines = query.splitlines()
+
+    assert lines[0].startswith('SELECT PLAYER_ID, SUM(GP) AS GP, ')
+    assert lines[1:] == [
+        'FROM PLAYER_MATCHUP_CUBE',
+        "WHERE OPPONENT IN ('BOS') AND SEASON_ID IN ('22023', '22024')",
+        'GROUP BY PLAYER_ID',
+        'HAVING SUM(GP) >= 3',
+        'ORDER BY PPG DESC, PLAYER_ID',
+        'LIMIT 10'
+    ]
+
+def test_rollup_leaves_out_zero_min_games_and_limit():
+    query = rollup_query(['OPPONENT', 'HOME_AWAY'], {'PLAYER_ID': 2544})
+    assert query.splitlines()[2:] == ['WHERE PLAYER_ID IN (2544)', 'GROUP BY OPPONENT, HOME_AWAY', 'ORDER BY OPPONENT, HOME_AWAY']
+    assert 'HAVING' not in query and 'LIMIT' not in query
+
+def test_player_id_filter_values_go_through_sql_value():
+    with pytest.raises(ValueError, match='PLAYER_ID'):
+        rollup_query(['OPPONENT'], {'PLAYER_ID': '2544 OR 1=1'})
+
+def test_opponent_splits_and_best_vs_team_queries():
+    assert 'GROUP BY OPPONENT, HOME_AWAY' in opponent_splits_query(2544, by_location=True)
+    assert "WHERE PLAYER_ID IN (2544) AND SEASON_ID IN ('22024')" in opponent_splits_query(2544, '22024')
+
+    query = best_vs_team_query('BOS', 'TS_PCT', min_games=5, limit=3)
+    assert query.splitlines()[2:] == ["WHERE OPPONENT IN ('BOS')", 'GROUP BY PLAYER_ID', 'HAVING SUM(GP) >= 5',
+                                      'ORDER BY TS_PCT DESC, PLAYER_ID', 'LIMIT 3']
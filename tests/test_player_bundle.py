@@ -0,0 +1,59 @@
+### TESTS FOR THE PLAYER BUNDLE'S MYSQL READ PATH: EVERY PAGE QUERY GOES OUT IN ONE MULTI-STATEMENT CALL
+## Import libraries
+import pandas as pd
+from dashboard_queries import PLAYER_PAGE_QUERIES
+from player_bundle import fetch_result_sets, load_player_bundle
+
+## A cursor that records each execute and serves one result set per statement, like mysql.connector's
+class FakeCursor:
+    def __init__(self, executed):
+        self.executed = executed
+        self.result_sets = []
+        self.closed = False
+
+    def execute(self, operation):
+        self.executed.append(operation)
+        self.result_sets = [([(i, f'row {i}')], ('N', 'LABEL')) for i, _ in enumerate(operation.split(';\n'))]
+
+    def fetchall(self):
+        return self.result_sets[0][0]
+
+    @property
+    def column_names(self):
+        return self.result_sets[0][1]
+
+    def nextset(self):
+        self.result_sets.pop(0)
+        return bool(self.result_sets) or None
+
+    def close(self):
+        self.closed = True
+
+class FakeConnection:
+    def __init__(self):
+        self.executed = []
+        self.cursors = []
+
+    def cursor(self):
+        self.cursors.append(FakeCursor(self.executed))
+        return self.cursors[-1]
+
+def test_queries_are_sent_in_one_call_and_read_back_in_order():
+    conn = FakeConnection()
+    frames = fetch_result_sets(conn, ['SELECT 0', 'SELECT 1', 'SELECT 2'])
+
+    assert conn.executed == ['SELECT 0;\nSELECT 1;\nSELECT 2']
+    assert [frame['N'].tolist() for frame in frames] == [[0], [1], [2]]
+    assert list(frames[0].columns) == ['N', 'LABEL']
+    assert conn.cursors[0].closed
+
+def test_bundle_is_loaded_in_one_call():
+    calls = []
+
+    def run_queries(queries):
+        calls.append(queries)
+        return [pd.DataFrame() for _ in queries]
+
+    assert load_player_bundle(2544, run_queries=run_queries) is None
+    assert len(calls) == 1 and len(calls[0]) == len(PLAYER_PAGE_QUERIES)
+    assert all('2544' in query for query in calls[0])
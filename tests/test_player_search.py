@@ -0,0 +1,61 @@
+### TESTS FOR THE SIDEBAR'S PLAYER SEARCH INDEX IN player_search.py
+## Import libraries
+import pandas as pd
+import pytest
+from player_search import PlayerSearchIndex, fold
+
+PLAYERS = pd.DataFrame({
+    'PLAYER_ID': [1, 2, 3, 4, 5, 6, 7],
+    'PLAYER_NAME': ['Nikola Jokić', 'Luka Dončić', 'Giannis Antetokounmpo', 'LeBron James', 'Nikola Vučević', 'Kristaps Porziņģis', 'Jonas Valančiūnas']
+})
+
+@pytest.fixture(scope='module')
+def index():
+    return PlayerSearchIndex(PLAYERS)
+
+def test_fold_drops_accents_case_and_punctuation():
+    assert fold('Kristaps Porziņģis') == 'kristaps porzingis'
+    assert fold("  D'Angelo Russell-Jr. ") == 'd angelo russell jr'
+    assert fold('Søren Łukasz') == 'soren lukasz'
+
+@pytest.mark.parametrize('query, expected', [
+    ('jokic', [1]),
+    ('JOKIC', [1]),
+    ('Jokić', [1]),
+    ('porzingis', [6]),
+    ('JONAS VALANČIŪNAS', [7])
+])
+def test_accents_and_case_are_folded(index, query, expected):
+    assert index.search(query) == expected
+
+@pytest.mark.parametrize('query, expected', [
+    ('n', [1, 5]),
+    ('lu', [2]),
+    # prefix matches are listed by name, Jonas before Nikola
+    ('jo', [7, 1]),
+    ('z', []),
+    ('xx', [])
+])
+def test_queries_under_three_characters_match_word_starts(index, query, expected):
+    assert index.search(query) == expected
+
+@pytest.mark.parametrize('query, expected_first', [
+    ('antetokoumpo', 3),
+    ('Giannis Antetokounpo', 3),
+    ('lebrn', 4),
+    ('nikola jokc', 1),
+    ('nikola vucevich', 5)
+])
+def test_misspellings_rank_the_right_player_first(index, query, expected_first):
+    assert index.search(query)[0] == expected_first
+
+@pytest.mark.parametrize('query', ['qqqqq', '', '  ', '!!'])
+def test_input_that_matches_nothing(index, query):
+    assert index.search(query) == []
+
+def test_every_typed_word_must_start_a_name_word(index):
+    assert index.search('nik jok') == [1]
+
+def test_allowed_ids_apply_before_the_limit(index):
+    assert index.search('nikola', limit=1) == [1]
+    assert index.search('nikola', limit=1, allowed_ids=[5]) == [5]
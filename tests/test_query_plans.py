@@ -0,0 +1,111 @@
+### TESTS THAT EVERY DASHBOARD QUERY IS SERVED BY AN INDEX: EXPLAIN ON MYSQL MUST SHOW NO FILESORT OR FULL SCAN
+## The EXPLAIN tests load seed players (seed_players.py), and are skipped when MySQL isn't reachable
+## Import libraries
+import pytest
+from dashboard_queries import LOADER_QUERIES, PLAYER_PAGE_QUERIES
+from db_connection import connect_to_db, pooled_connection
+from matchup_cube import opponent_splits_query, best_vs_team_query
+from seed_players import seed_database, remove_seed
+
+# loaders that read the whole league by design, and the plan problems that are expected for them
+ALLOWED_PROBLEMS = {
+    'get_all_players': {'full_scan', 'filesort'},
+    'get_rankings': {'full_scan'},
+    'get_data_version': {'full_scan'},
+    'get_search_index': {'full_scan'},
+    'get_rolling': {'full_scan'},
+    'get_rolling_fingerprint': {'full_scan'},
+    'get_opponents': {'full_scan'},
+    'get_best_vs_team': {'filesort'}
+}
+
+## Define a function to list the plan problems in one EXPLAIN output
+def plan_problems(plan):
+    problems = set()
+
+    for row in plan:
+        table = row['table'] or ''
+        extra = row['Extra'] or ''
+
+        if 'Using filesort' in extra:
+            problems.add('filesort')
+
+        # derived tables (<derived2>) are in-memory results of a view, only base tables count as scans
+        if row['type'] in ('ALL', 'index') and not table.startswith('<'):
+            problems.add('full_scan')
+
+    return problems
+
+## Define a function to build every query the dashboard runs, by name, for a sampled player, season and opponent
+def query_cases(params):
+    cases = {}
+    for name, template in {**LOADER_QUERIES, **PLAYER_PAGE_QUERIES}.items():
+        cases[name] = template.format(player_id=params['player_id'], num_games=10, season_filter='')
+    cases['monthly (season)'] = PLAYER_PAGE_QUERIES['monthly'].format(
+        player_id=params['player_id'], season_filter=f"AND SEASON_ID = '{params['season_id']}'"
+    )
+
+    # the matchup cube rollups the dashboard builds (matchup_cube.py)
+    cases['get_opponent_splits'] = opponent_splits_query(params['player_id'])
+    cases['get_best_vs_team'] = best_vs_team_query(params['opponent'])
+    cases['get_best_vs_team (season)'] = best_vs_team_query(params['opponent'], season_id=params['season_id'])
+    return cases
+
+CASE_NAMES = list(query_cases({'player_id': 0, 'season_id': '', 'opponent': ''}))
+
+## EXPLAIN rows in MySQL's layout, as returned by a dictionary cursor
+def explain_row(table, type_, extra=None):
+    return {'table': table, 'type': type_, 'key': None, 'Extra': extra}
+
+def test_index_lookups_have_no_problems():
+    plan = [explain_row('PLAYER_GAME_LOGS', 'ref', 'Using where; Backward index scan'), explain_row('PLAYER_METADATA', 'const')]
+    assert plan_problems(plan) == set()
+
+def test_filesort_is_flagged():
+    assert plan_problems([explain_row('PLAYER_GAME_LOGS', 'ref', 'Using where; Using filesort')]) == {'filesort'}
+
+def test_full_scan_of_a_base_table_is_flagged():
+    assert plan_problems([explain_row('PLAYER_GAME_LOGS', 'ALL', 'Using where')]) == {'full_scan'}
+    assert plan_problems([explain_row('PLAYER_SEASON_SUMMARY', 'index')]) == {'full_scan'}
+
+def test_scan_of_a_derived_table_is_ignored():
+    plan = [explain_row('<derived2>', 'ALL'), explain_row('PLAYER_SEASON_SUMMARY', 'ref')]
+    assert plan_problems(plan) == set()
+
+def test_every_dashboard_query_has_a_case():
+    assert set(LOADER_QUERIES) | set(PLAYER_PAGE_QUERIES) <= set(CASE_NAMES)
+
+@pytest.fixture(scope='module')
+def explain_params():
+    conn = connect_to_db()
+    if conn is None:
+        pytest.skip('MySQL is not reachable')
+    conn.close()
+
+    # seed players live in their own id range, so the plans are checked on a known amount of data and removed afterwards
+    seed_database(200, ['2022-23', '2023-24', '2024-25'], 60)
+    try:
+        with pooled_connection() as conn:
+            cursor = conn.cursor(dictionary=True)
+            cursor.execute('SELECT PLAYER_ID, SEASON_ID FROM PLAYER_SEASON_SUMMARY ORDER BY GP DESC LIMIT 1')
+            row = cursor.fetchone()
+            cursor.execute("SELECT OPPONENT FROM PLAYER_MATCHUP_CUBE WHERE PLAYER_ID = %s AND OPPONENT <> '' LIMIT 1", (row['PLAYER_ID'],))
+            opponent = cursor.fetchone()
+            cursor.close()
+
+        yield {'player_id': row['PLAYER_ID'], 'season_id': row['SEASON_ID'], 'opponent': opponent['OPPONENT'] if opponent else 'BOS'}
+    finally:
+        remove_seed()
+
+@pytest.mark.parametrize('name', CASE_NAMES)
+def test_query_is_served_by_an_index(explain_params, name):
+    with pooled_connection() as conn:
+        cursor = conn.cursor(dictionary=True)
+        cursor.execute(f'EXPLAIN {query_cases(explain_params)[name]}')
+        plan = cursor.fetchall()
+        cursor.close()
+
+    problems = plan_problems(plan) - ALLOWED_PROBLEMS.get(name.split(' ')[0], set())
+    assert not problems, f'{name}: {sorted(problems)} in ' + '; '.join(
+        f'table={row["table"]} type={row["type"]} key={row["key"]} extra={row["Extra"]}' for row in plan
+    )
@@ -0,0 +1,71 @@
+### TESTS FOR THE LEAGUE-WIDE RANKINGS IN rankings.py
+## Import libraries
+import numpy as np
+import pandas as pd
+from rankings import Rankings, SUM_COLS, SEASON_MIN_GAMES, CAREER, percentile_badge
+
+SEASON = '22023'
+
+## Define a function to build a one season summary frame from (player id, games, points) rows, every other sum zero
+def season_summary(rows):
+    summary = pd.DataFrame(rows, columns=['PLAYER_ID', 'GP', 'SUM_PTS'])
+    summary['SEASON_ID'] = SEASON
+    for col in SUM_COLS:
+        if col not in summary:
+            summary[col] = 0
+    return summary
+
+# points per game 20, 30, 20 (a tie), 10, and 40 for a player below the games threshold
+SUMMARY = season_summary([
+    (1, 50, 1000),
+    (2, 50, 1500),
+    (3, 50, 1000),
+    (4, 50, 500),
+    (5, SEASON_MIN_GAMES - 1, 40 * (SEASON_MIN_GAMES - 1))
+])
+
+def test_top_and_bottom_ranks():
+    rankings = Rankings(SUMMARY)
+
+    # four qualified players, ties count half: the best is above 3.5 of 4, the worst above 0.5 of 4
+    assert rankings.percentile(2, 'PPG', SEASON) == 87.5
+    assert rankings.percentile(4, 'PPG', SEASON) == 12.5
+
+    top = rankings.top_n('PPG', 2, SEASON)
+    assert top['VALUE'].tolist() == [30.0, 20.0]
+    assert top['PLAYER_ID'].iloc[0] == 2
+
+def test_ties_share_a_percentile():
+    rankings = Rankings(SUMMARY)
+    assert rankings.percentile(1, 'PPG', SEASON) == rankings.percentile(3, 'PPG', SEASON) == 50.0
+
+def test_player_below_the_games_threshold_is_not_ranked():
+    rankings = Rankings(SUMMARY)
+
+    assert rankings.percentile(5, 'PPG', SEASON) is None
+    assert len(rankings.table('PPG', SEASON)) == 4
+    assert 5 not in rankings.top_n('PPG', 10, SEASON)['PLAYER_ID'].tolist()
+
+    # nobody has the career minimum of games, so the career ranking is empty
+    assert rankings.percentile(2, 'PPG', CAREER) is None
+
+def test_between_percentiles_splits_the_ranking():
+    rankings = Rankings(SUMMARY)
+    assert rankings.between_percentiles('PPG', 75, 100, SEASON)['PLAYER_ID'].tolist() == [2]
+    assert rankings.between_percentiles('PPG', 0, 25, SEASON)['PLAYER_ID'].tolist() == [4]
+
+def test_order_agrees_with_sort_values():
+    # a second season, so the order is on career values
+    summary = pd.concat([SUMMARY, season_summary([(4, 50, 3000), (6, 50, 0)]).assign(SEASON_ID='22024')], ignore_index=True)
+    rankings = Rankings(summary)
+
+    career = summary.groupby('PLAYER_ID', as_index=False)[['GP', 'SUM_PTS']].sum()
+    career['PPG'] = career['SUM_PTS'] / career['GP']
+    expected = career.sort_values('PPG', ascending=False, kind='stable')['PLAYER_ID'].to_numpy()
+
+    # every player with a game is in the order, qualified or not
+    np.testing.assert_array_equal(rankings.order('PPG'), expected)
+
+def test_percentile_badge():
+    assert percentile_badge(None) is None
+    assert [percentile_badge(p) for p in (1, 2, 3, 11, 12.6, 87.5, 100)] == ['1st pct', '2nd pct', '3rd pct', '11th pct', '13th pct', '88th pct', '100th pct']
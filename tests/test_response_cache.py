@@ -0,0 +1,32 @@
+### TESTS FOR THE ON-DISK NBA API RESPONSE CACHE IN response_cache.py
+## Import libraries
+import pickle
+import pandas as pd
+import pytest
+from response_cache import ResponseCache
+
+def test_put_then_get_round_trips(tmp_path):
+    cache = ResponseCache(tmp_path)
+    frames = [pd.DataFrame({'PTS': [10, 20]})]
+    cache.put('PlayerGameLog', {'player_id': 1}, frames)
+    assert cache.get('PlayerGameLog', {'player_id': 1})[0].equals(frames[0])
+    assert (cache.hits, cache.misses) == (1, 0)
+
+## A bad entry on disk has to count as a miss and be deleted, not crash the fetch
+@pytest.mark.parametrize('payload', [
+    b'',                                                                    # truncated to nothing (EOFError)
+    b'not a pickle',                                                        # garbage (UnpicklingError)
+    pickle.dumps(pd.DataFrame({'PTS': [1]}))[:20],                          # truncated mid-stream
+    b'\x80\x04\x95\x1a\x00\x00\x00\x00\x00\x00\x00\x8c\x0cno_such_module\x94\x8c\x03Gone\x94\x93\x94.'  # class that no longer exists
+])
+def test_corrupted_entry_is_a_miss_and_is_deleted(tmp_path, payload):
+    cache = ResponseCache(tmp_path)
+    cache.put('PlayerGameLog', {'player_id': 1}, [pd.DataFrame({'PTS': [1]})])
+    key = cache.key('PlayerGameLog', {'player_id': 1})
+    with open(cache.path(key), 'wb') as f:
+        f.write(payload)
+
+    assert cache.get('PlayerGameLog', {'player_id': 1}) is None
+    assert cache.misses == 1
+    assert key not in cache.index
+    assert not (tmp_path / key[:2] / f'{key}.pkl').exists()
@@ -0,0 +1,160 @@
+### TESTS FOR THE VECTORIZED ROLLING AVERAGES, STREAKS, STRETCHES AND LEADERBOARDS IN rolling.py
+## Import libraries
+import glob
+import os
+import numpy as np
+import pandas as pd
+from dashboard_queries import ROLLING_FINGERPRINT_QUERY
+from rolling import rolling_means, run_lengths, segment_argmax, segment_starts, RollingAnalytics, ROLLING_STATS, load_rolling
+from rankings import CAREER
+
+## Define a function to build game logs from {player_id: [(season_id, pts), ...]}, one game a day, every other stat 0
+def make_games(players):
+    rows = []
+    for player_id, games in players.items():
+        for day, (season_id, pts) in enumerate(games):
+            rows.append({'PLAYER_ID': player_id, 'SEASON_ID': season_id, 'GAME_DATE': pd.Timestamp('2024-01-01') + pd.Timedelta(days=day),
+                         **{stat: 0 for stat in ROLLING_STATS}, 'PTS': pts})
+    return pd.DataFrame(rows)
+
+def test_segment_starts_flags_any_key_change():
+    players = np.array([1, 1, 1, 2, 2])
+    seasons = np.array(['a', 'a', 'b', 'b', 'b'])
+    assert segment_starts(players).tolist() == [True, False, False, True, False]
+    assert segment_starts(players, seasons).tolist() == [True, False, True, True, False]
+    assert segment_starts(np.array([7])).tolist() == [True]
+
+def test_run_lengths_restart_at_each_segment():
+    # player 1 ends on a streak of two, player 2 starts on one: the streak must not carry over
+    hit = np.array([False, True, True, True, True, False, True])
+    row_first = np.array([0, 0, 0, 3, 3, 3, 3])
+    assert run_lengths(hit, row_first).tolist() == [0, 1, 2, 1, 2, 0, 1]
+
+def test_run_lengths_all_hits_and_all_misses():
+    row_first = np.array([0, 0, 0])
+    assert run_lengths(np.array([True, True, True]), row_first).tolist() == [1, 2, 3]
+    assert run_lengths(np.array([False, False, False]), row_first).tolist() == [0, 0, 0]
+
+def test_rolling_means_are_nan_until_the_segment_has_window_games():
+    values = np.array([10.0, 20.0, 30.0, 1.0, 2.0])
+    row_first = np.array([0, 0, 0, 3, 3])
+    means = rolling_means(values, row_first, 2)
+
+    # the second player's first game would average over the first player's last game without the segment check
+    assert np.isnan(means[[0, 3]]).all()
+    assert means[[1, 2, 4]].tolist() == [15.0, 25.0, 1.5]
+
+def test_rolling_means_window_longer_than_every_segment():
+    means = rolling_means(np.array([1.0, 2.0, 3.0]), np.array([0, 0, 2]), 3)
+    assert np.isnan(means).all()
+
+def test_segment_argmax_takes_the_earliest_row_on_ties():
+    values = np.array([5.0, 9.0, 9.0, 3.0, 3.0])
+    seg_ids = np.array([0, 0, 0, 1, 1])
+    assert segment_argmax(values, seg_ids, 2).tolist() == [1, 3]
+
+def test_segment_argmax_skips_nan_unless_the_segment_has_nothing_else():
+    values = np.array([np.nan, 4.0, np.nan, np.nan, 7.0])
+    seg_ids = np.array([0, 0, 1, 1, 2])
+    top = segment_argmax(values, seg_ids, 3)
+    assert top[[0, 2]].tolist() == [1, 4]
+    assert top[1] in (2, 3) and np.isnan(values[top[1]])
+
+def test_streaks_and_stretches_per_player():
+    games = make_games({
+        1: [('22023', 25), ('22023', 31), ('22023', 33), ('22024', 35), ('22024', 5), ('22024', 21)],
+        2: [('22024', 30), ('22024', 30)]
+    })
+    analytics = RollingAnalytics.from_games(games)
+
+    streaks = analytics.player_streaks(1).set_index(['STAT', 'THRESHOLD'])
+    assert streaks.loc[('Points', 30), 'LONGEST'] == 3
+    assert streaks.loc[('Points', 30), 'ACTIVE'] == 0
+    assert streaks.loc[('Points', 20), 'ACTIVE'] == 1
+    assert streaks.loc[('Points', 30), 'FROM'] == pd.Timestamp('2024-01-02')
+    assert streaks.loc[('Points', 30), 'TO'] == pd.Timestamp('2024-01-04')
+
+    # a season streak stops at the season boundary, a career streak runs through it
+    assert analytics.streak_leaders('PTS', 30, scope='22023')['STREAK'].tolist() == [2]
+    assert analytics.streak_leaders('PTS', 30, scope='22024')['STREAK'].tolist() == [2, 1]
+
+    # player 2 has two games, too few for a five-game stretch
+    assert analytics.player_stretches(2, 5).empty
+    stretch = analytics.player_stretches(1, 5).set_index('STAT').loc['Points']
+    assert stretch['BEST_AVG'] == 25.8 and stretch['WORST_AVG'] == 25.0
+    assert stretch['BEST_TO'] == pd.Timestamp('2024-01-05') and stretch['WORST_TO'] == pd.Timestamp('2024-01-06')
+
+def test_leaders_rank_ties_by_player_and_drop_nan_and_zero():
+    games = make_games({
+        1: [('22024', 30)] * 5,
+        2: [('22024', 30)] * 5,
+        3: [('22024', 40)] * 2,
+        4: [('22024', 0)] * 5,
+        5: [('22024', 35)] * 5
+    })
+    analytics = RollingAnalytics.from_games(games)
+
+    # player 3 has no five-game stretch (NaN) and player 4's best is 0, so neither is ranked
+    leaders = analytics.stretch_leaders('PTS', 5, n=10)
+    assert leaders['PLAYER_ID'].tolist() == [5, 1, 2]
+    assert leaders['AVG'].tolist() == [35.0, 30.0, 30.0]
+
+    # NaN sorts after every value in the precomputed order, so it never lands in the top n
+    order = analytics.arrays['career_best_PTS_5_order']
+    values = analytics.arrays['career_best_PTS_5'][order]
+    assert np.isnan(values[-1]) and not np.isnan(values[:-1]).any()
+
+    assert analytics.stretch_leaders('PTS', 5, n=2)['PLAYER_ID'].tolist() == [5, 1]
+    assert analytics.streak_leaders('PTS', 40, active=True)['PLAYER_ID'].tolist() == [3]
+
+def test_unknown_player_gets_empty_frames():
+    analytics = RollingAnalytics.from_games(make_games({1: [('22024', 10)]}))
+    assert analytics.player_rolling(99, 'PTS').empty
+    assert analytics.player_streaks(99).empty
+    assert analytics.player_stretches(99, 5, scope=CAREER).empty
+
+## Define a query runner over a game log frame, recording the full scans it serves
+def games_runner(games, scans):
+    def run_query(query):
+        if query == ROLLING_FINGERPRINT_QUERY:
+            return pd.DataFrame({'GAMES': [len(games)], 'LAST_GAME_DATE': [games['GAME_DATE'].max() if len(games) else None]})
+        scans.append(query)
+        return games
+    return run_query
+
+def saved_files(tmp_path):
+    return sorted(os.path.basename(path) for path in glob.glob(os.path.join(tmp_path, 'rolling-*.npz')))
+
+def test_saved_analytics_are_read_back_for_the_same_version(tmp_path, monkeypatch):
+    monkeypatch.setenv('ROLLING_DIR', str(tmp_path))
+    scans = []
+    run_query = games_runner(make_games({1: [('22024', 20)] * 6}), scans)
+
+    first = load_rolling(3, run_query)
+    second = load_rolling(3, run_query)
+    assert len(scans) == 1
+    assert second.stretch_leaders('PTS', 5).equals(first.stretch_leaders('PTS', 5))
+
+    load_rolling(4, run_query)
+    assert len(scans) == 2
+
+def test_same_version_with_other_game_logs_is_recomputed(tmp_path, monkeypatch):
+    monkeypatch.setenv('ROLLING_DIR', str(tmp_path))
+    scans = []
+    load_rolling(3, games_runner(make_games({1: [('22024', 20)] * 6}), scans))
+
+    # a recreated database that reached the same version with different games
+    analytics = load_rolling(3, games_runner(make_games({2: [('22024', 30)] * 8}), scans))
+    assert len(scans) == 2
+    assert analytics.stretch_leaders('PTS', 5)['PLAYER_ID'].tolist() == [2]
+
+def test_saved_analytics_are_deleted_after_a_schema_reset(tmp_path, monkeypatch):
+    monkeypatch.setenv('ROLLING_DIR', str(tmp_path))
+    scans = []
+    run_query = games_runner(make_games({1: [('22024', 20)] * 6}), scans)
+    load_rolling(40, run_query)
+    assert saved_files(tmp_path) == ['rolling-40-6-20240106.npz']
+
+    # the game log version went back to 1, so the database was dropped and recreated
+    load_rolling(1, games_runner(make_games({1: [('22024', 20)] * 2}), scans))
+    assert saved_files(tmp_path) == ['rolling-1-2-20240102.npz']
@@ -0,0 +1,143 @@
+### TESTS FOR THE ROW FINGERPRINTS IN row_hashes.py AND HOW changed_rows SORTS ROWS INTO INSERTS, UPDATES AND SKIPS
+## Import libraries
+from contextlib import contextmanager
+import os
+import subprocess
+import sys
+import pandas as pd
+import pytest
+import db_insert
+import row_hashes
+from row_hashes import row_hashes as hash_rows, key_hashes, reset_row_hash_indexes
+
+TABLE = 'PLAYER_GAME_LOGS'
+COLUMNS = ['PLAYER_ID', 'GAME_ID', 'GAME_DATE', 'TEAM', 'MIN', 'PTS', 'FG_PCT']
+
+def game_logs():
+    return pd.DataFrame({
+        'PLAYER_ID': [2544, 2544, 2544],
+        'GAME_ID': ['0022400001', '0022400002', '0022400003'],
+        'GAME_DATE': pd.to_datetime(['2024-10-22', '2024-10-24', '2024-10-26']),
+        'TEAM': ['LAL', 'LAL', 'LAL'],
+        'MIN': [35.5, 31.25, 38.0],
+        'PTS': [16, 21, 27],
+        'FG_PCT': [0.5, 0.467, 0.524]
+    })
+
+## A database holding (PLAYER_ID, GAME_ID, ROW_HASH) rows, served to RowHashIndex.load_players through a fake pooled connection
+class FakeDatabase:
+    def __init__(self):
+        self.rows = []
+        self.reads = 0
+
+    def store(self, df, hashes=None):
+        hashes = hash_rows(df, COLUMNS) if hashes is None else hashes
+        self.rows += [(int(p), g, int(h)) for p, g, h in zip(df['PLAYER_ID'], df['GAME_ID'], hashes)]
+
+    def cursor(self):
+        return FakeCursor(self)
+
+class FakeCursor:
+    def __init__(self, db):
+        self.db = db
+        self.result = []
+
+    def execute(self, query, player_ids):
+        self.db.reads += 1
+        self.result = [row for row in self.db.rows if row[0] in player_ids]
+
+    def fetchall(self):
+        return self.result
+
+    def close(self):
+        pass
+
+@pytest.fixture
+def db(monkeypatch):
+    db = FakeDatabase()
+
+    @contextmanager
+    def fake_pooled_connection():
+        yield db
+    monkeypatch.setattr(row_hashes, 'pooled_connection', fake_pooled_connection)
+
+    # a fresh set of shared indexes for each test
+    monkeypatch.setattr(row_hashes, '_indexes', {})
+    return db
+
+def test_same_row_hashes_the_same_in_a_new_process():
+    expected = [int(h) for h in hash_rows(game_logs(), COLUMNS)]
+
+    # a different PYTHONHASHSEED, so the fingerprint can't lean on python's per-process string hashing
+    code = 'import sys; sys.path.insert(0, "tests"); from test_row_hashes import game_logs, COLUMNS; ' \
+           'from row_hashes import row_hashes; print(" ".join(str(h) for h in row_hashes(game_logs(), COLUMNS)))'
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = {**os.environ, 'PYTHONPATH': os.path.join(root, 'src'), 'PYTHONHASHSEED': '12345', 'LOG_LEVEL': 'WARNING'}
+    output = subprocess.run([sys.executable, '-c', code], cwd=root, env=env, capture_output=True, text=True, check=True).stdout
+
+    assert [int(h) for h in output.split()] == expected
+
+@pytest.mark.parametrize('col, value', [('PTS', 17), ('MIN', 35.75), ('FG_PCT', 0.501), ('TEAM', 'BOS'), ('GAME_DATE', pd.Timestamp('2024-10-23'))])
+def test_changing_one_column_changes_the_hash(col, value):
+    df = game_logs()
+    before = hash_rows(df, COLUMNS)
+
+    df.loc[0, col] = value
+    after = hash_rows(df, COLUMNS)
+    assert after[0] != before[0]
+    assert (after[1:] == before[1:]).all()
+
+def test_dtypes_and_digits_past_the_stored_precision_hash_the_same():
+    df = game_logs()
+    other = df.astype({'PLAYER_ID': 'int32', 'PTS': 'int16', 'TEAM': 'category'})
+    other['FG_PCT'] = other['FG_PCT'] + 0.0001
+    assert (hash_rows(df, COLUMNS) == hash_rows(other, COLUMNS)).all()
+
+def test_changed_rows_sorts_rows_into_inserted_updated_and_skipped(db):
+    df = game_logs()
+    stored = df.iloc[:2].copy()
+    stored.loc[1, 'PTS'] = 20
+    db.store(stored)
+
+    changed_df, row_changes = db_insert.changed_rows(df, TABLE, COLUMNS)
+
+    # game 1 is unchanged, game 2 scored differently, game 3 was never stored
+    assert row_changes.is_new.tolist() == [False, False, True]
+    assert row_changes.is_changed.tolist() == [False, True, False]
+    assert row_changes.counts() == {'inserted': 1, 'updated': 1, 'skipped': 1}
+    assert changed_df['GAME_ID'].tolist() == ['0022400002', '0022400003']
+    assert changed_df['ROW_HASH'].tolist() == hash_rows(df, COLUMNS)[1:].tolist()
+
+def test_rows_stored_without_a_hash_are_rewritten(db):
+    df = game_logs()
+    db.store(df, hashes=[0, 0, 0])
+
+    _, row_changes = db_insert.changed_rows(df, TABLE, COLUMNS)
+    assert row_changes.counts() == {'inserted': 0, 'updated': 3, 'skipped': 0}
+
+def test_recorded_rows_are_skipped_without_reading_the_database_again(db):
+    df = game_logs()
+    _, row_changes = db_insert.changed_rows(df, TABLE, COLUMNS)
+    db_insert.record_changes(TABLE, COLUMNS, row_changes)
+
+    _, row_changes = db_insert.changed_rows(df, TABLE, COLUMNS)
+    assert row_changes.counts() == {'inserted': 0, 'updated': 0, 'skipped': 3}
+    assert db.reads == 1
+
+def test_after_reset_every_row_is_new(db):
+    df = game_logs()
+    db.store(df)
+    _, row_changes = db_insert.changed_rows(df, TABLE, COLUMNS)
+    assert row_changes.counts()['skipped'] == 3
+
+    # the rows are deleted outside the insert path (e.g. seed_players.remove_seed), then the indexes are reset
+    db.rows = []
+    reset_row_hash_indexes()
+
+    _, row_changes = db_insert.changed_rows(df, TABLE, COLUMNS)
+    assert row_changes.is_new.all()
+    assert row_changes.counts() == {'inserted': 3, 'updated': 0, 'skipped': 0}
+
+def test_key_hashes_ignore_the_key_dtype():
+    df = game_logs()
+    assert (key_hashes(df, ['PLAYER_ID', 'GAME_ID']) == key_hashes(df.astype({'PLAYER_ID': 'int32'}), ['PLAYER_ID', 'GAME_ID'])).all()
@@ -0,0 +1,56 @@
+### TESTS FOR THE SNAPSHOT READ PATH: EVERY DASHBOARD QUERY RUNS IN DUCKDB OVER A PUBLISHED SNAPSHOT OF SYNTHETIC PLAYERS
+## Import libraries
+import pytest
+from dashboard_queries import LOADER_QUERIES, PLAYER_PAGE_QUERIES
+from matchup_cube import opponent_splits_query, best_vs_team_query
+from player_bundle import load_player_bundle, load_player_game_logs, RECENT_GAMES_LOADED
+from schema import view_definitions
+from snapshot import SnapshotReader, SNAPSHOT_VIEWS
+from synthetic_data import SYNTHETIC_PLAYER_BASE
+from synthetic_snapshot import publish_synthetic_snapshot
+
+@pytest.fixture(scope='module')
+def reader(tmp_path_factory):
+    snapshot_dir = tmp_path_factory.mktemp('snapshot')
+    publish_synthetic_snapshot(n_players=5, n_seasons=2, snapshot_dir=snapshot_dir)
+    return SnapshotReader(snapshot_dir)
+
+def test_snapshot_views_are_the_schema_file_views():
+    assert SNAPSHOT_VIEWS == view_definitions()
+    assert list(SNAPSHOT_VIEWS) == ['PLAYER_CAREER_STATS', 'PLAYER_SEASON_STATS', 'PLAYER_CAREER_HIGHS']
+
+@pytest.mark.parametrize('name', list(LOADER_QUERIES) + list(PLAYER_PAGE_QUERIES))
+def test_every_dashboard_query_runs_on_the_snapshot(reader, name):
+    query = {**LOADER_QUERIES, **PLAYER_PAGE_QUERIES}[name]
+    df = reader.query(query.format(player_id=SYNTHETIC_PLAYER_BASE, num_games=5, season_filter=''))
+    assert not df.empty
+
+def test_cube_queries_run_on_the_snapshot(reader):
+    assert not reader.query(opponent_splits_query(SYNTHETIC_PLAYER_BASE, by_location=True)).empty
+    opponent = reader.query(LOADER_QUERIES['get_opponents'])['OPPONENT'].iloc[0]
+    assert not reader.query(best_vs_team_query(opponent, min_games=1)).empty
+
+def test_views_agree_with_the_game_logs(reader):
+    career = reader.query(f'SELECT GP, PPG FROM PLAYER_CAREER_STATS WHERE PLAYER_ID = {SYNTHETIC_PLAYER_BASE}').iloc[0]
+    games = reader.query(f'SELECT COUNT(*) AS GP, ROUND(AVG(PTS), 1) AS PPG FROM PLAYER_GAME_LOGS WHERE PLAYER_ID = {SYNTHETIC_PLAYER_BASE}').iloc[0]
+    assert career['GP'] == games['GP'] and career['PPG'] == games['PPG']
+
+    highs = reader.query(f'SELECT CAREER_HIGH_PTS FROM PLAYER_CAREER_HIGHS WHERE PLAYER_ID = {SYNTHETIC_PLAYER_BASE}').iloc[0]
+    assert highs['CAREER_HIGH_PTS'] == reader.query(f'SELECT MAX(PTS) AS M FROM PLAYER_GAME_LOGS WHERE PLAYER_ID = {SYNTHETIC_PLAYER_BASE}')['M'].iloc[0]
+
+def test_player_bundle_matches_the_game_logs(reader):
+    bundle = load_player_bundle(SYNTHETIC_PLAYER_BASE, run_queries=reader.query_many)
+    logs = load_player_game_logs(SYNTHETIC_PLAYER_BASE, run_query=reader.query)
+    assert logs['GAME_DATE'].is_monotonic_increasing
+
+    newest = logs.iloc[::-1].head(RECENT_GAMES_LOADED)
+    assert bundle.recent['GAME_DATE'].tolist() == newest['GAME_DATE'].tolist()
+    assert bundle.recent_games(5)['PTS'].tolist() == newest['PTS'].head(5).tolist()
+
+    assert bundle.seasons['GP'].sum() == bundle.home_away['GP'].sum() == bundle.monthly['GP'].sum() == len(logs)
+    assert bundle.season_trend()['SEASON_ID'].is_monotonic_increasing
+    assert bundle.best_games['GAME_SCORE'].iloc[0] == logs['GAME_SCORE'].max()
+    assert bundle.career_highs['CAREER_HIGH_PTS'] == logs['PTS'].max()
+
+def test_player_bundle_of_unknown_player_is_none(reader):
+    assert load_player_bundle(1, run_queries=reader.query_many) is None
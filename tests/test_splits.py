@@ -0,0 +1,83 @@
+### TESTS FOR THE VECTORIZED SPLITS IN splits.py, AGAINST VALUES WORKED OUT BY HAND ON A SMALL GAME LOG
+## Import libraries
+import numpy as np
+import pandas as pd
+import pytest
+from splits import compute_splits, all_star_date, SUM_COLS
+
+## Define a function to build a six game log from the 2023-24 season (all-star sunday 2024-02-18)
+## game n scores 10n points on 1-for-10 ... 6-for-10 shooting, home games are the odd ones
+def hand_built_log():
+    logs = pd.DataFrame({
+        'PLAYER_ID': 1,
+        'SEASON_ID': '22023',
+        'GAME_DATE': pd.to_datetime(['2023-11-01', '2023-11-03', '2023-12-10', '2024-02-18', '2024-03-01', '2024-03-05']),
+        'HOME_AWAY': ['H', 'A', 'H', 'A', 'H', 'A'],
+        'WL': ['W', 'L', 'W', 'L', 'L', 'W'],
+        'OPPONENT': ['BOS', 'NYK', 'BOS', 'MIA', 'NYK', 'BOS']
+    })
+    for col in SUM_COLS:
+        logs[col] = 0.0
+
+    logs['MIN'] = 30.0
+    logs['PTS'] = [10.0, 20.0, 30.0, 40.0, 50.0, 60.0]
+    logs['FGM'] = [1.0, 2.0, 3.0, 4.0, 5.0, 6.0]
+    logs['FGA'] = 10.0
+    return logs
+
+def split_values(split, col):
+    return dict(zip(split['SPLIT'], split[col]))
+
+def test_home_away():
+    split = compute_splits(hand_built_log(), ['HOME_AWAY'])['HOME_AWAY']
+
+    # sorted on the H/A code, so away comes first
+    assert split['SPLIT'].tolist() == ['Away', 'Home']
+    assert split_values(split, 'GP') == {'Away': 3, 'Home': 3}
+    assert split_values(split, 'PPG') == {'Away': 40.0, 'Home': 30.0}
+    assert split_values(split, 'FG_PCT') == {'Away': 0.4, 'Home': 0.3}
+
+def test_win_loss():
+    split = compute_splits(hand_built_log(), ['WL'])['WL']
+
+    assert split['SPLIT'].tolist() == ['Wins', 'Losses']
+    assert split_values(split, 'GP') == {'Wins': 3, 'Losses': 3}
+
+    # wins 10 + 30 + 60 points, losses 20 + 40 + 50
+    assert split_values(split, 'PPG') == {'Wins': 33.3, 'Losses': 36.7}
+    assert split_values(split, 'FG_PCT') == {'Wins': 0.333, 'Losses': 0.367}
+
+def test_pre_and_post_all_star():
+    split = compute_splits(hand_built_log(), ['ALL_STAR'])['ALL_STAR']
+
+    # a game on all-star sunday itself is still pre all-star
+    assert split['SPLIT'].tolist() == ['Pre All-Star', 'Post All-Star']
+    assert split_values(split, 'GP') == {'Pre All-Star': 4, 'Post All-Star': 2}
+    assert split_values(split, 'PPG') == {'Pre All-Star': 25.0, 'Post All-Star': 55.0}
+
+def test_by_month():
+    split = compute_splits(hand_built_log(), ['MONTH'])['MONTH']
+
+    assert split['SPLIT'].tolist() == ['2023-11', '2023-12', '2024-02', '2024-03']
+    assert split['GP'].tolist() == [2, 1, 1, 2]
+    assert split['PPG'].tolist() == [15.0, 30.0, 40.0, 55.0]
+    assert split['MPG'].tolist() == [30.0] * 4
+
+def test_dimensions_computed_together_match_one_at_a_time():
+    logs = hand_built_log()
+    together = compute_splits(logs, ['HOME_AWAY', 'WL', 'ALL_STAR', 'MONTH'])
+    for dim, split in together.items():
+        pd.testing.assert_frame_equal(split, compute_splits(logs, [dim])[dim])
+
+def test_empty_denominators_give_nan():
+    logs = hand_built_log()
+    split = compute_splits(logs, ['HOME_AWAY'])['HOME_AWAY']
+    assert np.isnan(split['FT_PCT']).all() and np.isnan(split['FG3_PCT']).all()
+
+def test_all_star_date_falls_back_to_the_third_sunday_of_february():
+    assert all_star_date(2023).isoformat() == '2024-02-18'
+    assert all_star_date(2030).isoformat() == '2031-02-16'
+
+def test_unknown_dimension_is_rejected():
+    with pytest.raises(ValueError, match='TEAM'):
+        compute_splits(hand_built_log(), ['TEAM'])
@@ -0,0 +1,96 @@
+### TESTS FOR THE STREAMED PULL -> CLEAN -> INSERT IN stream_pipeline.py, ON THE STUB NBA_API
+## Import libraries
+import threading
+import time
+import pandas as pd
+import pytest
+from clean_data import clean_gamelogs
+from nba_api_stub import StubNBAApi
+from pull_data import pull_gamelogs
+from stream_pipeline import stream_gamelogs, DEFAULT_QUEUE_SIZE
+from synthetic_data import make_players
+
+SEASONS = ['2023-24']
+
+## Define a function to build a stub api with no latency for a number of synthetic players
+def stub_api(n_players):
+    player_list = make_players(n_players)
+    return player_list, StubNBAApi(player_list, SEASONS, latency=0)
+
+## Define an insert_fn that keeps every batch it is handed
+def collecting_insert(batches, delay=0.0):
+    def insert(df, batch_size, mode):
+        time.sleep(delay)
+        batches.append(df)
+        return {'inserted': len(df)}
+    return insert
+
+def stream(player_list, api, insert_fn, **kwargs):
+    return stream_gamelogs(endpoint=api.PlayerGameLog, cache=False, player_list=player_list, requests_per_second=1000,
+                           max_workers=4, insert_fn=insert_fn, **kwargs)
+
+# each batch has its own categories, so the concatenated stream is compared on values
+def plain(df, keys):
+    df = df.sort_values(keys).reset_index(drop=True)
+    for col in df.columns[df.dtypes == 'category']:
+        df[col] = df[col].astype(str)
+    return df
+
+def stream_threads():
+    return [thread for thread in threading.enumerate() if thread.name.startswith('stream-')]
+
+def test_streamed_output_matches_batch_clean(tmp_path):
+    player_list, api = stub_api(12)
+    batches = []
+
+    # small batches, so the stream cleans the players in several groups
+    summary = stream(player_list, api, collecting_insert(batches), batch_size=200)
+    assert summary['batches'] > 1
+
+    raw = pull_gamelogs('ALL', 1000, 4, endpoint=api.PlayerGameLog, cache=False, player_list=player_list, checkpoint_dir=str(tmp_path))
+    expected = clean_gamelogs(raw)
+
+    streamed = pd.concat(batches, ignore_index=True)
+    keys = ['PLAYER_ID', 'GAME_ID']
+    pd.testing.assert_frame_equal(plain(streamed, keys), plain(expected[streamed.columns], keys), check_dtype=False)
+    assert list(streamed.columns) == list(expected.columns)
+    assert summary['rows_stored'] == summary['inserted'] == len(expected)
+
+def test_raw_queue_never_holds_more_than_its_size():
+    player_list, api = stub_api(DEFAULT_QUEUE_SIZE + 40)
+
+    # a slow insert holds the clean stage back, so the fetch stage fills the raw queue
+    summary = stream(player_list, api, collecting_insert([], delay=0.05), batch_size=300)
+    assert summary['peak_raw_queue'] == DEFAULT_QUEUE_SIZE
+    assert summary['players_fetched'] == len(player_list)
+
+def test_failing_consumer_stops_the_stream_and_reraises():
+    player_list, api = stub_api(DEFAULT_QUEUE_SIZE + 40)
+
+    def failing_insert(df, batch_size, mode):
+        raise RuntimeError('insert failed')
+
+    with pytest.raises(RuntimeError, match='insert failed'):
+        stream(player_list, api, failing_insert, batch_size=50)
+
+    # the fetch stage gave up instead of pulling every player into a queue nobody reads
+    assert api.stats()['calls'] < len(player_list)
+    assert not stream_threads()
+
+## A response cache whose reads fail, which fails the fetch stage
+class FailingCache:
+    def get(self, endpoint, params):
+        raise OSError('cache unreadable')
+
+    def flush(self):
+        pass
+
+def test_failing_producer_stops_the_stream_and_reraises():
+    player_list, api = stub_api(5)
+    batches = []
+
+    with pytest.raises(OSError, match='cache unreadable'):
+        stream_gamelogs(endpoint=api.PlayerGameLog, cache=FailingCache(), player_list=player_list, insert_fn=collecting_insert(batches))
+
+    assert batches == []
+    assert not stream_threads()